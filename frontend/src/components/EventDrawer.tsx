@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react'
 
-import { fetchEvent } from '../lib/api'
-import type { Event, EventType } from '../types'
+import { fetchEvent, fetchRelatedEvents } from '../lib/api'
+import type { Event, EventType, RelatedEvent } from '../types'
 
 interface Props {
   eventId: string | null
@@ -18,6 +18,7 @@ const TYPE_COLORS: Record<EventType, string> = {
 
 export default function EventDrawer({ eventId, onClose }: Props) {
   const [event, setEvent] = useState<Event | null>(null)
+  const [related, setRelated] = useState<RelatedEvent[]>([])
   const [visible, setVisible] = useState(false)
 
   useEffect(() => {
@@ -26,6 +27,10 @@ export default function EventDrawer({ eventId, onClose }: Props) {
     fetchEvent(eventId)
       .then((res) => setEvent(res.data))
       .catch((err) => console.error(err))
+    setRelated([])
+    fetchRelatedEvents(eventId)
+      .then((res) => setRelated(res.data.related))
+      .catch((err) => console.error(err))
     // allow slide-in animation
     requestAnimationFrame(() => setVisible(true))
   }, [eventId])
@@ -116,6 +121,22 @@ export default function EventDrawer({ eventId, onClose }: Props) {
                 Source
               </a>
             </div>
+            {related.length > 0 && (
+              <>
+                <h3>Related events</h3>
+                <ul>
+                  {related.map((rel) => (
+                    <li key={rel.id}>
+                      {rel.title}{' '}
+                      <small>
+                        {new Date(rel.detected_at).toLocaleString()}
+                        {rel.source_name ? ` · ${rel.source_name}` : ''}
+                      </small>
+                    </li>
+                  ))}
+                </ul>
+              </>
+            )}
             <button
               type="button"
               onClick={() => console.log('Add to Notebook', event.id)}
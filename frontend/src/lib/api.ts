@@ -6,6 +6,7 @@ import type { Event, GraphData, TimelineEvent } from '../types'
 import type {
   Event,
   GraphData,
+  RelatedEvent,
   TimelineEvent,
   Notebook,
   NotebookItem,
@@ -25,6 +26,12 @@ export function fetchEvent(id: string) {
   return api.get<Event>(`/events/${id}`)
 }
 
+export function fetchRelatedEvents(id: string, limit = 10) {
+  return api.get<{ event_id: number; related: RelatedEvent[] }>(
+    `/events/${id}/related?limit=${limit}`,
+  )
+}
+
 export function fetchGraph(entityId: string) {
   const param = entityId ? `?entity_id=${entityId}` : ''
   return api.get<GraphData>(`/graph${param}`)
@@ -14,6 +14,15 @@ export interface Event {
   source: string
 }
 
+export interface RelatedEvent {
+  id: number
+  title: string
+  event_type: string
+  detected_at: string
+  source_name?: string | null
+  score: number
+}
+
 export interface GraphNode {
   id: string
   label: string
@@ -1,5 +1,6 @@
 -- Initial schema for MVP (events, entities, relations, notebooks, audit)
 CREATE EXTENSION IF NOT EXISTS postgis;
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 CREATE TABLE IF NOT EXISTS sources (
   id SERIAL PRIMARY KEY,
@@ -13,22 +14,109 @@ CREATE TYPE event_type AS ENUM (
   'Weather','Disaster','Wildfire','Earthquake','Maritime','Aviation','GovLE','Cyber','Other'
 );
 
+-- Events are range partitioned by month on detected_at (partitions are named
+-- events_pYYYYMM).  Primary and unique keys of a partitioned table must
+-- include the partition key, so the (source_id, title, occurred_at) dedupe
+-- rule is enforced through event_keys by the events_dedupe trigger instead.
 CREATE TABLE IF NOT EXISTS events (
-  id BIGSERIAL PRIMARY KEY,
+  id BIGSERIAL,
   source_id INT REFERENCES sources(id),
   title TEXT NOT NULL,
   body TEXT,
   event_type event_type DEFAULT 'Other',
   occurred_at TIMESTAMPTZ,
-  detected_at TIMESTAMPTZ DEFAULT now(),
+  detected_at TIMESTAMPTZ NOT NULL DEFAULT now(),
   geom geography,
   jurisdiction TEXT,
   confidence REAL,
   severity REAL,
   entities JSONB DEFAULT '[]'::jsonb,
   raw JSONB,
-  UNIQUE (source_id, title, occurred_at)
+  -- H3 cells of geom (64-bit index) at resolutions 3/5/7 for density maps
+  h3_r3 BIGINT,
+  h3_r5 BIGINT,
+  h3_r7 BIGINT,
+  -- Earliest event of this event's near-duplicate cluster (services/etl/neardup.py)
+  cluster_id BIGINT,
+  PRIMARY KEY (id, detected_at)
+) PARTITION BY RANGE (detected_at);
+
+-- Catches rows outside every monthly partition; ensure_event_partition moves
+-- them out when their month's partition is created.
+CREATE TABLE IF NOT EXISTS events_default PARTITION OF events DEFAULT;
+
+CREATE TABLE IF NOT EXISTS event_keys (
+  source_id INT NOT NULL,
+  title TEXT NOT NULL,
+  occurred_at TIMESTAMPTZ NOT NULL,
+  event_id BIGINT NOT NULL,
+  detected_at TIMESTAMPTZ NOT NULL,
+  PRIMARY KEY (source_id, title, occurred_at)
 );
+CREATE INDEX IF NOT EXISTS idx_event_keys_detected_at ON event_keys USING BRIN (detected_at);
+
+-- Skip (return NULL for) rows whose (source_id, title, occurred_at) already
+-- exists; rows with a NULL source or occurrence time are never duplicates,
+-- matching the old UNIQUE constraint.
+CREATE OR REPLACE FUNCTION events_dedupe() RETURNS trigger AS $$
+BEGIN
+  IF NEW.source_id IS NULL OR NEW.occurred_at IS NULL THEN
+    RETURN NEW;
+  END IF;
+  INSERT INTO event_keys(source_id, title, occurred_at, event_id, detected_at)
+  VALUES (NEW.source_id, NEW.title, NEW.occurred_at, NEW.id, NEW.detected_at)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER events_dedupe BEFORE INSERT ON events
+  FOR EACH ROW EXECUTE FUNCTION events_dedupe();
+
+-- Create (idempotently) the partition for the month starting at month_start,
+-- moving any rows for that month out of the default partition first.  Recent
+-- partitions get a btree on detected_at; the ingest partition job swaps it
+-- for BRIN once the month is old and append-only.
+CREATE OR REPLACE FUNCTION ensure_event_partition(month_start date) RETURNS text AS $$
+DECLARE
+  first_day date := date_trunc('month', month_start)::date;
+  next_day date := (date_trunc('month', month_start) + interval '1 month')::date;
+  part text := format('events_p%s', to_char(month_start, 'YYYYMM'));
+BEGIN
+  IF to_regclass(part) IS NOT NULL THEN
+    RETURN part;
+  END IF;
+  EXECUTE format('CREATE TABLE %I (LIKE events INCLUDING DEFAULTS)', part);
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM events_default WHERE detected_at >= %L AND detected_at < %L RETURNING *) '
+    'INSERT INTO %I SELECT * FROM moved',
+    first_day, next_day, part
+  );
+  EXECUTE format('ALTER TABLE events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, first_day, next_day);
+  EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (detected_at DESC)', part || '_detected_at', part);
+  RETURN part;
+END $$ LANGUAGE plpgsql;
+
+-- Ensure partitions from months_back before the current month through
+-- months_ahead after it.
+CREATE OR REPLACE FUNCTION ensure_event_partitions(months_ahead int DEFAULT 3, months_back int DEFAULT 0)
+RETURNS SETOF text AS $$
+  SELECT ensure_event_partition((date_trunc('month', now()) + make_interval(months => m))::date)
+  FROM generate_series(-months_back, months_ahead) AS m;
+$$ LANGUAGE sql;
+
+SELECT ensure_event_partitions(3);
+
+-- MinHash signatures of recent events, compared against new arrivals by the
+-- near-duplicate job; rows older than its window are deleted.
+CREATE TABLE IF NOT EXISTS event_minhash (
+  event_id BIGINT PRIMARY KEY,
+  detected_at TIMESTAMPTZ NOT NULL,
+  sig BYTEA NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_event_minhash_detected_at ON event_minhash USING BRIN (detected_at);
 
 CREATE TYPE entity_type AS ENUM (
   'Person','Org','Vessel','Aircraft','Location','Asset','EventType'
@@ -42,14 +130,74 @@ CREATE TABLE IF NOT EXISTS entities (
   attrs JSONB DEFAULT '{}'::jsonb
 );
 
+-- event_id cannot reference the partitioned events table by id alone; rows of
+-- dropped partitions are removed by the ingest retention job.
+-- detected_at and event_type are copied from the event (events_link_fill) so
+-- entity timelines page through idx_event_entities_timeline alone.
 CREATE TABLE IF NOT EXISTS event_entities (
-  event_id BIGINT REFERENCES events(id) ON DELETE CASCADE,
+  event_id BIGINT NOT NULL,
   entity_id BIGINT REFERENCES entities(id) ON DELETE CASCADE,
   relation TEXT NOT NULL,
   score REAL,
+  detected_at TIMESTAMPTZ,
+  event_type event_type,
   PRIMARY KEY (event_id, entity_id, relation)
 );
 
+CREATE OR REPLACE FUNCTION events_link_fill() RETURNS trigger AS $$
+BEGIN
+  IF NEW.detected_at IS NULL OR NEW.event_type IS NULL THEN
+    SELECT e.detected_at, e.event_type INTO NEW.detected_at, NEW.event_type
+    FROM events e WHERE e.id = NEW.event_id;
+  END IF;
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE TRIGGER events_link_fill BEFORE INSERT ON event_entities
+  FOR EACH ROW EXECUTE FUNCTION events_link_fill();
+
+-- Entity typeahead caches in the API re-read the entities a statement
+-- touched; their ids go out in chunks that fit a NOTIFY payload
+-- (see services/api/app/suggest.py).
+CREATE OR REPLACE FUNCTION entities_notify_ids(ids BIGINT[]) RETURNS void AS $$
+DECLARE
+  chunk TEXT;
+BEGIN
+  FOR chunk IN
+    SELECT string_agg(id::text, ',' ORDER BY id)
+    FROM (SELECT id, (row_number() OVER (ORDER BY id) - 1) / 300 AS grp FROM unnest(ids) AS u(id)) c
+    GROUP BY grp
+  LOOP
+    PERFORM pg_notify('entities_changed', chunk);
+  END LOOP;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION entities_notify() RETURNS trigger AS $$
+BEGIN
+  IF TG_TABLE_NAME = 'entities' AND TG_OP = 'DELETE' THEN
+    PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT id FROM old_rows));
+  ELSIF TG_TABLE_NAME = 'entities' THEN
+    PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT id FROM new_rows));
+  ELSIF TG_OP = 'DELETE' THEN
+    PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT entity_id FROM old_rows WHERE entity_id IS NOT NULL));
+  ELSE
+    PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT entity_id FROM new_rows WHERE entity_id IS NOT NULL));
+  END IF;
+  RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+-- Transition tables allow one event per trigger.
+CREATE TRIGGER entities_notify_insert AFTER INSERT ON entities
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION entities_notify();
+CREATE TRIGGER entities_notify_update AFTER UPDATE ON entities
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION entities_notify();
+CREATE TRIGGER entities_notify_delete AFTER DELETE ON entities
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION entities_notify();
+CREATE TRIGGER event_entities_notify_insert AFTER INSERT ON event_entities
+  REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT EXECUTE FUNCTION entities_notify();
+CREATE TRIGGER event_entities_notify_delete AFTER DELETE ON event_entities
+  REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION entities_notify();
+
 CREATE TABLE IF NOT EXISTS relations (
   src_entity BIGINT REFERENCES entities(id) ON DELETE CASCADE,
   dst_entity BIGINT REFERENCES entities(id) ON DELETE CASCADE,
@@ -60,10 +208,92 @@ CREATE TABLE IF NOT EXISTS relations (
   PRIMARY KEY (src_entity, dst_entity, relation)
 );
 
--- Placeholder for vector embeddings table; integrate Qdrant later
+-- Event embeddings (float32 bytes) mirrored into Qdrant by app/vectors.py;
+-- max(event_id) per model is the embedding job's watermark.
 CREATE TABLE IF NOT EXISTS event_embeddings (
-  event_id BIGINT PRIMARY KEY REFERENCES events(id) ON DELETE CASCADE,
-  vector BYTEA
+  event_id BIGINT PRIMARY KEY,
+  vector BYTEA,
+  detected_at TIMESTAMPTZ,
+  model TEXT,
+  embedded_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_event_embeddings_model ON event_embeddings (model, event_id);
+CREATE INDEX IF NOT EXISTS idx_event_embeddings_detected_at ON event_embeddings (model, detected_at);
+
+-- Top-k related events per event (app/related.py), read by /events/{id}/related
+CREATE TABLE IF NOT EXISTS event_related (
+  event_id BIGINT PRIMARY KEY,
+  detected_at TIMESTAMPTZ NOT NULL,
+  related_ids BIGINT[] NOT NULL,
+  related_at TIMESTAMPTZ[] NOT NULL,
+  scores REAL[] NOT NULL,
+  computed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Operators' areas of interest; ingest matches new events against them
+-- (ingest/ingest/geofence.py) and records hits in geofence_alerts.
+CREATE TABLE IF NOT EXISTS geofences (
+  id BIGSERIAL PRIMARY KEY,
+  owner TEXT NOT NULL,
+  name TEXT NOT NULL,
+  kind TEXT,
+  geom geometry(MultiPolygon, 4326) NOT NULL,
+  active BOOLEAN NOT NULL DEFAULT true,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_geofences_geom ON geofences USING GIST(geom);
+CREATE INDEX IF NOT EXISTS idx_geofences_owner ON geofences (owner);
+
+CREATE TABLE IF NOT EXISTS geofence_alerts (
+  id BIGSERIAL PRIMARY KEY,
+  geofence_id BIGINT NOT NULL REFERENCES geofences(id) ON DELETE CASCADE,
+  event_id BIGINT NOT NULL,
+  event_detected_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  UNIQUE (geofence_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_geofence_alerts_fence ON geofence_alerts (geofence_id, id);
+
+-- Analysts' standing queries; ingest matches new events against them
+-- (ingest/ingest/percolate.py) and appends hits to saved_search_hits.
+-- seen_hit_id is the last hit the owner has read.
+CREATE TABLE IF NOT EXISTS saved_searches (
+  id BIGSERIAL PRIMARY KEY,
+  owner TEXT NOT NULL,
+  name TEXT NOT NULL,
+  q TEXT,
+  event_type TEXT,
+  source_id INT REFERENCES sources(id) ON DELETE CASCADE,
+  minlon DOUBLE PRECISION,
+  minlat DOUBLE PRECISION,
+  maxlon DOUBLE PRECISION,
+  maxlat DOUBLE PRECISION,
+  seen_hit_id BIGINT NOT NULL DEFAULT 0,
+  active BOOLEAN NOT NULL DEFAULT true,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_saved_searches_owner ON saved_searches (owner);
+
+CREATE TABLE IF NOT EXISTS saved_search_hits (
+  id BIGSERIAL PRIMARY KEY,
+  search_id BIGINT NOT NULL REFERENCES saved_searches(id) ON DELETE CASCADE,
+  event_id BIGINT NOT NULL,
+  event_detected_at TIMESTAMPTZ NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  UNIQUE (search_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_saved_search_hits_search ON saved_search_hits (search_id, id);
+
+-- HTTP validators and body hash of the last persisted fetch per feed URL,
+-- so unchanged feeds are skipped (ingest/ingest/common/client.py).
+CREATE TABLE IF NOT EXISTS feed_state (
+  url TEXT PRIMARY KEY,
+  etag TEXT,
+  last_modified TEXT,
+  content_hash TEXT,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
 );
 
 CREATE TABLE IF NOT EXISTS notebooks (
@@ -82,15 +312,25 @@ CREATE TABLE IF NOT EXISTS audit (
   ts TIMESTAMPTZ DEFAULT now()
 );
 
-CREATE INDEX IF NOT EXISTS idx_events_detected_at ON events(detected_at DESC);
+-- detected_at is indexed per partition (btree while recent, BRIN once old);
+-- see ensure_event_partition and ingest.partitions.
 CREATE INDEX IF NOT EXISTS idx_events_geom ON events USING GIST(geom);
 CREATE INDEX IF NOT EXISTS idx_entities_type_name ON entities(type, name);
+-- Typeahead: prefix matches on entity names, trigram matches on event titles
+CREATE INDEX IF NOT EXISTS idx_entities_name_prefix ON entities (lower(name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_events_title_trgm ON events USING GIN (lower(title) gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_event_entities_event ON event_entities(event_id);
+CREATE INDEX IF NOT EXISTS idx_event_entities_timeline
+  ON event_entities(entity_id, detected_at DESC, event_id DESC) INCLUDE (event_type, relation);
 CREATE INDEX IF NOT EXISTS idx_relations_src_dst ON relations(src_entity, dst_entity);
 CREATE INDEX IF NOT EXISTS idx_events_event_type_detected_at ON events(event_type, detected_at DESC);
 CREATE INDEX IF NOT EXISTS idx_events_source_detected_at ON events(source_id, detected_at DESC);
 CREATE INDEX IF NOT EXISTS idx_events_text_search ON events USING GIN (to_tsvector('simple', title || ' ' || coalesce(body,'')));
 CREATE INDEX IF NOT EXISTS idx_events_entities_gin ON events USING GIN (entities);
+-- Covering indexes so /events/hexbins aggregates with index-only scans
+CREATE INDEX IF NOT EXISTS idx_events_h3_r3 ON events(h3_r3, event_type) INCLUDE (detected_at, source_id) WHERE h3_r3 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_events_h3_r5 ON events(h3_r5, event_type) INCLUDE (detected_at, source_id) WHERE h3_r5 IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_events_h3_r7 ON events(h3_r7, event_type) INCLUDE (detected_at, source_id) WHERE h3_r7 IS NOT NULL;
 
 -- Seed minimal sample data so API returns non-empty results out-of-the-box
 DO $$
@@ -17,10 +17,10 @@ from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
 from typing import List, Optional
-from urllib import request
 from xml.etree import ElementTree as ET
 
 from . import common
+from .ingest.common.client import client
 
 
 # URL for the official ACSC advisories RSS feed
@@ -43,9 +43,7 @@ class Event:
 def fetch(url: str = FEED_URL) -> str:
     """Return the RSS feed located at ``url`` as a text string."""
 
-    req = request.Request(url, headers={"User-Agent": "AOID-Ingest/1.0"})
-    with request.urlopen(req, timeout=20) as resp:  # nosec - controlled URL
-        return resp.read().decode("utf-8", errors="ignore")
+    return client.fetch(url, conditional=False).text
 
 
 def parse(xml_text: str) -> List[Event]:
@@ -75,25 +73,17 @@ def insert_events(events: List[Event]) -> int:
     if not events:
         return 0
 
-    inserted = 0
+    # Events without a time are skipped; the rest go in one bulk insert
+    # (store advisory link as body for now).
+    rows = [
+        {"title": ev.title, "body": ev.source, "event_type": ev.type, "occurred_at": ev.time}
+        for ev in events
+        if ev.time
+    ]
     with common.get_conn() as conn:
         with conn.cursor() as cur:
             source_id = common.ensure_source(cur, "ACSC Alerts", FEED_URL, "cyber")
-            for ev in events:
-                if not ev.time:
-                    continue
-                if common.event_exists(cur, source_id, ev.title, ev.time):
-                    continue
-                res = common.insert_event(
-                    cur,
-                    source_id=source_id,
-                    title=ev.title,
-                    body=ev.source,  # store advisory link as body for now
-                    event_type=ev.type,
-                    occurred_at=ev.time,
-                )
-                if res is not None:
-                    inserted += 1
+            inserted = len(common.bulk_insert_events(cur, source_id, rows))
         conn.commit()
     return inserted
 
@@ -4,10 +4,10 @@ import logging
 import os
 from datetime import datetime
 from typing import List, Tuple
-from urllib import request
 from xml.etree import ElementTree as ET
 
 from ..common import store
+from ..common.client import client
 from ..common.schemas import RawPayload, NormalizedEvent
 
 logger = logging.getLogger(__name__)
@@ -18,17 +18,17 @@ def fetch_feed(url: str | None = None) -> RawPayload:
     feed_url = url or os.getenv("ACSC_RSS_URL")
     if not feed_url:
         raise SystemExit("ACSC_RSS_URL not set")
-    req = request.Request(feed_url, headers={"User-Agent": "AOID-Ingest/1.0"})
-    with request.urlopen(req, timeout=20) as resp:  # nosec - URL from env
-        content = resp.read()
-        ctype = resp.headers.get("Content-Type", "application/octet-stream")
+    result = client.fetch(feed_url)
+    if result.unchanged:
+        return result.payload(None)
+    content, ctype = result.content, result.content_type
     key = f"{datetime.utcnow().isoformat()}_payload.xml"
     try:
         store.put_raw("acsc-advisories", key, content, ctype)
     except Exception as exc:  # pragma: no cover - storage optional
         logger.warning("Failed to store raw payload: %s", exc)
     text = content.decode("utf-8", errors="ignore")
-    return RawPayload(source_name=feed_url, fetched_at=datetime.utcnow(), url=feed_url, content=text)
+    return result.payload(text)
 
 
 def normalize(raw: RawPayload) -> List[NormalizedEvent]:
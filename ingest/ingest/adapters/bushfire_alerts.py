@@ -5,9 +5,9 @@ import logging
 import os
 from datetime import datetime
 from typing import List, Tuple
-from urllib import request
 
 from ..common import store
+from ..common.client import client
 from ..common.schemas import RawPayload, NormalizedEvent
 
 logger = logging.getLogger(__name__)
@@ -18,15 +18,16 @@ def fetch_feed(url: str | None = None) -> RawPayload:
     feed_url = url or os.getenv("BUSHFIRE_FEED_URL")
     if not feed_url:
         raise SystemExit("BUSHFIRE_FEED_URL not set")
-    req = request.Request(feed_url, headers={"User-Agent": "AOID-Ingest/1.0"})
-    with request.urlopen(req, timeout=20) as resp:  # nosec - url from env
-        data = json.load(resp)
+    result = client.fetch(feed_url)
+    if result.unchanged:
+        return result.payload(None)
+    data = json.loads(result.content)
     key = f"{datetime.utcnow().isoformat()}_payload.json"
     try:
         store.put_raw("bushfire-alerts", key, json.dumps(data).encode("utf-8"), "application/json")
     except Exception as exc:  # pragma: no cover - storage optional
         logger.warning("Failed to store raw payload: %s", exc)
-    return RawPayload(source_name=feed_url, fetched_at=datetime.utcnow(), url=feed_url, content=data)
+    return result.payload(data)
 
 
 def normalize(raw: RawPayload) -> List[NormalizedEvent]:
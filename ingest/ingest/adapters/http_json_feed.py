@@ -5,8 +5,8 @@ import logging
 import os
 from datetime import datetime
 from typing import List, Tuple, Any
-from urllib import request
 from ..common import store
+from ..common.client import client
 
 from ..common.schemas import RawPayload, NormalizedEvent
 
@@ -18,9 +18,10 @@ def fetch_feed(url: str | None = None) -> RawPayload:
     feed_url = url or os.getenv("FEED_URL")
     if not feed_url:
         raise SystemExit("FEED_URL not set")
-    req = request.Request(feed_url, headers={"User-Agent": "AOID-Ingest/1.0"})
-    with request.urlopen(req, timeout=20) as resp:  # nosec - feed url is env-provided
-        data = json.load(resp)
+    result = client.fetch(feed_url)
+    if result.unchanged:
+        return result.payload(None)
+    data = json.loads(result.content)
 
     # store raw payload in MinIO
     key = f"{datetime.utcnow().isoformat()}_payload.json"
@@ -28,7 +29,7 @@ def fetch_feed(url: str | None = None) -> RawPayload:
         store.put_raw("http-json-feed", key, json.dumps(data).encode("utf-8"), "application/json")
     except Exception as e:
         logger.warning("Failed to store raw payload: %s", e)
-    return RawPayload(source_name=feed_url, fetched_at=datetime.utcnow(), url=feed_url, content=data)
+    return result.payload(data)
 
 
 def _extract_items(data: Any) -> List[Any]:
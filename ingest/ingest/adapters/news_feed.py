@@ -5,10 +5,10 @@ import logging
 import os
 from datetime import datetime
 from typing import List, Tuple
-from urllib import request
 from xml.etree import ElementTree as ET
 
 from ..common import store
+from ..common.client import client
 from ..common.schemas import RawPayload, NormalizedEvent
 
 logger = logging.getLogger(__name__)
@@ -19,10 +19,10 @@ def fetch_feed(url: str | None = None) -> RawPayload:
     feed_url = url or os.getenv("NEWS_FEED_URL")
     if not feed_url:
         raise SystemExit("NEWS_FEED_URL not set")
-    req = request.Request(feed_url, headers={"User-Agent": "AOID-Ingest/1.0"})
-    with request.urlopen(req, timeout=20) as resp:  # nosec - url from env
-        content = resp.read()
-        ctype = resp.headers.get("Content-Type", "application/octet-stream")
+    result = client.fetch(feed_url)
+    if result.unchanged:
+        return result.payload(None)
+    content, ctype = result.content, result.content_type
     key = f"{datetime.utcnow().isoformat()}_payload"
     try:
         store.put_raw("news-feed", key, content, ctype)
@@ -33,7 +33,7 @@ def fetch_feed(url: str | None = None) -> RawPayload:
         data = json.loads(text)
     except Exception:
         data = text
-    return RawPayload(source_name=feed_url, fetched_at=datetime.utcnow(), url=feed_url, content=data)
+    return result.payload(data)
 
 
 def normalize(raw: RawPayload) -> List[NormalizedEvent]:
@@ -0,0 +1,187 @@
+"""Move old monthly ``events`` partitions to Parquet in the raw object store.
+
+Postgres keeps only the hot window of events.  Each monthly partition older
+than ``EVENTS_ARCHIVE_AFTER_MONTHS`` (attached, or left detached by the
+retention job) is written to::
+
+    <EVENTS_ARCHIVE_URI>/events/year=YYYY/month=MM/events_pYYYYMM.parquet
+
+and then dropped from Postgres.  The API reads these files for time ranges
+that reach before the oldest partition still in Postgres (see
+``services/api/app/archive.py``), so historic queries keep working.
+
+``EVENTS_ARCHIVE_URI`` is ``s3://<bucket>/<prefix>`` for MinIO (default
+``s3://$MINIO_BUCKET/archive``) or a local directory path.  Entity links,
+embeddings and dedupe keys of archived events stay in Postgres; they are
+small and keep re-ingested items from being inserted again.
+
+    python -m ingest.archive --after-months 6 [--keep-partitions]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+from datetime import date
+from typing import List, Optional, Tuple
+
+import structlog
+
+from .common import db as dbmod
+from .partitions import add_months, month_of
+
+logger = structlog.get_logger(__name__)
+
+# Attached and detached monthly partitions alike.
+TABLES_SQL = r"""
+    SELECT c.relname, i.inhparent IS NOT NULL AS attached
+    FROM pg_class c
+    LEFT JOIN pg_inherits i ON i.inhrelid = c.oid
+    WHERE c.relkind = 'r' AND c.relname ~ '^events_p[0-9]{6}$'
+    ORDER BY c.relname
+"""
+
+SELECT_SQL = """
+    SELECT e.id, e.source_id, s.name, e.title, e.body, e.event_type::text,
+           e.occurred_at, e.detected_at, e.jurisdiction, e.confidence, e.severity,
+           CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END,
+           CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END,
+           e.cluster_id, e.raw::text
+    FROM "{table}" e
+    LEFT JOIN sources s ON s.id = e.source_id
+    ORDER BY e.detected_at, e.id
+"""
+
+
+def schema():
+    import pyarrow as pa
+
+    ts = pa.timestamp("us", tz="UTC")
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("source_id", pa.int32()),
+            ("source", pa.string()),
+            ("title", pa.string()),
+            ("body", pa.string()),
+            ("event_type", pa.string()),
+            ("occurred_at", ts),
+            ("detected_at", ts),
+            ("jurisdiction", pa.string()),
+            ("confidence", pa.float32()),
+            ("severity", pa.float32()),
+            ("lon", pa.float64()),
+            ("lat", pa.float64()),
+            ("cluster_id", pa.int64()),
+            ("raw", pa.string()),
+        ]
+    )
+
+
+def filesystem(uri: Optional[str] = None):
+    """Return ``(pyarrow filesystem, root path)`` for the archive location."""
+
+    from pyarrow import fs
+
+    uri = uri or os.getenv("EVENTS_ARCHIVE_URI") or f"s3://{os.getenv('MINIO_BUCKET', 'raw')}/archive"
+    if uri.startswith("s3://"):
+        s3 = fs.S3FileSystem(
+            access_key=os.getenv("MINIO_ROOT_USER", ""),
+            secret_key=os.getenv("MINIO_ROOT_PASSWORD", ""),
+            endpoint_override=f"{os.getenv('MINIO_HOST', 'minio')}:{os.getenv('MINIO_PORT', '9000')}",
+            scheme="http",
+        )
+        return s3, uri[len("s3://"):].rstrip("/")
+    return fs.LocalFileSystem(), os.path.abspath(uri.removeprefix("file://"))
+
+
+def object_path(root: str, table: str, month: date) -> str:
+    return f"{root}/events/year={month.year:04d}/month={month.month:02d}/{table}.parquet"
+
+
+def candidates(cur, after_months: int, today: date) -> List[Tuple[str, date, bool]]:
+    """Return ``(table, month, attached)`` for partitions older than the hot window."""
+
+    cutoff = add_months(date(today.year, today.month, 1), -after_months)
+    cur.execute(TABLES_SQL)
+    out = []
+    for name, attached in cur.fetchall():
+        month = month_of(name)
+        if month is not None and month < cutoff:
+            out.append((name, month, attached))
+    return out
+
+
+def write_partition(conn, table: str, path: str, fs, batch_size: int = 50_000) -> int:
+    """Stream ``table`` into a Parquet file at ``path``; return the row count."""
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sch = schema()
+    rows_written = 0
+    fs.create_dir(path.rsplit("/", 1)[0], recursive=True)
+    tmp = path + ".tmp"
+    with fs.open_output_stream(tmp) as sink:
+        writer = pq.ParquetWriter(sink, sch, compression="zstd")
+        try:
+            with conn.cursor(name=f"archive_{table}") as cur:
+                cur.execute(SELECT_SQL.format(table=table))
+                while True:
+                    rows = cur.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    columns = list(zip(*rows))
+                    writer.write_batch(
+                        pa.RecordBatch.from_arrays(
+                            [pa.array(col, type=field.type) for col, field in zip(columns, sch)],
+                            schema=sch,
+                        )
+                    )
+                    rows_written += len(rows)
+        finally:
+            writer.close()
+    fs.move(tmp, path)
+    return rows_written
+
+
+def archive_partition(conn, table: str, month: date, attached: bool, fs, root: str, keep: bool = False) -> int:
+    path = object_path(root, table, month)
+    written = write_partition(conn, table, path, fs)
+    with conn.cursor() as cur:
+        cur.execute(f'SELECT count(*) FROM "{table}"')
+        expected = cur.fetchone()[0]
+        if written != expected:
+            raise RuntimeError(f"{table}: wrote {written} rows, table has {expected}")
+        if not keep:
+            if attached:
+                cur.execute(f'ALTER TABLE events DETACH PARTITION "{table}"')
+            cur.execute(f'DROP TABLE "{table}"')
+    conn.commit()
+    logger.info("partition_archived", partition=table, rows=written, path=path, dropped=not keep)
+    return written
+
+
+def run(after_months: int = 6, uri: Optional[str] = None, keep: bool = False, today: Optional[date] = None) -> int:
+    today = today or date.today()
+    fs, root = filesystem(uri)
+    total = 0
+    with dbmod.get_conn() as conn:
+        with conn.cursor() as cur:
+            tables = candidates(cur, after_months, today)
+        conn.commit()
+        for table, month, attached in tables:
+            total += archive_partition(conn, table, month, attached, fs, root, keep)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Archive old events partitions to Parquet")
+    parser.add_argument("--after-months", type=int, default=int(os.getenv("EVENTS_ARCHIVE_AFTER_MONTHS", "6")))
+    parser.add_argument("--uri", default=None, help="archive location (default EVENTS_ARCHIVE_URI)")
+    parser.add_argument("--keep-partitions", action="store_true", help="write files but keep the tables")
+    args = parser.parse_args()
+    run(args.after_months, args.uri, args.keep_partitions)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ __all__ = [
     "get_conn",
     "ensure_source",
     "insert_event",
+    "bulk_insert_events",
     "event_exists",
     "parse_since",
 ]
@@ -27,6 +28,7 @@ __all__ = [
 # Re-export core database helpers -------------------------------------------------
 get_conn = db.get_conn
 ensure_source = db.ensure_source
+bulk_insert_events = db.bulk_insert_events
 
 
 def event_exists(cur, source_id: int, title: str, occurred_at: datetime) -> bool:
@@ -1,17 +1,81 @@
+import logging
 import os
-from typing import Optional
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 import psycopg
 
+from .geo import H3_COLUMNS, h3_cells
+
+logger = logging.getLogger(__name__)
+
+_pool = None
+
+
+def _dsn() -> str:
+    return os.getenv("DATABASE_URL", "postgresql://aoidb:aoidb@db:5432/aoidb")
+
+
+def _reset(conn) -> None:
+    # A job that died holding its advisory lock must not pass it on.  The
+    # pool discards connections the hook leaves in a transaction, so end it.
+    conn.execute("SELECT pg_advisory_unlock_all()")
+    conn.commit()
+
+
+def open_pool(max_size: int, timeout: float = 30.0):
+    """Route :func:`get_conn` through a shared connection pool.
+
+    Long-running processes (the scheduled runner) call this once so the
+    advisory-lock and ``persist`` connections of concurrent jobs are reused
+    instead of opened per job.  Needs ``psycopg-pool``; without it every
+    call keeps opening its own connection.
+    """
+
+    global _pool
+    if _pool is not None:
+        return _pool
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        logger.warning("psycopg-pool not installed; using one connection per job")
+        return None
+    _pool = ConnectionPool(
+        _dsn(), min_size=1, max_size=max_size, timeout=timeout, reset=_reset, name="ingest", open=True
+    )
+    return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
 
 def get_conn():
-    dsn = os.getenv("DATABASE_URL", "postgresql://aoidb:aoidb@db:5432/aoidb")
-    return psycopg.connect(dsn)
+    """A connection context manager: pooled after :func:`open_pool`, else new.
+
+    Both commit on a clean exit; a pooled connection is then returned to the
+    pool rather than closed.
+    """
+
+    if _pool is not None:
+        return _pool.connection()
+    return psycopg.connect(_dsn())
+
+
+# Source ids by name, cached once seen committed (found by SELECT); an id
+# inserted in a transaction that later rolls back is never cached.
+_source_ids: Dict[str, int] = {}
 
 
 def ensure_source(cur, name: str, url: Optional[str] = None, type_: Optional[str] = None) -> int:
+    cached = _source_ids.get(name)
+    if cached is not None:
+        return cached
     cur.execute("SELECT id FROM sources WHERE name=%s", (name,))
     row = cur.fetchone()
     if row:
+        _source_ids[name] = row[0]
         return row[0]
     cur.execute(
         "INSERT INTO sources(name, url, type) VALUES(%s,%s,%s) RETURNING id",
@@ -32,20 +96,28 @@ def insert_event(
     jurisdiction: Optional[str],
     confidence: Optional[float],
     severity: Optional[float],
-) -> int:
+) -> Optional[int]:
+    """Insert an event and return its id.
+
+    Returns ``None`` when the ``events_dedupe`` trigger skipped the row because
+    an event with the same ``(source_id, title, occurred_at)`` already exists.
+    """
     geom_wkt = None
     if lat is not None and lon is not None:
         geom_wkt = f"POINT({lon} {lat})"
     if geom_wkt:
+        # H3 cells are precomputed here so density maps never scan points.
         cur.execute(
-            """
+            f"""
             INSERT INTO events
-              (source_id, title, body, event_type, occurred_at, detected_at, geom, jurisdiction, confidence, severity)
+              (source_id, title, body, event_type, occurred_at, detected_at, geom, jurisdiction, confidence, severity,
+               {", ".join(H3_COLUMNS)})
             VALUES
-              (%s,%s,%s,%s::event_type,%s, now(), ST_GeogFromText(%s), %s, %s, %s)
+              (%s,%s,%s,%s::event_type,%s, now(), ST_GeogFromText(%s), %s, %s, %s, {", ".join(["%s"] * len(H3_COLUMNS))})
             RETURNING id
             """,
-            (source_id, title, body, event_type, occurred_at, geom_wkt, jurisdiction, confidence, severity),
+            (source_id, title, body, event_type, occurred_at, geom_wkt, jurisdiction, confidence, severity,
+             *h3_cells(lat, lon)),
         )
     else:
         cur.execute(
@@ -58,7 +130,96 @@ def insert_event(
             """,
             (source_id, title, body, event_type, occurred_at, jurisdiction, confidence, severity),
         )
-    return cur.fetchone()[0]
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+STAGE_COLUMNS = (
+    "ord", "title", "body", "event_type", "occurred_at", "lon", "lat", "jurisdiction", "confidence", "severity",
+) + H3_COLUMNS
+
+# Session-local staging table; emptied by every commit or rollback, and
+# truncated up front so batches sharing a transaction never see each other.
+STAGE_SQL = f"""
+    CREATE TEMP TABLE IF NOT EXISTS events_stage (
+      ord INT NOT NULL,
+      title TEXT NOT NULL,
+      body TEXT,
+      event_type TEXT,
+      occurred_at TIMESTAMPTZ,
+      lon DOUBLE PRECISION,
+      lat DOUBLE PRECISION,
+      jurisdiction TEXT,
+      confidence REAL,
+      severity REAL,
+      {", ".join(f"{c} BIGINT" for c in H3_COLUMNS)}
+    ) ON COMMIT DELETE ROWS;
+    TRUNCATE events_stage
+"""
+
+COPY_SQL = f"COPY events_stage ({', '.join(STAGE_COLUMNS)}) FROM STDIN"
+
+# Ids are drawn in the materialised ``staged`` CTE so inserted rows can be
+# mapped back to their batch position.  Keys already in event_keys are
+# filtered set-wise up front; the events_dedupe trigger still rejects
+# duplicates within the batch or from concurrent writers.
+BULK_INSERT_SQL = f"""
+    WITH staged AS MATERIALIZED (
+        SELECT nextval('events_id_seq') AS id, s.*
+        FROM events_stage s
+        WHERE s.occurred_at IS NULL OR NOT EXISTS (
+            SELECT 1 FROM event_keys k
+            WHERE k.source_id = %(source_id)s AND k.title = s.title AND k.occurred_at = s.occurred_at
+        )
+    ), ins AS (
+        INSERT INTO events
+          (id, source_id, title, body, event_type, occurred_at, detected_at, geom, jurisdiction, confidence,
+           severity, {", ".join(H3_COLUMNS)})
+        SELECT id, %(source_id)s, title, body, event_type::event_type, occurred_at, now(),
+               CASE WHEN lon IS NOT NULL AND lat IS NOT NULL
+                    THEN ST_SetSRID(ST_MakePoint(lon, lat), 4326)::geography END,
+               jurisdiction, confidence, severity, {", ".join(H3_COLUMNS)}
+        FROM staged
+        ORDER BY ord
+        RETURNING id
+    )
+    SELECT staged.ord, ins.id FROM ins JOIN staged ON staged.id = ins.id ORDER BY staged.ord
+"""
+
+
+def bulk_insert_events(cur, source_id: int, events: Sequence[Mapping]) -> List[Tuple[int, int]]:
+    """Insert a batch of events in three round trips; return ``(index, id)`` of new rows.
+
+    ``events`` are mappings with :func:`insert_event`'s keyword arguments
+    (missing keys are ``NULL``).  The batch is ``COPY``'d into a temporary
+    staging table and moved into ``events`` by one ``INSERT ... SELECT``;
+    duplicates of ``(source_id, title, occurred_at)`` are skipped as with
+    :func:`insert_event` and are absent from the result.
+    """
+
+    if not events:
+        return []
+    cur.execute(STAGE_SQL)
+    with cur.copy(COPY_SQL) as copy:
+        for i, ev in enumerate(events):
+            lat, lon = ev.get("lat"), ev.get("lon")
+            copy.write_row(
+                (
+                    i,
+                    ev["title"],
+                    ev.get("body"),
+                    ev.get("event_type") or "Other",
+                    ev.get("occurred_at"),
+                    lon,
+                    lat,
+                    ev.get("jurisdiction"),
+                    ev.get("confidence"),
+                    ev.get("severity"),
+                    *h3_cells(lat, lon),
+                )
+            )
+    cur.execute(BULK_INSERT_SQL, {"source_id": source_id})
+    return [(row[0], row[1]) for row in cur.fetchall()]
 
 
 def ensure_entity(cur, type_: str, name: str, attrs: Optional[dict] = None) -> int:
@@ -0,0 +1,44 @@
+"""H3 cell indexing for event coordinates.
+
+Each located event stores its H3 cell at a few resolutions (``h3_r3``,
+``h3_r5``, ``h3_r7``) so the API can aggregate density maps straight from an
+index instead of touching every point.  Cells are stored as the 64-bit H3
+integer; the API renders them as the usual hex string.
+
+``h3`` is optional: without it the columns are left ``NULL`` and
+:mod:`ingest.h3_backfill` fills them once the library is available.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Resolution 3 (~12,000 km² cells) suits national views, 5 (~250 km²) state
+# views and 7 (~5 km²) city views.
+H3_RESOLUTIONS: Tuple[int, ...] = (3, 5, 7)
+H3_COLUMNS: Tuple[str, ...] = tuple(f"h3_r{res}" for res in H3_RESOLUTIONS)
+
+
+@lru_cache(maxsize=1)
+def _h3():
+    try:
+        import h3
+    except ImportError:
+        return None
+    return h3
+
+
+def available() -> bool:
+    return _h3() is not None
+
+
+def h3_cells(lat: Optional[float], lon: Optional[float]) -> Tuple[Optional[int], ...]:
+    """Return the H3 cell of ``(lat, lon)`` at each of :data:`H3_RESOLUTIONS`.
+
+    All ``None`` when the point is missing or ``h3`` is not installed.
+    """
+
+    h3 = _h3()
+    if h3 is None or lat is None or lon is None:
+        return (None,) * len(H3_RESOLUTIONS)
+    return tuple(h3.str_to_int(h3.latlng_to_cell(lat, lon, res)) for res in H3_RESOLUTIONS)
@@ -8,6 +8,13 @@ class RawPayload(BaseModel):
     fetched_at: datetime
     url: Optional[str] = None
     content: Any
+    # HTTP validators and body hash, stored once the payload is persisted.
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Set when the feed has not changed since the last persisted fetch
+    # ("not_modified" or "same_content"); ``content`` is then empty.
+    unchanged: Optional[str] = None
 
 
 class NormalizedEvent(BaseModel):
@@ -1,20 +1,26 @@
 import io
 import logging
 import os
-from minio import Minio
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def _client():
+    # Built on first use so importing adapters does not load the MinIO SDK.
+    from minio import Minio
+
+    return Minio(
+        f"{os.getenv('MINIO_HOST', 'minio')}:{os.getenv('MINIO_PORT', '9000')}",
+        access_key=os.getenv('MINIO_ROOT_USER', ''),
+        secret_key=os.getenv('MINIO_ROOT_PASSWORD', ''),
+        secure=False,
+    )
 
-_MINIO_CLIENT = Minio(
-    f"{os.getenv('MINIO_HOST', 'minio')}:{os.getenv('MINIO_PORT', '9000')}",
-    access_key=os.getenv('MINIO_ROOT_USER', ''),
-    secret_key=os.getenv('MINIO_ROOT_PASSWORD', ''),
-    secure=False,
-)
-_BUCKET = os.getenv('MINIO_BUCKET', 'raw')
 
 def put_raw(source: str, key: str, data: bytes, content_type: str) -> str:
     object_key = f"{source}/{key}"
-    _MINIO_CLIENT.put_object(
-        _BUCKET,
+    _client().put_object(
+        os.getenv('MINIO_BUCKET', 'raw'),
         object_key,
         io.BytesIO(data),
         length=len(data),
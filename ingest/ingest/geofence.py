@@ -0,0 +1,113 @@
+"""Match newly ingested events against operators' geofences.
+
+Geofences (ports, critical infrastructure, LGAs, ...) are registered through
+the API and stored as PostGIS multipolygons in ``geofences``.  Rather than a
+``ST_Intersects`` query per event, :class:`GeofenceMatcher` keeps every active
+fence in a Shapely ``STRtree`` and tests a whole ingest batch of points in
+one bulk ``query(..., predicate="intersects")``: the tree narrows each point
+to the few fences whose envelopes contain it and only those are tested
+exactly, against geometries Shapely prepares once.  This keeps per-batch cost
+near ``O(points * log fences)`` with thousands of fences.
+
+The tree is rebuilt only when the fence set changes (``count``/``max(id)``/
+``max(updated_at)`` of active fences, checked once per batch).  Matches are
+written to ``geofence_alerts`` (one row per fence and event).
+
+``shapely`` is optional: without it matching is skipped with a warning.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+VERSION_SQL = "SELECT count(*), coalesce(max(id), 0), max(updated_at) FROM geofences WHERE active"
+
+FENCES_SQL = "SELECT id, ST_AsBinary(geom) FROM geofences WHERE active ORDER BY id"
+
+# Runs in the inserting transaction, where now() is the events' detected_at.
+ALERT_SQL = """
+    INSERT INTO geofence_alerts(geofence_id, event_id, event_detected_at)
+    VALUES (%s, %s, now())
+    ON CONFLICT (geofence_id, event_id) DO NOTHING
+"""
+
+
+@lru_cache(maxsize=1)
+def _shapely():
+    try:
+        import shapely
+    except ImportError:
+        logger.warning("geofences_disabled", reason="shapely not installed")
+        return None
+    return shapely
+
+
+def available() -> bool:
+    return _shapely() is not None
+
+
+class FenceIndex:
+    """STRtree over fence geometries with bulk point lookup."""
+
+    def __init__(self, ids: Sequence[int], geoms: Sequence) -> None:
+        shapely = _shapely()
+        self.ids = list(ids)
+        self.geoms = list(geoms)
+        shapely.prepare(self.geoms)
+        self.tree = shapely.STRtree(self.geoms)
+
+    @classmethod
+    def from_wkb(cls, rows: Sequence[Tuple[int, bytes]]) -> "FenceIndex":
+        shapely = _shapely()
+        return cls([r[0] for r in rows], shapely.from_wkb([bytes(r[1]) for r in rows]))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def match(self, lons: Sequence[float], lats: Sequence[float]) -> List[Tuple[int, int]]:
+        """``(point index, fence id)`` for every point inside (or on) a fence."""
+
+        if not self.ids or not len(lons):
+            return []
+        points = _shapely().points(list(zip(lons, lats)))
+        point_idx, fence_idx = self.tree.query(points, predicate="intersects")
+        return [(int(p), self.ids[f]) for p, f in zip(point_idx, fence_idx)]
+
+
+class GeofenceMatcher:
+    """Process-wide fence index, refreshed when the fence set changes."""
+
+    def __init__(self) -> None:
+        self.index: Optional[FenceIndex] = None
+        self._version = None
+
+    def refresh(self, cur) -> None:
+        cur.execute(VERSION_SQL)
+        version = tuple(cur.fetchone())
+        if version == self._version:
+            return
+        cur.execute(FENCES_SQL)
+        self.index = FenceIndex.from_wkb(cur.fetchall())
+        self._version = version
+        logger.info("geofences_loaded", fences=len(self.index))
+
+    def match_batch(self, cur, events: Sequence[Tuple[int, float, float]]) -> int:
+        """Record alerts for ``(event_id, lon, lat)`` rows; return how many matched."""
+
+        if not events or not available():
+            return 0
+        self.refresh(cur)
+        if not self.index:
+            return 0
+        hits = self.index.match([e[1] for e in events], [e[2] for e in events])
+        if hits:
+            cur.executemany(ALERT_SQL, [(fence_id, events[i][0]) for i, fence_id in hits])
+            logger.info("geofence_alerts", events=len(events), alerts=len(hits))
+        return len(hits)
+
+
+matcher = GeofenceMatcher()
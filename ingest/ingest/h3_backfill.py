@@ -0,0 +1,86 @@
+"""Backfill H3 cell columns for events that were stored without them.
+
+Events inserted before the H3 columns existed, or while the ``h3`` library
+was unavailable, have coordinates but ``NULL`` cells.  This job walks them in
+primary-key order and updates each batch with a single statement::
+
+    python -m ingest.h3_backfill --batch-size 5000
+"""
+from __future__ import annotations
+
+import argparse
+from typing import List, Tuple
+
+import structlog
+
+from .common import db as dbmod
+from .common.geo import H3_COLUMNS, available, h3_cells
+
+logger = structlog.get_logger(__name__)
+
+SELECT_SQL = f"""
+    SELECT id, ST_Y(geom::geometry) AS lat, ST_X(geom::geometry) AS lon
+    FROM events
+    WHERE geom IS NOT NULL AND {H3_COLUMNS[0]} IS NULL AND id > %s
+    ORDER BY id
+    LIMIT %s
+"""
+
+UPDATE_SQL = f"""
+    UPDATE events e
+    SET {", ".join(f"{col} = v.{col}" for col in H3_COLUMNS)}
+    FROM unnest(%s::bigint[], {", ".join(["%s::bigint[]"] * len(H3_COLUMNS))})
+         AS v(id, {", ".join(H3_COLUMNS)})
+    WHERE e.id = v.id
+"""
+
+
+def backfill_batch(cur, after_id: int, batch_size: int) -> Tuple[int, int]:
+    """Fill one batch of events with ``id > after_id``.
+
+    Returns ``(rows_updated, last_id)``; ``rows_updated`` is 0 when done.
+    """
+
+    cur.execute(SELECT_SQL, (after_id, batch_size))
+    rows = cur.fetchall()
+    if not rows:
+        return 0, after_id
+    ids: List[int] = []
+    columns: List[List] = [[] for _ in H3_COLUMNS]
+    for event_id, lat, lon in rows:
+        ids.append(event_id)
+        for idx, cell in enumerate(h3_cells(lat, lon)):
+            columns[idx].append(cell)
+    cur.execute(UPDATE_SQL, (ids, *columns))
+    return len(ids), ids[-1]
+
+
+def backfill(batch_size: int = 5000) -> int:
+    """Backfill every event missing H3 cells; return the number updated."""
+
+    if not available():
+        raise SystemExit("h3 is not installed; pip install h3 to backfill cells")
+    total = 0
+    last_id = 0
+    with dbmod.get_conn() as conn:
+        while True:
+            with conn.cursor() as cur:
+                updated, last_id = backfill_batch(cur, last_id, batch_size)
+            conn.commit()
+            if not updated:
+                break
+            total += updated
+            logger.info("h3_backfill_batch", updated=updated, total=total, last_id=last_id)
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill H3 cells for located events")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    total = backfill(args.batch_size)
+    logger.info("h3_backfill_complete", updated=total)
+
+
+if __name__ == "__main__":
+    main()
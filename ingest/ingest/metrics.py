@@ -0,0 +1,19 @@
+"""Prometheus collectors for the ingest runner.
+
+Collectors are module-level so they are registered once per process; the
+runner serves them on ``INGEST_METRICS_PORT`` when that is set.
+"""
+
+from prometheus_client import Counter
+
+RUNS_COUNTER = Counter(
+    "ingest_runs_total",
+    "Adapter runs by outcome (persisted, skipped or failed)",
+    ("adapter", "outcome"),
+)
+
+SKIPPED_COUNTER = Counter(
+    "ingest_runs_skipped_total",
+    "Adapter runs skipped because the feed had not changed",
+    ("adapter", "reason"),
+)
@@ -0,0 +1,157 @@
+"""Maintenance of the monthly ``events`` partitions.
+
+``events`` is range partitioned by month on ``detected_at`` (see
+``infra/db/init/01_schema.sql``).  This job keeps it healthy:
+
+* **ensure** – create the partitions for the next few months ahead of time
+  (the ``ensure_event_partitions`` SQL function is idempotent), so inserts
+  never land in ``events_default``.
+* **brin** – once a month is old enough to be effectively append-only, swap
+  its btree on ``detected_at`` for a BRIN index, which is a tiny fraction of
+  the size and just as selective on time-ordered data.
+* **retention** – detach (default) or drop partitions older than the
+  retention window.  Detached partitions stay as standalone tables
+  (``events_pYYYYMM``) for archiving; dropped partitions also have their
+  entity links, embeddings and dedupe keys removed.
+
+Run everything with ``python -m ingest.partitions``; configuration comes from
+``EVENTS_PARTITIONS_AHEAD`` (default 3), ``EVENTS_BRIN_AFTER_MONTHS``
+(default 2), ``EVENTS_RETENTION_MONTHS`` (default 0, keep forever) and
+``EVENTS_RETENTION_MODE`` (``detach`` or ``drop``).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+import structlog
+
+from .common import db as dbmod
+
+logger = structlog.get_logger(__name__)
+
+_PARTITION_RE = re.compile(r"^events_p(\d{4})(\d{2})$")
+
+LIST_SQL = """
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_class p ON p.oid = i.inhparent
+    WHERE p.relname = 'events'
+    ORDER BY c.relname
+"""
+
+
+def month_of(name: str) -> Optional[date]:
+    """Return the first day of the month a partition named ``events_pYYYYMM`` holds."""
+
+    match = _PARTITION_RE.match(name)
+    if not match:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+def add_months(day: date, months: int) -> date:
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def list_partitions(cur) -> List[Tuple[str, date]]:
+    """Return ``(name, month)`` for every attached monthly partition."""
+
+    cur.execute(LIST_SQL)
+    out = []
+    for (name,) in cur.fetchall():
+        month = month_of(name)
+        if month is not None:
+            out.append((name, month))
+    return out
+
+
+def ensure(cur, months_ahead: int) -> None:
+    cur.execute("SELECT ensure_event_partitions(%s)", (months_ahead,))
+    created = [row[0] for row in cur.fetchall()]
+    logger.info("partitions_ensured", months_ahead=months_ahead, partitions=len(created))
+
+
+def brin_old(cur, after_months: int, today: date) -> List[str]:
+    """Replace the ``detected_at`` btree with BRIN on partitions older than ``after_months``."""
+
+    cutoff = add_months(date(today.year, today.month, 1), -after_months)
+    converted = []
+    for name, month in list_partitions(cur):
+        if month >= cutoff:
+            continue
+        cur.execute("SELECT to_regclass(%s) IS NOT NULL", (f"{name}_detected_at",))
+        if not cur.fetchone()[0]:
+            continue
+        cur.execute(f'CREATE INDEX IF NOT EXISTS "{name}_detected_at_brin" ON "{name}" USING brin (detected_at)')
+        cur.execute(f'DROP INDEX IF EXISTS "{name}_detected_at"')
+        converted.append(name)
+        logger.info("partition_brin", partition=name)
+    return converted
+
+
+def apply_retention(cur, keep_months: int, mode: str, today: date) -> List[str]:
+    """Detach or drop partitions whose whole month is older than ``keep_months``."""
+
+    if keep_months <= 0:
+        return []
+    if mode not in ("detach", "drop"):
+        raise ValueError(f"unknown retention mode {mode!r}")
+    cutoff = add_months(date(today.year, today.month, 1), -keep_months)
+    expired = []
+    for name, month in list_partitions(cur):
+        if add_months(month, 1) > cutoff:
+            continue
+        cur.execute(f'ALTER TABLE events DETACH PARTITION "{name}"')
+        if mode == "drop":
+            cur.execute(f'DELETE FROM event_entities WHERE event_id IN (SELECT id FROM "{name}")')
+            cur.execute(f'DELETE FROM event_embeddings WHERE event_id IN (SELECT id FROM "{name}")')
+            cur.execute(f'DELETE FROM event_related WHERE event_id IN (SELECT id FROM "{name}")')
+            cur.execute(f'DROP TABLE "{name}"')
+        expired.append(name)
+        logger.info("partition_expired", partition=name, mode=mode)
+    if expired:
+        # Keys of expired months no longer need to block re-ingestion.
+        cur.execute("DELETE FROM event_keys WHERE detected_at < %s", (cutoff,))
+    return expired
+
+
+def run(
+    months_ahead: int = 3,
+    brin_after_months: int = 2,
+    retention_months: int = 0,
+    retention_mode: str = "detach",
+    today: Optional[date] = None,
+) -> None:
+    today = today or date.today()
+    with dbmod.get_conn() as conn:
+        with conn.cursor() as cur:
+            ensure(cur, months_ahead)
+            conn.commit()
+            brin_old(cur, brin_after_months, today)
+            conn.commit()
+            apply_retention(cur, retention_months, retention_mode, today)
+        conn.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Maintain monthly events partitions")
+    parser.add_argument("--months-ahead", type=int, default=int(os.getenv("EVENTS_PARTITIONS_AHEAD", "3")))
+    parser.add_argument("--brin-after-months", type=int, default=int(os.getenv("EVENTS_BRIN_AFTER_MONTHS", "2")))
+    parser.add_argument("--retention-months", type=int, default=int(os.getenv("EVENTS_RETENTION_MONTHS", "0")))
+    parser.add_argument(
+        "--retention-mode",
+        choices=("detach", "drop"),
+        default=os.getenv("EVENTS_RETENTION_MODE", "detach"),
+    )
+    args = parser.parse_args()
+    run(args.months_ahead, args.brin_after_months, args.retention_months, args.retention_mode)
+
+
+if __name__ == "__main__":
+    main()
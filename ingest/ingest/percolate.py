@@ -0,0 +1,212 @@
+"""Standing queries: match each ingest batch against every saved search.
+
+Analysts save searches (``q`` text, event type, source, bbox) through the API.
+Instead of re-running them, :class:`Percolator` inverts the problem: each
+batch ``persist`` inserts is matched against all saved searches in memory
+and hits are appended to ``saved_search_hits``, so "what's new for my search"
+is an indexed read of that table.
+
+Every search is filed under one *primary* index and then verified on its
+remaining criteria:
+
+* ``q`` — text searches use the same case-insensitive substring semantics as
+  ``/events?q=`` (``ILIKE '%q%'`` on title or body).  Any text containing
+  ``q`` contains every character trigram of ``q``, so each search is indexed
+  under one of its trigrams (the one with the shortest posting list when it
+  was added) and an event only looks up the trigrams it contains.
+* ``bbox`` — searches without text go into a Shapely ``STRtree`` of their
+  boxes, queried once per batch with all located points.
+* ``event_type`` / ``source_id`` — dictionary lookups.
+* no criteria — checked against every event.
+
+The index is rebuilt when the set of active searches changes (checked once
+per batch).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import structlog
+
+from . import geofence
+
+logger = structlog.get_logger(__name__)
+
+VERSION_SQL = "SELECT count(*), coalesce(max(id), 0), max(updated_at) FROM saved_searches WHERE active"
+
+SEARCHES_SQL = """
+    SELECT id, q, event_type, source_id, minlon, minlat, maxlon, maxlat
+    FROM saved_searches
+    WHERE active
+    ORDER BY id
+"""
+
+# Runs in the inserting transaction, where now() is the events' detected_at.
+HIT_SQL = """
+    INSERT INTO saved_search_hits(search_id, event_id, event_detected_at)
+    VALUES (%s, %s, now())
+    ON CONFLICT (search_id, event_id) DO NOTHING
+"""
+
+BBox = Tuple[float, float, float, float]
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def event_fields(ev, source_id: int) -> Dict:
+    """The fields saved searches filter on, from a ``NormalizedEvent``."""
+
+    return {
+        "title": ev.title,
+        "body": ev.body,
+        "event_type": ev.event_type,
+        "source_id": source_id,
+        "lon": ev.lon,
+        "lat": ev.lat,
+    }
+
+
+class Search:
+    __slots__ = ("id", "q", "event_type", "source_id", "bbox")
+
+    def __init__(self, id: int, q=None, event_type=None, source_id=None, bbox: Optional[BBox] = None) -> None:
+        self.id = id
+        self.q = q.strip().lower() if q and q.strip() else None
+        self.event_type = event_type or None
+        self.source_id = source_id or None
+        self.bbox = bbox
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> "Search":
+        sid, q, event_type, source_id, *box = row
+        return cls(sid, q, event_type, source_id, tuple(box) if None not in box else None)
+
+    def matches(self, ev: Dict) -> bool:
+        if self.event_type is not None and ev.get("event_type") != self.event_type:
+            return False
+        if self.source_id is not None and ev.get("source_id") != self.source_id:
+            return False
+        if self.bbox is not None:
+            lon, lat = ev.get("lon"), ev.get("lat")
+            if lon is None or lat is None:
+                return False
+            minlon, minlat, maxlon, maxlat = self.bbox
+            if not (minlon <= lon <= maxlon and minlat <= lat <= maxlat):
+                return False
+        if self.q is not None:
+            if self.q not in (ev.get("title") or "").lower() and self.q not in (ev.get("body") or "").lower():
+                return False
+        return True
+
+
+class QueryIndex:
+    """Saved searches filed by trigram, bbox, type and source."""
+
+    def __init__(self, searches: Iterable[Search]) -> None:
+        self.searches: Dict[int, Search] = {}
+        self.by_trigram: Dict[str, List[int]] = defaultdict(list)
+        self.short_text: List[int] = []
+        self.by_type: Dict[str, List[int]] = defaultdict(list)
+        self.by_source: Dict[int, List[int]] = defaultdict(list)
+        self.match_all: List[int] = []
+        boxed: List[Search] = []
+        for s in searches:
+            self.searches[s.id] = s
+            if s.q is not None:
+                grams = trigrams(s.q)
+                if grams:
+                    key = min(sorted(grams), key=lambda g: len(self.by_trigram.get(g, ())))
+                    self.by_trigram[key].append(s.id)
+                else:
+                    self.short_text.append(s.id)
+            elif s.bbox is not None:
+                boxed.append(s)
+            elif s.event_type is not None:
+                self.by_type[s.event_type].append(s.id)
+            elif s.source_id is not None:
+                self.by_source[s.source_id].append(s.id)
+            else:
+                self.match_all.append(s.id)
+        self.box_ids = [s.id for s in boxed]
+        self.tree = None
+        if boxed and geofence.available():
+            import shapely
+
+            self.tree = shapely.STRtree(shapely.box(*zip(*[s.bbox for s in boxed])))
+        elif boxed:
+            # No spatial index available: verify boxed searches on every event.
+            self.match_all.extend(self.box_ids)
+
+    def __len__(self) -> int:
+        return len(self.searches)
+
+    def _boxed_candidates(self, events: Sequence[Dict]) -> Dict[int, List[int]]:
+        out: Dict[int, List[int]] = defaultdict(list)
+        if self.tree is None:
+            return out
+        located = [i for i, ev in enumerate(events) if ev.get("lon") is not None and ev.get("lat") is not None]
+        if not located:
+            return out
+        import shapely
+
+        points = shapely.points([(events[i]["lon"], events[i]["lat"]) for i in located])
+        point_idx, box_idx = self.tree.query(points, predicate="intersects")
+        for p, b in zip(point_idx, box_idx):
+            out[located[p]].append(self.box_ids[b])
+        return out
+
+    def match(self, events: Sequence[Dict]) -> List[Tuple[int, int]]:
+        """``(event index, search id)`` for every saved search each event satisfies."""
+
+        boxed = self._boxed_candidates(events)
+        hits = []
+        for i, ev in enumerate(events):
+            candidates = set(self.match_all)
+            candidates.update(self.short_text)
+            candidates.update(boxed.get(i, ()))
+            candidates.update(self.by_type.get(ev.get("event_type"), ()))
+            candidates.update(self.by_source.get(ev.get("source_id"), ()))
+            if self.by_trigram:
+                text = trigrams((ev.get("title") or "").lower()) | trigrams((ev.get("body") or "").lower())
+                for gram in text:
+                    candidates.update(self.by_trigram.get(gram, ()))
+            hits.extend((i, sid) for sid in sorted(candidates) if self.searches[sid].matches(ev))
+        return hits
+
+
+class Percolator:
+    """Process-wide saved-search index, refreshed when searches change."""
+
+    def __init__(self) -> None:
+        self.index: Optional[QueryIndex] = None
+        self._version = None
+
+    def refresh(self, cur) -> None:
+        cur.execute(VERSION_SQL)
+        version = tuple(cur.fetchone())
+        if version == self._version:
+            return
+        cur.execute(SEARCHES_SQL)
+        self.index = QueryIndex(Search.from_row(r) for r in cur.fetchall())
+        self._version = version
+        logger.info("saved_searches_loaded", searches=len(self.index))
+
+    def match_batch(self, cur, events: Sequence[Tuple[int, Dict]]) -> int:
+        """Record hits for ``(event_id, event)`` rows; return how many matched."""
+
+        if not events:
+            return 0
+        self.refresh(cur)
+        if not self.index:
+            return 0
+        hits = self.index.match([ev for _, ev in events])
+        if hits:
+            cur.executemany(HIT_SQL, [(sid, events[i][0]) for i, sid in hits])
+            logger.info("saved_search_hits", events=len(events), hits=len(hits))
+        return len(hits)
+
+
+percolator = Percolator()
@@ -7,12 +7,12 @@ import pathlib
 from typing import List, Tuple, Type
 
 import structlog
-from minio import Minio
 from tenacity import retry, stop_after_attempt, wait_fixed
 
 from .adapters.base import Adapter, RawItem
 from .adapters.bom import BOMAdapter
 from .adapters.qfes import QFESAdapter
+from . import geofence, percolate
 from .common import db as dbmod
 from .common.schemas import NormalizedEvent
 
@@ -41,6 +41,8 @@ def _store_raw(adapter_name: str, items: List[RawItem]) -> None:
 
     endpoint = os.getenv("MINIO_ENDPOINT")
     if endpoint:
+        from minio import Minio
+
         client = Minio(
             endpoint,
             access_key=os.getenv("MINIO_ACCESS_KEY"),
@@ -71,25 +73,30 @@ def persist(
 ) -> int:
     """Persist normalised events into the database."""
 
-    count = 0
     with dbmod.get_conn() as conn:
         with conn.cursor() as cur:
             source_id = dbmod.ensure_source(cur, source_name, source_url, source_type)
-            for ev in events:
-                dbmod.insert_event(
-                    cur,
-                    source_id=source_id,
-                    title=ev.title,
-                    body=ev.body,
-                    event_type=ev.event_type,
-                    occurred_at=ev.occurred_at.isoformat() if ev.occurred_at else None,
-                    lat=ev.lat,
-                    lon=ev.lon,
-                    jurisdiction=ev.jurisdiction,
-                    confidence=ev.confidence,
-                    severity=ev.severity,
-                )
-                count += 1
+            # One COPY + INSERT ... SELECT for the whole batch.
+            rows = [ev.model_dump(exclude={"attrs"}) for ev in events]
+            inserted = [(event_id, events[i]) for i, event_id in dbmod.bulk_insert_events(cur, source_id, rows)]
+            count = len(inserted)
+            located = [
+                (event_id, ev.lon, ev.lat) for event_id, ev in inserted if ev.lat is not None and ev.lon is not None
+            ]
+            if located and os.getenv("ENABLE_GEOFENCES", "true").lower() == "true":
+                # A matcher failure must not lose the batch: roll back to a savepoint.
+                try:
+                    with conn.transaction():
+                        geofence.matcher.match_batch(cur, located)
+                except Exception as exc:
+                    logger.warning("geofence_match_failed", error=str(exc))
+            if inserted and os.getenv("ENABLE_SAVED_SEARCHES", "true").lower() == "true":
+                try:
+                    with conn.transaction():
+                        rows = [(event_id, percolate.event_fields(ev, source_id)) for event_id, ev in inserted]
+                        percolate.percolator.match_batch(cur, rows)
+                except Exception as exc:
+                    logger.warning("saved_search_match_failed", error=str(exc))
         conn.commit()
     return count
 
@@ -3,14 +3,18 @@ from __future__ import annotations
 import importlib
 import hashlib
 import os
+import random
+import time
 from contextlib import contextmanager
+from datetime import datetime, timedelta
 
-from apscheduler.schedulers.blocking import BlockingScheduler
 import structlog
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import Retrying, stop_after_attempt, stop_after_delay, wait_exponential
 
 from ingest.ingest import run as run_mod
 from ingest.common import db as dbmod
+from ingest.ingest.common.client import client as feed_client
+from ingest.ingest.metrics import RUNS_COUNTER, SKIPPED_COUNTER
 
 logger = structlog.get_logger(__name__)
 
@@ -38,42 +42,138 @@ def _advisory_lock(name: str):
                 conn.commit()
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=60))
-def _fetch_with_retry(mod):
-    return mod.fetch_feed()
+class AdapterTimeout(Exception):
+    """An adapter used up its time budget before reaching ``persist``."""
 
 
-def _run_adapter(name: str, mod):
-    raw = _fetch_with_retry(mod)
+def _adapter_timeout(name: str) -> float:
+    return float(os.getenv(f"{name.upper()}_TIMEOUT_SECONDS", os.getenv("INGEST_TIMEOUT_SECONDS", "300")))
+
+
+def _fetch_with_retry(mod, timeout: float):
+    retrying = Retrying(
+        stop=stop_after_attempt(3) | stop_after_delay(timeout),
+        wait=wait_exponential(multiplier=1, min=1, max=60),
+    )
+    return retrying(mod.fetch_feed)
+
+
+def _run_adapter(name: str, mod, timeout: float):
+    """Fetch, normalise and persist one adapter within ``timeout`` seconds.
+
+    Worker threads cannot be interrupted, so the budget is enforced between
+    steps: retries stop once it is spent and a run that overran while
+    fetching or parsing is dropped before it writes anything.
+    """
+
+    started = time.monotonic()
+    raw = _fetch_with_retry(mod, timeout)
+    unchanged = getattr(raw, "unchanged", None)
+    if unchanged:
+        # Most ticks end here: no parse, raw copy or database work.
+        SKIPPED_COUNTER.labels(name, unchanged).inc()
+        RUNS_COUNTER.labels(name, "skipped").inc()
+        logger.info(
+            "feed_unchanged", adapter=name, reason=unchanged, duration_ms=round((time.monotonic() - started) * 1000)
+        )
+        return
     events = mod.normalize(raw)
+    elapsed = time.monotonic() - started
+    if elapsed > timeout:
+        raise AdapterTimeout(f"{name} took {elapsed:.0f}s of its {timeout:.0f}s budget before persist")
     meta = mod.get_source_meta()
     inserted = run_mod.persist(events, *meta)
-    logger.info("ingest_complete", adapter=name, events=len(events), inserted=inserted)
+    if hasattr(raw, "etag"):
+        feed_client.commit(raw)
+    RUNS_COUNTER.labels(name, "persisted").inc()
+    logger.info(
+        "ingest_complete",
+        adapter=name,
+        events=len(events),
+        inserted=inserted,
+        duration_ms=round((time.monotonic() - started) * 1000),
+    )
 
 
-def _job(name: str, mod):
+def _job(name: str, mod, timeout: float = 300.0):
     with _advisory_lock(name) as acquired:
         if not acquired:
             logger.info("skipping_locked", adapter=name)
             return
         try:
-            _run_adapter(name, mod)
+            _run_adapter(name, mod, timeout)
+        except AdapterTimeout as exc:
+            RUNS_COUNTER.labels(name, "timeout").inc()
+            logger.warning("adapter_timeout", adapter=name, error=str(exc))
         except Exception as exc:  # pragma: no cover - logged
+            RUNS_COUNTER.labels(name, "failed").inc()
             logger.exception("adapter_failed", adapter=name, error=str(exc))
 
 
-def _schedule_all(sched: BlockingScheduler) -> None:
+def _partitions_job():
+    with _advisory_lock("partitions") as acquired:
+        if not acquired:
+            logger.info("skipping_locked", job="partitions")
+            return
+        try:
+            from ingest.ingest import partitions
+
+            partitions.run(
+                months_ahead=int(os.getenv("EVENTS_PARTITIONS_AHEAD", "3")),
+                brin_after_months=int(os.getenv("EVENTS_BRIN_AFTER_MONTHS", "2")),
+                retention_months=int(os.getenv("EVENTS_RETENTION_MONTHS", "0")),
+                retention_mode=os.getenv("EVENTS_RETENTION_MODE", "detach"),
+            )
+        except Exception as exc:  # pragma: no cover - logged
+            logger.exception("partitions_failed", error=str(exc))
+
+
+def _archive_job():
+    with _advisory_lock("archive") as acquired:
+        if not acquired:
+            logger.info("skipping_locked", job="archive")
+            return
+        try:
+            from ingest.ingest import archive
+
+            archive.run(after_months=int(os.getenv("EVENTS_ARCHIVE_AFTER_MONTHS", "6")))
+        except Exception as exc:  # pragma: no cover - logged
+            logger.exception("archive_failed", error=str(exc))
+
+
+def _schedule_all(sched) -> None:
     adapters = {
         "acsc": "ingest.adapters.acsc_adapter",
         "bom": "ingest.adapters.bom_warnings_adapter",
     }
+    jitter = int(os.getenv("INGEST_JITTER_SECONDS", "60"))
     for name, mod_path in adapters.items():
         if os.getenv(f"ENABLE_{name.upper()}", "false").lower() != "true":
             continue
         interval = int(os.getenv(f"{name.upper()}_INTERVAL_MINUTES", "15"))
+        timeout = _adapter_timeout(name)
         mod = importlib.import_module(mod_path)
-        sched.add_job(_job, "interval", minutes=interval, args=[name, mod], id=name)
-        logger.info("scheduled", adapter=name, minutes=interval)
+        # A random phase plus per-run jitter keeps same-interval adapters
+        # from all hitting the network and the database in the same second.
+        offset = random.uniform(0, min(jitter, interval * 60))
+        sched.add_job(
+            _job,
+            "interval",
+            minutes=interval,
+            jitter=jitter or None,
+            start_date=datetime.now() + timedelta(seconds=offset),
+            args=[name, mod, timeout],
+            id=name,
+        )
+        logger.info("scheduled", adapter=name, minutes=interval, timeout=timeout, offset=round(offset))
+    if os.getenv("ENABLE_PARTITIONS", "true").lower() == "true":
+        hours = int(os.getenv("PARTITIONS_INTERVAL_HOURS", "24"))
+        sched.add_job(_partitions_job, "interval", hours=hours, id="partitions", next_run_time=datetime.now())
+        logger.info("scheduled", job="partitions", hours=hours)
+    if os.getenv("ENABLE_ARCHIVE", "false").lower() == "true":
+        hours = int(os.getenv("ARCHIVE_INTERVAL_HOURS", "24"))
+        sched.add_job(_archive_job, "interval", hours=hours, id="archive")
+        logger.info("scheduled", job="archive", hours=hours)
 
 
 def main() -> None:
@@ -84,10 +184,30 @@ def main() -> None:
             structlog.processors.JSONRenderer(),
         ]
     )
-    scheduler = BlockingScheduler()
+    from apscheduler.executors.pool import ThreadPoolExecutor
+    from apscheduler.schedulers.blocking import BlockingScheduler
+
+    # Jobs run concurrently on a bounded pool; each holds at most two pooled
+    # connections (its advisory lock and persist), so the pool is sized to
+    # match and extra jobs wait for a worker rather than opening connections.
+    workers = int(os.getenv("INGEST_WORKERS", "4"))
+    metrics_port = int(os.getenv("INGEST_METRICS_PORT", "0"))
+    if metrics_port:
+        from prometheus_client import start_http_server
+
+        start_http_server(metrics_port)
+    dbmod.open_pool(max_size=2 * workers)
+    scheduler = BlockingScheduler(
+        executors={"default": ThreadPoolExecutor(workers)},
+        job_defaults={"coalesce": True, "max_instances": 1, "misfire_grace_time": 300},
+    )
     _schedule_all(scheduler)
-    logger.info("runner_started")
-    scheduler.start()
+    logger.info("runner_started", workers=workers)
+    try:
+        scheduler.start()
+    finally:
+        feed_client.close()
+        dbmod.close_pool()
 
 
 if __name__ == "__main__":  # pragma: no cover - entry point
@@ -32,26 +32,52 @@ from ingest.adapters import (
 )
 
 
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class FakeCursor:
     def __init__(self):
         self._fetch = None
+        self._rows = []
+        self.staged = []
         self.last_id = 0
 
-    def execute(self, query, params):
+    def execute(self, query, params=None):
         q = query.strip()
         if q.startswith("SELECT id FROM sources"):
             self._fetch = (1,)
         elif q.startswith("INSERT INTO sources"):
             self._fetch = (1,)
-        elif q.startswith("INSERT INTO events"):
-            self.last_id += 1
-            self._fetch = (self.last_id,)
+        elif q.endswith("TRUNCATE events_stage"):
+            self.staged.clear()
+        elif q.startswith("WITH staged"):
+            self._rows = []
+            for row in self.staged:
+                self.last_id += 1
+                self._rows.append((row[0], self.last_id))
         else:
             self._fetch = None
 
+    def copy(self, sql):
+        return FakeCopy(self.staged)
+
     def fetchone(self):
         return self._fetch
 
+    def fetchall(self):
+        return self._rows
+
     def __enter__(self):
         return self
 
@@ -144,3 +170,42 @@ def test_bom_warnings_adapter_normalizes_and_persists():
     assert all(ev.event_type == "weather" for ev in events)
     count = _persist(events, bom_warnings_adapter.get_source_meta("http://example"))
     assert count == len(events)
+
+
+def test_bulk_insert_is_one_copy_and_one_insert():
+    from ingest.common import db as dbmod
+
+    cur = FakeCursor()
+    sql = []
+    execute = cur.execute
+    cur.execute = lambda query, params=None: sql.append(query.strip().split()[0]) or execute(query, params)
+    rows = [{"title": f"event {i}", "lat": -27.5, "lon": 153.0} for i in range(500)]
+    result = dbmod.bulk_insert_events(cur, 1, rows)
+    assert [i for i, _ in result] == list(range(500))
+    assert sql == ["CREATE", "WITH"]
+    assert cur.last_id == 500
+
+
+def test_bulk_insert_batches_share_a_transaction():
+    from ingest.common import db as dbmod
+
+    # Staged rows live until commit, so each batch must start from an empty stage.
+    cur = FakeCursor()
+    first = dbmod.bulk_insert_events(cur, 1, [{"title": f"a {i}"} for i in range(3)])
+    second = dbmod.bulk_insert_events(cur, 1, [{"title": f"b {i}"} for i in range(2)])
+    assert first == [(0, 1), (1, 2), (2, 3)]
+    assert second == [(0, 4), (1, 5)]
+    assert [row[1] for row in cur.staged] == ["b 0", "b 1"]
+
+
+def test_ensure_source_is_cached_once_committed(monkeypatch):
+    from ingest.common import db as dbmod
+
+    monkeypatch.setattr(dbmod, "_source_ids", {})
+    cur = FakeCursor()
+    calls = []
+    execute = cur.execute
+    cur.execute = lambda query, params=None: calls.append(query) or execute(query, params)
+    assert dbmod.ensure_source(cur, "ACSC") == 1
+    assert dbmod.ensure_source(cur, "ACSC") == 1
+    assert len(calls) == 1
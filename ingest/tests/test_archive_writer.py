@@ -0,0 +1,100 @@
+import pathlib
+import sys
+from datetime import date, datetime, timezone
+
+import pytest
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+from ingest import archive
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return (len(self.rows),)
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class FakeConn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+        self.commits = 0
+
+    def cursor(self, name=None):
+        cur = FakeCursor(list(self.rows))
+        self.cursors.append(cur)
+        return cur
+
+    def commit(self):
+        self.commits += 1
+
+
+def _row(event_id, day):
+    at = datetime(2024, 1, day, tzinfo=timezone.utc)
+    return (event_id, 1, "BOM", f"Event {event_id}", None, "Weather", None, at, "QLD", 0.5, None, 153.0, -27.4, None, '{"a": 1}')
+
+
+def test_candidates_include_detached_partitions_older_than_window():
+    cur = FakeCursor([("events_p202312", False), ("events_p202401", True), ("events_p202406", True)])
+    found = archive.candidates(cur, 6, date(2024, 10, 19))
+    assert found == [("events_p202312", date(2023, 12, 1), False), ("events_p202401", date(2024, 1, 1), True)]
+
+
+def test_archive_partition_writes_hive_layout_and_drops(tmp_path):
+    from pyarrow import fs
+
+    conn = FakeConn([_row(i, 1 + i % 28) for i in range(1, 6)])
+    written = archive.archive_partition(
+        conn, "events_p202401", date(2024, 1, 1), True, fs.LocalFileSystem(), str(tmp_path)
+    )
+    assert written == 5
+    path = tmp_path / "events" / "year=2024" / "month=01" / "events_p202401.parquet"
+    table = pq.read_table(path)
+    assert table.column("id").to_pylist() == [1, 2, 3, 4, 5]
+    assert table.schema == archive.schema()
+    assert not path.with_name(path.name + ".tmp").exists()
+    ddl = conn.cursors[-1].executed
+    assert 'ALTER TABLE events DETACH PARTITION "events_p202401"' in ddl
+    assert ddl[-1] == 'DROP TABLE "events_p202401"'
+
+
+def test_archive_partition_keep_leaves_table(tmp_path):
+    from pyarrow import fs
+
+    conn = FakeConn([_row(1, 2)])
+    archive.archive_partition(
+        conn, "events_p202401", date(2024, 1, 1), False, fs.LocalFileSystem(), str(tmp_path), keep=True
+    )
+    assert not any("DROP" in sql for sql in conn.cursors[-1].executed)
+
+
+def test_filesystem_local_and_s3(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    fs, root = archive.filesystem(f"file://{tmp_path}")
+    assert root == str(tmp_path) and type(fs).__name__ == "LocalFileSystem"
+    monkeypatch.setenv("MINIO_BUCKET", "raw")
+    fs, root = archive.filesystem("")
+    assert root == "raw/archive" and type(fs).__name__ == "S3FileSystem"
@@ -13,10 +13,26 @@ def load_fixture(name: str) -> str:
     return path.read_text(encoding="utf-8")
 
 
+class FakeCopy:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
 class FakeCursor:
     def __init__(self):
         self.events = []
+        self.staged = []
         self._fetch = None
+        self._rows = []
 
     def execute(self, query, params=None):
         q = query.strip()
@@ -24,20 +40,27 @@ class FakeCursor:
             self._fetch = (1,)
         elif q.startswith("INSERT INTO sources"):
             self._fetch = (1,)
-        elif q.startswith("SELECT 1 FROM events"):
-            src, title, occurred = params
-            for ev in self.events:
-                if ev[0] == src and ev[1] == title and ev[4] == occurred:
-                    self._fetch = (1,)
-                    break
-            else:
-                self._fetch = None
-        elif q.startswith("INSERT INTO events"):
-            self.events.append(params)
-            self._fetch = (len(self.events),)
+        elif q.endswith("TRUNCATE events_stage"):
+            self.staged.clear()
+        elif q.startswith("WITH staged"):
+            # Bulk insert: stage rows are (ord, title, body, event_type, occurred_at, ...);
+            # stored events are (source_id, title, body, event_type, occurred_at).
+            src = params["source_id"]
+            self._rows = []
+            for ord_, title, body, event_type, occurred, *_ in self.staged:
+                if any(ev[0] == src and ev[1] == title and ev[4] == occurred for ev in self.events):
+                    continue
+                self.events.append((src, title, body, event_type, occurred))
+                self._rows.append((ord_, len(self.events)))
         else:
             self._fetch = None
 
+    def copy(self, sql):
+        return FakeCopy(self.staged)
+
+    def fetchall(self):
+        return self._rows
+
     def fetchone(self):
         return self._fetch
 
@@ -0,0 +1,90 @@
+import gzip
+import hashlib
+import pathlib
+import sys
+
+import httpx
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+from ingest.common import client as client_mod
+
+FEED = b"<rss><channel><item><title>Advisory</title></item></channel></rss>"
+
+
+class MemoryState:
+    def __init__(self):
+        self.saved = {}
+
+    def get(self, url):
+        return self.saved.get(url, (None, None, None))
+
+    def save(self, url, etag, last_modified, content_hash):
+        self.saved[url] = (etag, last_modified, content_hash)
+
+
+def _server(requests, validators=True):
+    def handler(request):
+        requests.append(request)
+        if validators and request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        headers = {"Content-Encoding": "gzip", "Content-Type": "application/rss+xml"}
+        if validators:
+            headers.update({"ETag": '"v1"', "Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"})
+        return httpx.Response(200, content=gzip.compress(FEED), headers=headers)
+
+    return httpx.MockTransport(handler)
+
+
+def test_conditional_fetch_after_commit():
+    requests = []
+    state = MemoryState()
+    feed = client_mod.FeedClient(state, transport=_server(requests))
+
+    first = feed.fetch("http://feeds.example/acsc.xml")
+    assert first.status == 200 and first.content == FEED and first.content_type == "application/rss+xml"
+    assert "gzip" in requests[0].headers["Accept-Encoding"]
+    assert "If-None-Match" not in requests[0].headers
+
+    # Validators only count once the payload has been persisted.
+    assert not feed.fetch("http://feeds.example/acsc.xml").unchanged
+    feed.commit(first.payload(first.text))
+    assert state.saved["http://feeds.example/acsc.xml"][0] == '"v1"'
+
+    again = feed.fetch("http://feeds.example/acsc.xml")
+    assert again.status == 304 and again.unchanged == "not_modified" and again.content == b""
+    assert requests[-1].headers["If-Modified-Since"] == "Mon, 19 Oct 2026 00:00:00 GMT"
+    raw = again.payload(None)
+    assert raw.unchanged == "not_modified" and raw.content is None
+    feed.commit(raw)  # nothing new to remember
+    assert feed.fetch("http://feeds.example/acsc.xml", conditional=False).status == 200
+    feed.close()
+
+
+def test_adapter_skips_store_on_not_modified(monkeypatch):
+    from ingest.adapters import acsc_adapter
+
+    requests, stored = [], []
+    state = MemoryState()
+    state.save("http://feeds.example/acsc.xml", '"v1"', None, None)
+    monkeypatch.setattr(acsc_adapter, "client", client_mod.FeedClient(state, transport=_server(requests)))
+    monkeypatch.setattr(acsc_adapter.store, "put_raw", lambda *args: stored.append(args))
+    raw = acsc_adapter.fetch_feed("http://feeds.example/acsc.xml")
+    assert raw.unchanged == "not_modified" and raw.content is None
+    assert stored == []
+
+
+def test_identical_body_is_unchanged_without_validators():
+    requests = []
+    state = MemoryState()
+    feed = client_mod.FeedClient(state, transport=_server(requests, validators=False))
+    first = feed.fetch("http://feeds.example/bom.xml")
+    assert first.unchanged is None and first.content_hash == hashlib.sha256(FEED).hexdigest()
+    feed.commit(first.payload(first.text))
+    assert state.saved["http://feeds.example/bom.xml"] == (None, None, first.content_hash)
+
+    again = feed.fetch("http://feeds.example/bom.xml")
+    assert again.status == 200 and again.unchanged == "same_content" and again.content == b""
+    state.saved["http://feeds.example/bom.xml"] = (None, None, "stale")
+    assert feed.fetch("http://feeds.example/bom.xml").content == FEED
@@ -0,0 +1,79 @@
+import pathlib
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+shapely = pytest.importorskip("shapely")
+
+from ingest import geofence
+
+PORT = shapely.box(153.1, -27.45, 153.25, -27.3)  # Port of Brisbane
+LGA = shapely.Polygon([(152.9, -27.6), (153.2, -27.6), (153.2, -27.3), (152.9, -27.3)])
+
+
+def test_index_matches_points_in_bulk():
+    index = geofence.FenceIndex([10, 20], [PORT, LGA])
+    hits = index.match([153.15, 153.0, 140.0, 153.25], [-27.4, -27.5, -30.0, -27.35])
+    # Overlapping fences both match; boundary points count; far points none.
+    assert sorted(hits) == [(0, 10), (0, 20), (1, 20), (3, 10)]
+    assert geofence.FenceIndex([], []).match([153.0], [-27.5]) == []
+
+
+def test_index_scales_to_thousands_of_fences():
+    fences = [shapely.box(x, y, x + 0.05, y + 0.05) for x in range(110, 155) for y in range(-44, -10)]
+    index = geofence.FenceIndex(list(range(len(fences))), fences)
+    lons = [110 + (i * 7919 % 45000) / 1000 for i in range(10_000)]
+    lats = [-44 + (i * 104729 % 34000) / 1000 for i in range(10_000)]
+    start = time.perf_counter()
+    hits = index.match(lons, lats)
+    elapsed = time.perf_counter() - start
+    assert len(fences) == 1530
+    expected = sum(1 for x, y in zip(lons, lats) if x % 1 <= 0.05 and y % 1 <= 0.05)
+    assert len(hits) == expected
+    assert elapsed < 1.0
+
+
+class FakeCursor:
+    def __init__(self, fences):
+        self.fences = fences
+        self.version = (len(fences), 2, datetime(2026, 1, 1))
+        self.executed = []
+        self.alerts = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if sql == geofence.VERSION_SQL:
+            self._result = [self.version]
+        elif sql == geofence.FENCES_SQL:
+            self._result = self.fences
+
+    def executemany(self, sql, rows):
+        self.alerts.extend(rows)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_matcher_records_alerts_and_reloads_only_on_change():
+    cur = FakeCursor([(1, shapely.to_wkb(PORT)), (2, shapely.to_wkb(LGA))])
+    matcher = geofence.GeofenceMatcher()
+    assert matcher.match_batch(cur, [(100, 153.15, -27.4), (101, 140.0, -30.0)]) == 2
+    assert sorted(cur.alerts) == [(1, 100), (2, 100)]
+
+    assert matcher.match_batch(cur, [(102, 153.0, -27.5)]) == 1
+    assert cur.executed.count(geofence.FENCES_SQL) == 1
+
+    cur.fences = cur.fences[:1]
+    cur.version = (1, 1, datetime(2026, 1, 2))
+    assert matcher.match_batch(cur, [(103, 153.0, -27.5)]) == 0
+    assert cur.executed.count(geofence.FENCES_SQL) == 2
+    assert matcher.match_batch(cur, []) == 0
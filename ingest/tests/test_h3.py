@@ -0,0 +1,47 @@
+import pathlib
+import sys
+
+import pytest
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+from ingest import h3_backfill
+from ingest.common import geo
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = []
+
+    def execute(self, sql, params):
+        self.executed.append((sql, params))
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+
+def test_cells_are_none_without_coordinates():
+    assert geo.h3_cells(None, 150.0) == (None, None, None)
+
+
+def test_cells_at_each_resolution():
+    h3 = pytest.importorskip("h3")
+    cells = geo.h3_cells(-27.4698, 153.0251)
+    assert [h3.get_resolution(h3.int_to_str(c)) for c in cells] == list(geo.H3_RESOLUTIONS)
+    # Coarser cells contain the finer ones.
+    assert h3.cell_to_parent(h3.int_to_str(cells[2]), 3) == h3.int_to_str(cells[0])
+
+
+def test_backfill_batch_updates_with_one_statement(monkeypatch):
+    monkeypatch.setattr(h3_backfill, "h3_cells", lambda lat, lon: (1, 2, 3))
+    cur = FakeCursor([(10, -27.0, 153.0), (11, -33.8, 151.2)])
+    updated, last_id = h3_backfill.backfill_batch(cur, 0, 500)
+    assert (updated, last_id) == (2, 11)
+    assert len(cur.executed) == 2
+    sql, params = cur.executed[1]
+    assert "unnest(" in sql
+    assert params == ([10, 11], [1, 1], [2, 2], [3, 3])
+    assert h3_backfill.backfill_batch(cur, 11, 500) == (0, 11)
@@ -0,0 +1,77 @@
+import pathlib
+import sys
+from datetime import date
+
+import pytest
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+from ingest import partitions
+
+
+class FakeCursor:
+    def __init__(self, partitions, indexes=()):
+        self.partitions = partitions
+        self.indexes = set(indexes)
+        self.executed = []
+        self._result = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if sql == partitions.LIST_SQL:
+            self._result = [(name,) for name in self.partitions]
+        elif "to_regclass" in sql:
+            self._result = [(params[0] in self.indexes,)]
+        else:
+            self._result = []
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0]
+
+
+def test_month_helpers():
+    assert partitions.month_of("events_p202412") == date(2024, 12, 1)
+    assert partitions.month_of("events_default") is None
+    assert partitions.add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert partitions.add_months(date(2024, 1, 1), -1) == date(2023, 12, 1)
+
+
+def test_brin_swaps_only_old_partitions_with_btree():
+    cur = FakeCursor(
+        ["events_default", "events_p202607", "events_p202608", "events_p202609", "events_p202610"],
+        indexes={"events_p202607_detected_at", "events_p202609_detected_at"},
+    )
+    assert partitions.brin_old(cur, 2, date(2026, 10, 19)) == ["events_p202607"]
+    assert any("USING brin" in sql and "events_p202607" in sql for sql in cur.executed)
+    assert 'DROP INDEX IF EXISTS "events_p202607_detected_at"' in cur.executed
+
+
+def test_retention_detaches_whole_expired_months():
+    cur = FakeCursor(["events_p202606", "events_p202607", "events_p202608", "events_p202609"])
+    expired = partitions.apply_retention(cur, 3, "detach", date(2026, 10, 19))
+    # Keeping three months (Jul..Sep plus the current one) expires only June.
+    assert expired == ["events_p202606"]
+    assert 'ALTER TABLE events DETACH PARTITION "events_p202606"' in cur.executed
+    assert not any(sql.startswith("DROP TABLE") for sql in cur.executed)
+    assert "DELETE FROM event_keys" in cur.executed[-1]
+
+
+def test_retention_drop_cleans_up_links():
+    cur = FakeCursor(["events_p202601"])
+    partitions.apply_retention(cur, 1, "drop", date(2026, 10, 19))
+    assert any("event_entities" in sql for sql in cur.executed)
+    assert any("event_embeddings" in sql for sql in cur.executed)
+    assert any("event_related" in sql for sql in cur.executed)
+    assert 'DROP TABLE "events_p202601"' in cur.executed
+
+
+def test_retention_disabled_and_invalid_mode():
+    cur = FakeCursor(["events_p201001"])
+    assert partitions.apply_retention(cur, 0, "drop", date(2026, 10, 19)) == []
+    assert cur.executed == []
+    with pytest.raises(ValueError):
+        partitions.apply_retention(cur, 1, "archive", date(2026, 10, 19))
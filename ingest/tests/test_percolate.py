@@ -0,0 +1,105 @@
+import pathlib
+import random
+import sys
+import time
+from datetime import datetime
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[1]))
+
+from ingest import percolate
+from ingest.common.schemas import NormalizedEvent
+
+SEARCHES = [
+    percolate.Search(1, q="Flood Warning"),
+    percolate.Search(2, q="fire", event_type="Wildfire"),
+    percolate.Search(3, bbox=(153.0, -27.6, 153.2, -27.4)),
+    percolate.Search(4, event_type="Cyber"),
+    percolate.Search(5, source_id=7),
+    percolate.Search(6, q="ai"),  # shorter than a trigram
+    percolate.Search(7, q="river", bbox=(150.0, -30.0, 151.0, -29.0)),
+]
+
+EVENTS = [
+    {"title": "Major flood warning for the Brisbane River", "body": None, "event_type": "Weather",
+     "source_id": 1, "lon": 153.1, "lat": -27.5},
+    {"title": "Bushfire emergency", "body": "Leave now", "event_type": "Wildfire", "source_id": 7,
+     "lon": None, "lat": None},
+    {"title": "Fire ant sighting", "body": None, "event_type": "Biosecurity", "source_id": 1,
+     "lon": 150.5, "lat": -29.5},
+    {"title": "VPN flaw", "body": "Patch AIX hosts", "event_type": "Cyber", "source_id": 2,
+     "lon": 150.5, "lat": -29.5},
+    {"title": "Gwydir River peak", "body": None, "event_type": "Weather", "source_id": 3,
+     "lon": 150.5, "lat": -29.5},
+]
+
+
+def test_index_matches_each_criterion():
+    index = percolate.QueryIndex(SEARCHES)
+    assert sorted(index.match(EVENTS)) == [(0, 1), (0, 3), (1, 2), (1, 5), (3, 4), (3, 6), (4, 7)]
+
+
+def test_index_agrees_with_brute_force():
+    rng = random.Random(7)
+    words = ["flood", "fire", "storm", "cyclone", "river", "port", "vessel", "outage", "heat", "smoke"]
+    types = ["Weather", "Wildfire", "Cyber", "Maritime"]
+    searches = []
+    for sid in range(1, 2001):
+        kind = sid % 4
+        q = " ".join(rng.sample(words, rng.choice([1, 1, 2]))) if kind != 1 else None
+        x, y = rng.uniform(110, 150), rng.uniform(-44, -12)
+        bbox = (x, y, x + rng.uniform(1, 5), y + rng.uniform(1, 5)) if kind in (1, 2) else None
+        searches.append(percolate.Search(sid, q=q, event_type=rng.choice(types) if kind == 3 else None, bbox=bbox))
+    events = [
+        {"title": " ".join(rng.choices(words, k=6)).title(), "body": None, "event_type": rng.choice(types),
+         "source_id": 1, "lon": rng.uniform(110, 155), "lat": rng.uniform(-44, -10)}
+        for _ in range(1000)
+    ]
+    start = time.perf_counter()
+    hits = percolate.QueryIndex(searches).match(events)
+    elapsed = time.perf_counter() - start
+    expected = [(i, s.id) for i, ev in enumerate(events) for s in searches if s.matches(ev)]
+    assert sorted(hits) == sorted(expected)
+    assert len(expected) > 1000
+    assert elapsed < 2.0
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.version = (len(rows), 2, datetime(2026, 1, 1))
+        self.executed = []
+        self.hits = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if sql == percolate.VERSION_SQL:
+            self._result = [self.version]
+        elif sql == percolate.SEARCHES_SQL:
+            self._result = self.rows
+
+    def executemany(self, sql, rows):
+        self.hits.extend(rows)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_percolator_records_hits_and_reloads_only_on_change():
+    cur = FakeCursor([(1, "flood", None, None, None, None, None, None), (2, None, None, 3, 153.0, -27.6, 153.2, -27.4)])
+    perc = percolate.Percolator()
+    flood = NormalizedEvent(title="Flood watch", lon=153.1, lat=-27.5)
+    assert perc.match_batch(cur, [(100, percolate.event_fields(flood, 3)), (101, percolate.event_fields(flood, 1))]) == 3
+    assert sorted(cur.hits) == [(1, 100), (1, 101), (2, 100)]
+
+    assert perc.match_batch(cur, [(102, percolate.event_fields(flood, 1))]) == 1
+    assert cur.executed.count(percolate.SEARCHES_SQL) == 1
+
+    cur.rows, cur.version = [], (0, 0, None)
+    assert perc.match_batch(cur, [(103, percolate.event_fields(flood, 1))]) == 0
+    assert cur.executed.count(percolate.SEARCHES_SQL) == 2
+    assert perc.match_batch(cur, []) == 0
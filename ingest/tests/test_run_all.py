@@ -0,0 +1,115 @@
+import pathlib
+import sys
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+
+BASE_PATH = pathlib.Path(__file__).resolve()
+sys.path.append(str(BASE_PATH.parents[2]))
+
+from ingest import run_all
+
+
+class FakeScheduler:
+    def __init__(self):
+        self.jobs = []
+
+    def add_job(self, func, trigger, **kwargs):
+        self.jobs.append((func, trigger, kwargs))
+
+
+def test_adapters_are_staggered_with_timeouts(monkeypatch):
+    monkeypatch.setenv("ENABLE_ACSC", "true")
+    monkeypatch.setenv("ENABLE_BOM", "true")
+    monkeypatch.setenv("ENABLE_PARTITIONS", "false")
+    monkeypatch.setenv("INGEST_JITTER_SECONDS", "45")
+    monkeypatch.setenv("BOM_TIMEOUT_SECONDS", "30")
+    monkeypatch.setattr(run_all.importlib, "import_module", lambda path: SimpleNamespace(path=path))
+    sched = FakeScheduler()
+    run_all._schedule_all(sched)
+    jobs = {kw["id"]: kw for _, _, kw in sched.jobs}
+    assert set(jobs) == {"acsc", "bom"}
+    assert all(kw["jitter"] == 45 and kw["minutes"] == 15 for kw in jobs.values())
+    assert jobs["acsc"]["args"][2] == 300.0 and jobs["bom"]["args"][2] == 30.0
+
+
+class SlowAdapter:
+    def __init__(self, clock, fetch_seconds):
+        self.clock, self.fetch_seconds = clock, fetch_seconds
+
+    def fetch_feed(self):
+        self.clock[0] += self.fetch_seconds
+        return "raw"
+
+    def normalize(self, raw):
+        return ["event"]
+
+    def get_source_meta(self):
+        return ("src", None, "feed")
+
+
+def test_job_drops_runs_that_overrun_their_budget(monkeypatch):
+    clock = [0.0]
+    persisted = []
+
+    @contextmanager
+    def lock(name):
+        yield True
+
+    monkeypatch.setattr(run_all, "_advisory_lock", lock)
+    monkeypatch.setattr(run_all.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(run_all.run_mod, "persist", lambda events, *meta: persisted.append(events) or len(events))
+
+    run_all._job("acsc", SlowAdapter(clock, 5), timeout=10)
+    assert persisted == [["event"]]
+    run_all._job("acsc", SlowAdapter(clock, 20), timeout=10)
+    assert persisted == [["event"]]
+
+
+def test_unchanged_feed_skips_parse_and_persist(monkeypatch):
+    class Unchanged:
+        def fetch_feed(self):
+            return SimpleNamespace(unchanged="same_content")
+
+        def normalize(self, raw):
+            raise AssertionError("parsed an unchanged feed")
+
+    persisted = []
+    monkeypatch.setattr(run_all.run_mod, "persist", lambda *args: persisted.append(args))
+    skipped = run_all.SKIPPED_COUNTER.labels("acsc", "same_content")
+    before = skipped._value.get()
+    run_all._run_adapter("acsc", Unchanged(), timeout=10)
+    assert persisted == []
+    assert skipped._value.get() == before + 1
+
+
+def test_pool_reset_leaves_connection_idle_for_reuse():
+    pytest.importorskip("psycopg_pool")
+    from psycopg.pq import TransactionStatus
+    from psycopg_pool import ConnectionPool
+
+    from ingest.common import db
+
+    class FakeConn:
+        def __init__(self):
+            self.pgconn = SimpleNamespace(transaction_status=TransactionStatus.IDLE)
+            self.executed = []
+            self.closed = False
+
+        def execute(self, sql):
+            self.executed.append(sql)
+            self.pgconn.transaction_status = TransactionStatus.INTRANS
+
+        def commit(self):
+            self.pgconn.transaction_status = TransactionStatus.IDLE
+
+        def close(self):
+            self.closed = True
+
+    conn = FakeConn()
+    # The pool's own check: a connection left INTRANS by the hook is closed.
+    ConnectionPool._reset_connection(SimpleNamespace(_reset=db._reset), conn)
+    assert conn.executed == ["SELECT pg_advisory_unlock_all()"]
+    assert conn.pgconn.transaction_status == TransactionStatus.IDLE
+    assert not conn.closed
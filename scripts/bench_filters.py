@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Benchmark event filter parsing and SQL compilation.
+
+Measures the per-request overhead of ``app.filters``: parsing raw query
+parameters into an ``EventFilter``, compiling it to ``(where, params)`` and
+building its cache key, for a few typical parameter mixes.
+
+    python scripts/bench_filters.py [--number 200000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "services" / "api"))
+
+from app import filters  # noqa: E402
+
+CASES = {
+    "empty": {},
+    "source": {"source_id": 3},
+    "map": {"bbox": "149.0,-28.0,152.0,-25.0", "time_range": "2024-01-01T00:00:00Z..2024-02-01T00:00:00Z"},
+    "search": {
+        "q": "bushfire",
+        "bbox": "149.0,-28.0,152.0,-25.0",
+        "time_range": "2024-01-01T00:00:00Z..",
+        "source_id": 3,
+    },
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200_000, help="iterations per measurement")
+    args = parser.parse_args()
+
+    print(f"{'case':<8} {'parse':>9} {'compile':>9} {'cold':>9} {'key':>9}   (us/op)")
+    for name, params in CASES.items():
+        flt = filters.parse(**params)
+        parse_t = timeit.timeit(lambda: filters.parse(**params), number=args.number)
+        compile_t = timeit.timeit(flt.compile, number=args.number)
+
+        def _cold():
+            filters._where.cache_clear()
+            flt.compile()
+
+        cold_t = timeit.timeit(_cold, number=args.number // 10) * 10
+        key_t = timeit.timeit(lambda: flt.cache_key, number=args.number)
+        per = 1e6 / args.number
+        print(
+            f"{name:<8} {parse_t * per:9.2f} {compile_t * per:9.2f} {cold_t * per:9.2f} {key_t * per:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
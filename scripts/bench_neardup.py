@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark near-duplicate clustering (MinHash + LSH) throughput.
+
+Generates synthetic event texts where a fraction are reworded copies of an
+earlier event (dropped/swapped words, changed punctuation and case, as
+different feeds report the same incident), then times signing, banding,
+verification and clustering, and reports recall/precision against the known
+duplicate groups:
+
+    python scripts/bench_neardup.py [--events 1000000] [--dup-rate 0.2]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from services.etl import neardup  # noqa: E402
+
+WORDS = (
+    "bushfire emergency warning watch act advice flood severe thunderstorm heavy rainfall damaging winds "
+    "residents leave now shelter road closed highway evacuation centre cyber vulnerability advisory patch "
+    "vessel sighted harbour port incident police investigation earthquake magnitude recorded near north "
+    "south east west coast river catchment community alert update conditions expected tonight tomorrow"
+).split()
+PLACES = (
+    "Brisbane Ipswich Logan Toowoomba Cairns Townsville Sydney Newcastle Wollongong Melbourne Geelong "
+    "Ballarat Bendigo Adelaide Hobart Launceston Darwin Perth Bunbury Albany Canberra Dubbo Mildura"
+).split()
+
+
+def _original(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(12, 40))
+    for _ in range(rng.randint(1, 3)):
+        words.insert(rng.randrange(len(words)), rng.choice(PLACES))
+    return " ".join(words)
+
+
+def _reword(rng: random.Random, text: str) -> str:
+    words = text.split()
+    for _ in range(max(1, len(words) // 12)):
+        op = rng.random()
+        i = rng.randrange(len(words))
+        if op < 0.4 and len(words) > 5:
+            del words[i]
+        elif op < 0.7:
+            j = rng.randrange(len(words))
+            words[i], words[j] = words[j], words[i]
+        else:
+            words.insert(i, rng.choice(WORDS))
+    out = " ".join(words)
+    return out.upper() if rng.random() < 0.1 else out.replace(" ", rng.choice([" ", ", ", " - "]), 2)
+
+
+def generate(n: int, dup_rate: float, seed: int = 7):
+    rng = random.Random(seed)
+    texts, group = [], []
+    for i in range(n):
+        if i and rng.random() < dup_rate:
+            src = rng.randrange(max(0, i - 5000), i)
+            texts.append(_reword(rng, texts[src]))
+            group.append(group[src])
+        else:
+            texts.append(_original(rng))
+            group.append(i)
+    return texts, np.array(group)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--batch", type=int, default=100_000, help="events signed per numpy batch")
+    parser.add_argument("--threshold", type=float, default=neardup.THRESHOLD)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    texts, truth = generate(args.events, args.dup_rate)
+    print(f"generated {len(texts):,} events in {time.perf_counter() - t0:.1f}s")
+
+    t0 = time.perf_counter()
+    sigs = np.concatenate(
+        [neardup.signatures(texts[i : i + args.batch]) for i in range(0, len(texts), args.batch)]
+    )
+    t_sign = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    pairs = neardup.candidate_pairs(sigs)
+    t_band = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    confirmed = pairs[neardup.similarity(sigs, pairs) >= args.threshold]
+    labels = neardup.components(len(sigs), confirmed)
+    t_cluster = time.perf_counter() - t0
+
+    total = t_sign + t_band + t_cluster
+    n = len(texts)
+    print(f"sign     {t_sign:7.2f}s  {n / t_sign:12,.0f} events/s")
+    print(f"band     {t_band:7.2f}s  {len(pairs):,} candidate pairs ({len(pairs) / n:.2f} per event)")
+    print(f"cluster  {t_cluster:7.2f}s  {len(confirmed):,} confirmed pairs")
+    print(f"total    {total:7.2f}s  {n / total:12,.0f} events/s")
+
+    # Pairwise quality over "is a duplicate of an earlier event" decisions.
+    is_dup = truth != np.arange(n)
+    found = labels != np.arange(n)
+    correct = found & (truth[labels] == truth)
+    recall = correct[is_dup].mean() if is_dup.any() else 1.0
+    precision = correct[found].mean() if found.any() else 1.0
+    print(f"recall {recall:.3f}  precision {precision:.3f}  ({is_dup.sum():,} injected duplicates)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark event persistence: per-row INSERTs versus the bulk COPY path.
+
+Needs a database with the project schema (``DATABASE_URL``).  Generates
+synthetic located events (``--dup-rate`` of each batch repeats rows already
+stored, as re-fetched feeds do), then times ``insert_event`` once per row and
+``bulk_insert_events`` once per batch, both on the same connection.  Each
+batch is rolled back unless ``--commit`` is given, so the run leaves no rows
+behind:
+
+    python scripts/bench_persist.py [--batch 10000] [--batches 5] [--dup-rate 0.5]
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingest"))
+
+from ingest.common import db as dbmod  # noqa: E402
+
+TYPES = ["Weather", "Wildfire", "Cyber", "Maritime", "Other"]
+
+
+def generate(n: int, run_id: str, seed: int = 7):
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "title": f"bench {run_id} event {i}",
+            "body": "synthetic event for the persist benchmark",
+            "event_type": rng.choice(TYPES),
+            "occurred_at": start + timedelta(seconds=i),
+            "lat": rng.uniform(-44, -10),
+            "lon": rng.uniform(112, 154),
+            "jurisdiction": "QLD",
+            "confidence": 0.8,
+            "severity": 0.5,
+        }
+        for i in range(n)
+    ]
+
+
+def _per_row(cur, source_id, rows):
+    return sum(dbmod.insert_event(cur, source_id=source_id, **row) is not None for row in rows)
+
+
+def _bulk(cur, source_id, rows):
+    return len(dbmod.bulk_insert_events(cur, source_id, rows))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch", type=int, default=10_000, help="events per batch")
+    parser.add_argument("--batches", type=int, default=5)
+    parser.add_argument("--dup-rate", type=float, default=0.0, help="fraction of each batch already stored")
+    parser.add_argument("--commit", action="store_true", help="keep the inserted rows")
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    dups = int(args.batch * args.dup_rate)
+    with dbmod.get_conn() as conn:
+        with conn.cursor() as cur:
+            source_id = dbmod.ensure_source(cur, f"bench-{run_id}", None, "bench")
+            # Rows the duplicate share of every batch repeats.
+            seen = generate(dups, run_id + "-seen")
+            dbmod.bulk_insert_events(cur, source_id, seen)
+            conn.commit()
+
+            for name, fn in (("per-row", _per_row), ("bulk", _bulk)):
+                elapsed = inserted = 0
+                for b in range(args.batches):
+                    rows = seen + generate(args.batch - dups, f"{run_id}-{name}-{b}", seed=b)
+                    t0 = time.perf_counter()
+                    inserted += fn(cur, source_id, rows)
+                    if args.commit:
+                        conn.commit()
+                    else:
+                        conn.rollback()
+                    elapsed += time.perf_counter() - t0
+                total = args.batch * args.batches
+                print(
+                    f"{name:<8} {elapsed:7.2f}s  {total / elapsed:10,.0f} events/s  "
+                    f"({inserted:,} inserted, {total - inserted:,} duplicates skipped)"
+                )
+            if not args.commit:
+                cur.execute("DELETE FROM event_keys WHERE source_id = %s", (source_id,))
+                cur.execute("DELETE FROM events WHERE source_id = %s", (source_id,))
+                cur.execute("DELETE FROM sources WHERE id = %s", (source_id,))
+                conn.commit()
+
+
+if __name__ == "__main__":
+    main()
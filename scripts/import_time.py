@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Report module import cost of the service entry points.
+
+Runs each entry point in a fresh interpreter with ``python -X importtime``
+and summarises the output, so cold-start regressions (a heavy library pulled
+in at import time) are easy to spot:
+
+    python scripts/import_time.py --import-time api
+    python scripts/import_time.py --import-time all --top 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# name -> (working directory, module imported by the entry point)
+ENTRY_POINTS = {
+    "api": (ROOT / "services" / "api", "app.main"),
+    "ingest": (ROOT / "ingest", "ingest.run"),
+    "etl": (ROOT, "services.etl.fusion_worker"),
+}
+
+
+def measure(cwd: Path, module: str) -> list[tuple[int, int, str]]:
+    """Return ``(self_us, cumulative_us, name)`` for every module imported."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(cwd), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"importing {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header line
+        rows.append((int(parts[0]), int(parts[1]), parts[2].rstrip()))
+    return rows
+
+
+def _depth(name: str) -> int:
+    return (len(name) - len(name.lstrip()) - 1) // 2
+
+
+def report(name: str, top: int) -> int:
+    cwd, module = ENTRY_POINTS[name]
+    rows = measure(cwd, module)
+    # -X importtime prints children before their parent, so the entry
+    # module's subtree is the block between the previous top-level line and
+    # the entry module's own line (interpreter start-up imports are excluded).
+    end = next(i for i, (_, _, mod) in enumerate(rows) if mod.strip() == module)
+    start = end
+    while start > 0 and _depth(rows[start - 1][2]) > 0:
+        start -= 1
+    rows = rows[start : end + 1]
+    total = rows[-1][1]
+    print(f"{name}: import {module} took {total / 1000:.1f} ms")
+    # Direct imports of the entry module, ranked by cumulative time.
+    packages: dict[str, int] = {}
+    for _, cum, mod in rows:
+        if _depth(mod) == 1:
+            packages[mod.strip()] = cum
+    for mod, cum in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {cum / 1000:8.1f} ms  {mod}")
+    heaviest = sorted(rows, key=lambda r: r[0], reverse=True)[:top]
+    print("  heaviest modules (self time):")
+    for self_us, _, mod in heaviest:
+        print(f"  {self_us / 1000:8.1f} ms  {mod.strip()}")
+    print()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--import-time",
+        choices=[*ENTRY_POINTS, "all"],
+        default="all",
+        help="entry point to profile",
+    )
+    parser.add_argument("--top", type=int, default=15, help="rows to show per section")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="exit non-zero if any entry point takes longer than this",
+    )
+    args = parser.parse_args()
+
+    names = list(ENTRY_POINTS) if args.import_time == "all" else [args.import_time]
+    over = []
+    for name in names:
+        total_ms = report(name, args.top) / 1000
+        if args.budget_ms is not None and total_ms > args.budget_ms:
+            over.append(f"{name} ({total_ms:.0f} ms)")
+    if over:
+        raise SystemExit(f"over {args.budget_ms:.0f} ms budget: {', '.join(over)}")
+
+
+if __name__ == "__main__":
+    main()
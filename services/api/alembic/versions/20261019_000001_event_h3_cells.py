@@ -0,0 +1,38 @@
+"""Add H3 cell columns and covering indexes to events
+
+Revision ID: 20261019_000001
+Revises: 20250830_000005
+Create Date: 2026-10-19 00:00:01
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000001"
+down_revision = "20250830_000005"
+branch_labels = None
+depends_on = None
+
+RESOLUTIONS = (3, 5, 7)
+
+
+def upgrade() -> None:
+    for res in RESOLUTIONS:
+        op.add_column("events", sa.Column(f"h3_r{res}", sa.BigInteger()))
+    # Existing rows are filled by ``python -m ingest.h3_backfill``.
+    for res in RESOLUTIONS:
+        op.create_index(
+            f"idx_events_h3_r{res}",
+            "events",
+            [f"h3_r{res}", "event_type"],
+            postgresql_include=["detected_at", "source_id"],
+            postgresql_where=sa.text(f"h3_r{res} IS NOT NULL"),
+        )
+
+
+def downgrade() -> None:
+    for res in RESOLUTIONS:
+        op.drop_index(f"idx_events_h3_r{res}", table_name="events")
+        op.drop_column("events", f"h3_r{res}")
@@ -0,0 +1,167 @@
+"""Range partition events by month on detected_at
+
+Revision ID: 20261019_000002
+Revises: 20261019_000001
+Create Date: 2026-10-19 00:00:02
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000002"
+down_revision = "20261019_000001"
+branch_labels = None
+depends_on = None
+
+EVENT_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_geom ON events USING GIST(geom)",
+    "CREATE INDEX IF NOT EXISTS idx_events_event_type_detected_at ON events(event_type, detected_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_events_source_detected_at ON events(source_id, detected_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_events_text_search ON events "
+    "USING GIN (to_tsvector('simple', title || ' ' || coalesce(body,'')))",
+    "CREATE INDEX IF NOT EXISTS idx_events_entities_gin ON events USING GIN (entities)",
+    *(
+        f"CREATE INDEX IF NOT EXISTS idx_events_h3_r{res} ON events(h3_r{res}, event_type) "
+        f"INCLUDE (detected_at, source_id) WHERE h3_r{res} IS NOT NULL"
+        for res in (3, 5, 7)
+    ),
+)
+
+LEGACY_INDEXES = (
+    "idx_events_detected_at",
+    "idx_events_geom",
+    "idx_events_event_type_detected_at",
+    "idx_events_source_detected_at",
+    "idx_events_text_search",
+    "idx_events_entities_gin",
+    "idx_events_h3_r3",
+    "idx_events_h3_r5",
+    "idx_events_h3_r7",
+)
+
+# Kept in sync with infra/db/init/01_schema.sql.
+FUNCTIONS = r"""
+CREATE OR REPLACE FUNCTION events_dedupe() RETURNS trigger AS $$
+BEGIN
+  IF NEW.source_id IS NULL OR NEW.occurred_at IS NULL THEN
+    RETURN NEW;
+  END IF;
+  INSERT INTO event_keys(source_id, title, occurred_at, event_id, detected_at)
+  VALUES (NEW.source_id, NEW.title, NEW.occurred_at, NEW.id, NEW.detected_at)
+  ON CONFLICT DO NOTHING;
+  IF NOT FOUND THEN
+    RETURN NULL;
+  END IF;
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_event_partition(month_start date) RETURNS text AS $$
+DECLARE
+  first_day date := date_trunc('month', month_start)::date;
+  next_day date := (date_trunc('month', month_start) + interval '1 month')::date;
+  part text := format('events_p%s', to_char(month_start, 'YYYYMM'));
+BEGIN
+  IF to_regclass(part) IS NOT NULL THEN
+    RETURN part;
+  END IF;
+  EXECUTE format('CREATE TABLE %I (LIKE events INCLUDING DEFAULTS)', part);
+  EXECUTE format(
+    'WITH moved AS (DELETE FROM events_default WHERE detected_at >= %L AND detected_at < %L RETURNING *) '
+    'INSERT INTO %I SELECT * FROM moved',
+    first_day, next_day, part
+  );
+  EXECUTE format('ALTER TABLE events ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)', part, first_day, next_day);
+  EXECUTE format('CREATE INDEX IF NOT EXISTS %I ON %I (detected_at DESC)', part || '_detected_at', part);
+  RETURN part;
+END $$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION ensure_event_partitions(months_ahead int DEFAULT 3, months_back int DEFAULT 0)
+RETURNS SETOF text AS $$
+  SELECT ensure_event_partition((date_trunc('month', now()) + make_interval(months => m))::date)
+  FROM generate_series(-months_back, months_ahead) AS m;
+$$ LANGUAGE sql;
+"""
+
+
+def upgrade() -> None:
+    # Partitioned tables cannot be the target of a foreign key on id alone;
+    # the ingest retention job cleans up links of dropped partitions.
+    op.execute("ALTER TABLE event_entities DROP CONSTRAINT IF EXISTS event_entities_event_id_fkey")
+    op.execute("ALTER TABLE event_embeddings DROP CONSTRAINT IF EXISTS event_embeddings_event_id_fkey")
+
+    op.execute("ALTER TABLE events RENAME TO events_legacy")
+    for name in LEGACY_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("UPDATE events_legacy SET detected_at = coalesce(occurred_at, now()) WHERE detected_at IS NULL")
+
+    # LIKE keeps the column order (so rows copy with SELECT *) and the id
+    # default, which keeps drawing from the existing events_id_seq.
+    op.execute("CREATE TABLE events (LIKE events_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (detected_at)")
+    op.execute("ALTER TABLE events ALTER COLUMN detected_at SET NOT NULL")
+    op.execute("ALTER TABLE events ADD PRIMARY KEY (id, detected_at)")
+    op.execute("ALTER TABLE events ADD FOREIGN KEY (source_id) REFERENCES sources(id)")
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events.id")
+    op.execute("CREATE TABLE events_default PARTITION OF events DEFAULT")
+    for stmt in EVENT_INDEXES:
+        op.execute(stmt)
+
+    op.execute(
+        """
+        CREATE TABLE IF NOT EXISTS event_keys (
+          source_id INT NOT NULL,
+          title TEXT NOT NULL,
+          occurred_at TIMESTAMPTZ NOT NULL,
+          event_id BIGINT NOT NULL,
+          detected_at TIMESTAMPTZ NOT NULL,
+          PRIMARY KEY (source_id, title, occurred_at)
+        )
+        """
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_event_keys_detected_at ON event_keys USING BRIN (detected_at)")
+    op.execute(FUNCTIONS)
+    op.execute("CREATE TRIGGER events_dedupe BEFORE INSERT ON events FOR EACH ROW EXECUTE FUNCTION events_dedupe()")
+
+    # One partition per month that has data, plus the next three; copying
+    # through the parent fills event_keys via the trigger.
+    op.execute(
+        """
+        SELECT ensure_event_partition(m::date)
+        FROM generate_series(
+          date_trunc('month', (SELECT coalesce(min(detected_at), now()) FROM events_legacy)),
+          date_trunc('month', now()),
+          interval '1 month'
+        ) AS m
+        """
+    )
+    op.execute("SELECT ensure_event_partitions(3)")
+    op.execute("INSERT INTO events SELECT * FROM events_legacy ORDER BY id")
+    op.execute("DROP TABLE events_legacy")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE events_flat (LIKE events INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO events_flat SELECT * FROM events")
+    op.execute("ALTER SEQUENCE events_id_seq OWNED BY events_flat.id")
+    op.execute("DROP TABLE events CASCADE")
+    op.execute("DROP FUNCTION IF EXISTS ensure_event_partitions(int, int)")
+    op.execute("DROP FUNCTION IF EXISTS ensure_event_partition(date)")
+    op.execute("DROP FUNCTION IF EXISTS events_dedupe()")
+    op.execute("DROP TABLE IF EXISTS event_keys")
+    op.execute("ALTER TABLE events_flat RENAME TO events")
+    op.execute("ALTER TABLE events ADD PRIMARY KEY (id)")
+    op.execute("ALTER TABLE events ADD FOREIGN KEY (source_id) REFERENCES sources(id)")
+    op.execute(
+        "ALTER TABLE events ADD CONSTRAINT uq_events_source_title_occurred UNIQUE (source_id, title, occurred_at)"
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_detected_at ON events(detected_at DESC)")
+    for stmt in EVENT_INDEXES:
+        op.execute(stmt)
+    op.execute(
+        "ALTER TABLE event_entities ADD CONSTRAINT event_entities_event_id_fkey "
+        "FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE event_embeddings ADD CONSTRAINT event_embeddings_event_id_fkey "
+        "FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE"
+    )
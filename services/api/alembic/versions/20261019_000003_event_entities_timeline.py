@@ -0,0 +1,64 @@
+"""Denormalize event time and type into event_entities for entity timelines
+
+Revision ID: 20261019_000003
+Revises: 20261019_000002
+Create Date: 2026-10-19 00:00:03
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000003"
+down_revision = "20261019_000002"
+branch_labels = None
+depends_on = None
+
+# Kept in sync with infra/db/init/01_schema.sql.
+FILL_FUNCTION = """
+CREATE OR REPLACE FUNCTION events_link_fill() RETURNS trigger AS $$
+BEGIN
+  IF NEW.detected_at IS NULL OR NEW.event_type IS NULL THEN
+    SELECT e.detected_at, e.event_type INTO NEW.detected_at, NEW.event_type
+    FROM events e WHERE e.id = NEW.event_id;
+  END IF;
+  RETURN NEW;
+END $$ LANGUAGE plpgsql;
+"""
+
+
+def upgrade() -> None:
+    op.add_column("event_entities", sa.Column("detected_at", sa.TIMESTAMP(timezone=True)))
+    op.add_column(
+        "event_entities",
+        sa.Column("event_type", postgresql.ENUM(name="event_type", create_type=False)),
+    )
+    op.execute(
+        """
+        UPDATE event_entities ee
+        SET detected_at = e.detected_at, event_type = e.event_type
+        FROM events e
+        WHERE e.id = ee.event_id
+        """
+    )
+    op.execute(FILL_FUNCTION)
+    op.execute(
+        "CREATE TRIGGER events_link_fill BEFORE INSERT ON event_entities "
+        "FOR EACH ROW EXECUTE FUNCTION events_link_fill()"
+    )
+    op.create_index(
+        "idx_event_entities_timeline",
+        "event_entities",
+        ["entity_id", sa.text("detected_at DESC"), sa.text("event_id DESC")],
+        postgresql_include=["event_type", "relation"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_event_entities_timeline", table_name="event_entities")
+    op.execute("DROP TRIGGER IF EXISTS events_link_fill ON event_entities")
+    op.execute("DROP FUNCTION IF EXISTS events_link_fill()")
+    op.drop_column("event_entities", "event_type")
+    op.drop_column("event_entities", "detected_at")
@@ -0,0 +1,46 @@
+"""Typeahead indexes and entity change notifications
+
+Revision ID: 20261019_000004
+Revises: 20261019_000003
+Create Date: 2026-10-19 00:00:04
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000004"
+down_revision = "20261019_000003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_entities_name_prefix ON entities (lower(name) text_pattern_ops)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_events_title_trgm ON events USING GIN (lower(title) gin_trgm_ops)")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION entities_notify() RETURNS trigger AS $$
+        BEGIN
+          PERFORM pg_notify('entities_changed', TG_TABLE_NAME);
+          RETURN NULL;
+        END $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER entities_notify AFTER INSERT OR UPDATE OR DELETE ON entities "
+        "FOR EACH STATEMENT EXECUTE FUNCTION entities_notify()"
+    )
+    op.execute(
+        "CREATE TRIGGER event_entities_notify AFTER INSERT OR DELETE ON event_entities "
+        "FOR EACH STATEMENT EXECUTE FUNCTION entities_notify()"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS event_entities_notify ON event_entities")
+    op.execute("DROP TRIGGER IF EXISTS entities_notify ON entities")
+    op.execute("DROP FUNCTION IF EXISTS entities_notify()")
+    op.execute("DROP INDEX IF EXISTS idx_events_title_trgm")
+    op.execute("DROP INDEX IF EXISTS idx_entities_name_prefix")
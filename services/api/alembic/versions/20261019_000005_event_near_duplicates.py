@@ -0,0 +1,33 @@
+"""Near-duplicate clusters: events.cluster_id and MinHash signatures
+
+Revision ID: 20261019_000005
+Revises: 20261019_000004
+Create Date: 2026-10-19 00:00:05
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000005"
+down_revision = "20261019_000004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("events", sa.Column("cluster_id", sa.BigInteger()))
+    op.create_table(
+        "event_minhash",
+        sa.Column("event_id", sa.BigInteger(), primary_key=True),
+        sa.Column("detected_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("sig", postgresql.BYTEA(), nullable=False),
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_event_minhash_detected_at ON event_minhash USING BRIN (detected_at)")
+
+
+def downgrade() -> None:
+    op.drop_table("event_minhash")
+    op.drop_column("events", "cluster_id")
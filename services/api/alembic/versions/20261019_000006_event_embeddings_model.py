@@ -0,0 +1,33 @@
+"""Event embeddings: model, detected_at and embedded_at columns
+
+Revision ID: 20261019_000006
+Revises: 20261019_000005
+Create Date: 2026-10-19 00:00:06
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000006"
+down_revision = "20261019_000005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("event_embeddings", sa.Column("detected_at", sa.TIMESTAMP(timezone=True)))
+    op.add_column("event_embeddings", sa.Column("model", sa.Text()))
+    op.add_column(
+        "event_embeddings",
+        sa.Column("embedded_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()")),
+    )
+    op.create_index("idx_event_embeddings_model", "event_embeddings", ["model", "event_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("idx_event_embeddings_model", table_name="event_embeddings")
+    op.drop_column("event_embeddings", "embedded_at")
+    op.drop_column("event_embeddings", "model")
+    op.drop_column("event_embeddings", "detected_at")
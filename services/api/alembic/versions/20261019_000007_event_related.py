@@ -0,0 +1,35 @@
+"""Precomputed related-event lists
+
+Revision ID: 20261019_000007
+Revises: 20261019_000006
+Create Date: 2026-10-19 00:00:07
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000007"
+down_revision = "20261019_000006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("idx_event_embeddings_detected_at", "event_embeddings", ["model", "detected_at"])
+    op.create_table(
+        "event_related",
+        sa.Column("event_id", sa.BigInteger(), primary_key=True),
+        sa.Column("detected_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("related_ids", postgresql.ARRAY(sa.BigInteger()), nullable=False),
+        sa.Column("related_at", postgresql.ARRAY(sa.TIMESTAMP(timezone=True)), nullable=False),
+        sa.Column("scores", postgresql.ARRAY(sa.REAL()), nullable=False),
+        sa.Column("computed_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_related")
+    op.drop_index("idx_event_embeddings_detected_at", table_name="event_embeddings")
@@ -0,0 +1,50 @@
+"""Geofences and geofence alerts
+
+Revision ID: 20261019_000008
+Revises: 20261019_000007
+Create Date: 2026-10-19 00:00:08
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000008"
+down_revision = "20261019_000007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geofences",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("owner", sa.Text(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("kind", sa.Text()),
+        sa.Column("geom", Geometry("MULTIPOLYGON", srid=4326, spatial_index=False), nullable=False),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_geofences_geom ON geofences USING GIST(geom)")
+    op.create_index("idx_geofences_owner", "geofences", ["owner"])
+    op.create_table(
+        "geofence_alerts",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "geofence_id", sa.BigInteger(), sa.ForeignKey("geofences.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("event_id", sa.BigInteger(), nullable=False),
+        sa.Column("event_detected_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.UniqueConstraint("geofence_id", "event_id"),
+    )
+    op.create_index("idx_geofence_alerts_fence", "geofence_alerts", ["geofence_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("geofence_alerts")
+    op.drop_table("geofences")
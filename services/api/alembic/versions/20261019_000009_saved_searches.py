@@ -0,0 +1,54 @@
+"""Saved searches and their percolated hits
+
+Revision ID: 20261019_000009
+Revises: 20261019_000008
+Create Date: 2026-10-19 00:00:09
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000009"
+down_revision = "20261019_000008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "saved_searches",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("owner", sa.Text(), nullable=False),
+        sa.Column("name", sa.Text(), nullable=False),
+        sa.Column("q", sa.Text()),
+        sa.Column("event_type", sa.Text()),
+        sa.Column("source_id", sa.Integer(), sa.ForeignKey("sources.id", ondelete="CASCADE")),
+        sa.Column("minlon", sa.Float()),
+        sa.Column("minlat", sa.Float()),
+        sa.Column("maxlon", sa.Float()),
+        sa.Column("maxlat", sa.Float()),
+        sa.Column("seen_hit_id", sa.BigInteger(), nullable=False, server_default=sa.text("0")),
+        sa.Column("active", sa.Boolean(), nullable=False, server_default=sa.text("true")),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.create_index("idx_saved_searches_owner", "saved_searches", ["owner"])
+    op.create_table(
+        "saved_search_hits",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "search_id", sa.BigInteger(), sa.ForeignKey("saved_searches.id", ondelete="CASCADE"), nullable=False
+        ),
+        sa.Column("event_id", sa.BigInteger(), nullable=False),
+        sa.Column("event_detected_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.UniqueConstraint("search_id", "event_id"),
+    )
+    op.create_index("idx_saved_search_hits_search", "saved_search_hits", ["search_id", "id"])
+
+
+def downgrade() -> None:
+    op.drop_table("saved_search_hits")
+    op.drop_table("saved_searches")
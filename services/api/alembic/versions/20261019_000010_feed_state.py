@@ -0,0 +1,30 @@
+"""Feed state for conditional fetches
+
+Revision ID: 20261019_000010
+Revises: 20261019_000009
+Create Date: 2026-10-19 00:00:10
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000010"
+down_revision = "20261019_000009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "feed_state",
+        sa.Column("url", sa.Text(), primary_key=True),
+        sa.Column("etag", sa.Text()),
+        sa.Column("last_modified", sa.Text()),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("feed_state")
@@ -0,0 +1,24 @@
+"""Body hash in feed state
+
+Revision ID: 20261019_000011
+Revises: 20261019_000010
+Create Date: 2026-10-19 00:00:11
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000011"
+down_revision = "20261019_000010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("feed_state", sa.Column("content_hash", sa.Text()))
+
+
+def downgrade() -> None:
+    op.drop_column("feed_state", "content_hash")
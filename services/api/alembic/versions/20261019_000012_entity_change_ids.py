@@ -0,0 +1,90 @@
+"""Entity change notifications carry the changed ids
+
+Revision ID: 20261019_000012
+Revises: 20261019_000011
+Create Date: 2026-10-19 00:00:12
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_000012"
+down_revision = "20261019_000011"
+branch_labels = None
+depends_on = None
+
+# (trigger, table, event, transition table)
+TRIGGERS = [
+    ("entities_notify_insert", "entities", "INSERT", "NEW TABLE AS new_rows"),
+    ("entities_notify_update", "entities", "UPDATE", "NEW TABLE AS new_rows"),
+    ("entities_notify_delete", "entities", "DELETE", "OLD TABLE AS old_rows"),
+    ("event_entities_notify_insert", "event_entities", "INSERT", "NEW TABLE AS new_rows"),
+    ("event_entities_notify_delete", "event_entities", "DELETE", "OLD TABLE AS old_rows"),
+]
+
+
+def upgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS event_entities_notify ON event_entities")
+    op.execute("DROP TRIGGER IF EXISTS entities_notify ON entities")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION entities_notify_ids(ids BIGINT[]) RETURNS void AS $$
+        DECLARE
+          chunk TEXT;
+        BEGIN
+          FOR chunk IN
+            SELECT string_agg(id::text, ',' ORDER BY id)
+            FROM (SELECT id, (row_number() OVER (ORDER BY id) - 1) / 300 AS grp FROM unnest(ids) AS u(id)) c
+            GROUP BY grp
+          LOOP
+            PERFORM pg_notify('entities_changed', chunk);
+          END LOOP;
+        END $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION entities_notify() RETURNS trigger AS $$
+        BEGIN
+          IF TG_TABLE_NAME = 'entities' AND TG_OP = 'DELETE' THEN
+            PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT id FROM old_rows));
+          ELSIF TG_TABLE_NAME = 'entities' THEN
+            PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT id FROM new_rows));
+          ELSIF TG_OP = 'DELETE' THEN
+            PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT entity_id FROM old_rows WHERE entity_id IS NOT NULL));
+          ELSE
+            PERFORM entities_notify_ids(ARRAY(SELECT DISTINCT entity_id FROM new_rows WHERE entity_id IS NOT NULL));
+          END IF;
+          RETURN NULL;
+        END $$ LANGUAGE plpgsql
+        """
+    )
+    for name, table, event, transition in TRIGGERS:
+        op.execute(
+            f"CREATE TRIGGER {name} AFTER {event} ON {table} "
+            f"REFERENCING {transition} FOR EACH STATEMENT EXECUTE FUNCTION entities_notify()"
+        )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name} ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS entities_notify_ids(BIGINT[])")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION entities_notify() RETURNS trigger AS $$
+        BEGIN
+          PERFORM pg_notify('entities_changed', TG_TABLE_NAME);
+          RETURN NULL;
+        END $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        "CREATE TRIGGER entities_notify AFTER INSERT OR UPDATE OR DELETE ON entities "
+        "FOR EACH STATEMENT EXECUTE FUNCTION entities_notify()"
+    )
+    op.execute(
+        "CREATE TRIGGER event_entities_notify AFTER INSERT OR DELETE ON event_entities "
+        "FOR EACH STATEMENT EXECUTE FUNCTION entities_notify()"
+    )
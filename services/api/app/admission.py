@@ -0,0 +1,212 @@
+"""Admission control and load shedding for expensive endpoints.
+
+Two independent guards protect Postgres during traffic spikes:
+
+* :class:`ConcurrencyLimiter` caps how many requests of one endpoint run at
+  once.  A bounded number may queue briefly; anything beyond that (or a
+  request that waits longer than ``queue_timeout``) is rejected immediately
+  with ``503`` and ``Retry-After`` instead of piling up on the database.
+* :class:`TokenBucket` rate-limits each user (``sub`` from the JWT).  Buckets
+  live in Redis so the limit holds across replicas; if Redis is unreachable
+  a per-process bucket is used until it recovers.  Exhausted buckets get
+  ``429`` with ``Retry-After``.
+
+Cheap endpoints (``/health``, single-event reads) are deliberately not
+guarded, so they stay responsive while expensive queries are shed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import structlog
+from fastapi import Depends, HTTPException, Request
+
+from .auth import get_current_user
+from .metrics import SHED_COUNTER
+
+logger = structlog.get_logger()
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("overloaded")
+        self.retry_after = retry_after
+
+
+class ConcurrencyLimiter:
+    """Semaphore with a bounded wait queue and a queueing deadline."""
+
+    def __init__(self, limit: int, max_queue: int, queue_timeout: float) -> None:
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self._cond: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so the limiter binds to the running event loop.
+        loop = asyncio.get_running_loop()
+        if self._cond is None or self._loop is not loop:
+            self._cond = asyncio.Condition()
+            self._loop = loop
+        return self._cond
+
+    async def acquire(self) -> None:
+        if self.active < self.limit and self.waiting == 0:
+            self.active += 1
+            return
+        if self.waiting >= self.max_queue:
+            raise Overloaded(retry_after=max(1.0, self.queue_timeout))
+        cond = self._condition()
+        self.waiting += 1
+        try:
+            async with cond:
+                await asyncio.wait_for(
+                    cond.wait_for(lambda: self.active < self.limit), timeout=self.queue_timeout
+                )
+                self.active += 1
+        except asyncio.TimeoutError:
+            raise Overloaded(retry_after=max(1.0, self.queue_timeout)) from None
+        finally:
+            self.waiting -= 1
+
+    async def release(self) -> None:
+        self.active -= 1
+        if self._cond is not None and self._loop is asyncio.get_running_loop():
+            async with self._cond:
+                self._cond.notify()
+
+
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(wait)}
+"""
+
+
+class TokenBucket:
+    """Per-key token bucket stored in Redis with an in-process fallback."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        redis_url: Optional[str] = None,
+        retry_redis_after: float = 30.0,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.redis_url = redis_url
+        self.retry_redis_after = retry_redis_after
+        self._redis = None
+        self._script = None
+        self._redis_down_until = 0.0
+        self._local: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, cost: float = 1.0) -> Tuple[bool, float]:
+        """Try to take ``cost`` tokens; return ``(allowed, retry_after_seconds)``."""
+
+        if self.redis_url and time.monotonic() >= self._redis_down_until:
+            try:
+                return await self._take_redis(key, cost)
+            except Exception as exc:
+                logger.warning("rate_limit_redis_unavailable", error=str(exc))
+                self._redis_down_until = time.monotonic() + self.retry_redis_after
+        return self._take_local(key, cost)
+
+    async def _take_redis(self, key: str, cost: float) -> Tuple[bool, float]:
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+            self._script = self._redis.register_script(_TOKEN_BUCKET_LUA)
+        allowed, wait = await self._script(
+            keys=[f"ratelimit:{key}"], args=[self.rate, self.burst, time.time(), cost]
+        )
+        return bool(int(allowed)), float(wait)
+
+    def _take_local(self, key: str, cost: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._local.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - ts) * self.rate)
+            if tokens >= cost:
+                self._local[key] = (tokens - cost, now)
+                return True, 0.0
+            self._local[key] = (tokens, now)
+            return False, (cost - tokens) / self.rate
+
+
+def _retry_after(seconds: float) -> str:
+    return str(max(1, math.ceil(seconds)))
+
+
+def admission(
+    route: str,
+    limiter: ConcurrencyLimiter,
+    bucket: Optional[TokenBucket],
+    when: Optional[Callable[[Request], bool]] = None,
+):
+    """Build a FastAPI dependency guarding ``route`` with ``limiter`` and ``bucket``.
+
+    ``when`` lets an endpoint opt in only for its expensive variants (for
+    example ``/search`` with a text query).
+    """
+
+    async def _dependency(request: Request, user: dict = Depends(get_current_user)):
+        if when is not None and not when(request):
+            yield
+            return
+        if bucket is not None:
+            sub = user.get("sub")
+            if not sub or sub == "anonymous":
+                # Anonymous callers are bucketed per client address instead of
+                # sharing one global bucket.
+                sub = f"anon:{request.client.host if request.client else 'unknown'}"
+            allowed, wait = await bucket.take(str(sub))
+            if not allowed:
+                SHED_COUNTER.labels(route, "rate_limited").inc()
+                raise HTTPException(
+                    status_code=429,
+                    detail="Rate limit exceeded",
+                    headers={"Retry-After": _retry_after(wait)},
+                )
+        try:
+            await limiter.acquire()
+        except Overloaded as exc:
+            SHED_COUNTER.labels(route, "overloaded").inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, retry later",
+                headers={"Retry-After": _retry_after(exc.retry_after)},
+            ) from None
+        try:
+            yield
+        finally:
+            await limiter.release()
+
+    return _dependency
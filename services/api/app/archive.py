@@ -0,0 +1,344 @@
+"""Read-through to the Parquet cold tier of events.
+
+The ingest archiver (``ingest/ingest/archive.py``) moves monthly ``events``
+partitions older than the hot window to hive-partitioned Parquet files
+(``<root>/events/year=YYYY/month=MM/*.parquet``) and drops them from
+Postgres.  Queries whose time range starts before the oldest partition still
+in Postgres (the *floor*) also read those files through ``pyarrow.dataset``;
+the files' ``year``/``month`` directories prune to the months a query
+touches.
+
+Only rows older than the floor are read from the archive, so a month is
+served from exactly one tier.  Queries without an explicit start time serve
+the hot tier only.  Enable with ``ENABLE_ARCHIVE=true``; ``pyarrow`` is
+imported lazily.
+
+Pages are read newest month first into a bounded top-``limit`` heap, and the
+walk stops at the first month entirely older than the page's last row, so a
+``since`` years back costs about one month of reads per page.  The opened
+dataset and the floor are kept by :class:`Tier` for ``ARCHIVE_CACHE_SECONDS``.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .filters import EventFilter
+
+FLOOR_SQL = r"""
+    SELECT min(c.relname) AS name
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = 'events'::regclass AND c.relname ~ '^events_p[0-9]{6}$'
+"""
+
+EVENT_COLUMNS = (
+    "id",
+    "source_id",
+    "title",
+    "body",
+    "event_type",
+    "occurred_at",
+    "detected_at",
+    "jurisdiction",
+    "confidence",
+    "severity",
+    "lon",
+    "lat",
+    "cluster_id",
+)
+
+# Columns of /search and /events/geojson rows; ``source`` is the source name
+# as it was when the month was archived.
+SEARCH_COLUMNS = EVENT_COLUMNS[:3] + ("source",) + EVENT_COLUMNS[3:-1]
+GEOJSON_COLUMNS = (
+    "id", "title", "body", "event_type", "occurred_at", "detected_at",
+    "lon", "lat", "jurisdiction", "confidence", "severity", "source",
+)
+TIMELINE_COLUMNS = ("id", "detected_at", "source_id", "title", "occurred_at", "jurisdiction", "confidence", "severity")
+
+
+_MONTH_DIR = re.compile(r"year=(\d+)/month=(\d+)")
+_OLDEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _month_start(day: date, months_back: int) -> datetime:
+    index = day.year * 12 + day.month - 1 - months_back
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _aware(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def may_reach(flt: EventFilter, after_months: int, today: Optional[date] = None) -> bool:
+    """Cheap pre-check: could ``flt`` touch months the archiver has moved?
+
+    The archiver never moves months inside the configured hot window, so
+    recent queries skip the catalog lookup for the floor entirely.
+    """
+
+    if flt.start is None:
+        return False
+    return _aware(flt.start) < _month_start(today or date.today(), after_months)
+
+
+def reaches(flt: EventFilter, floor: Optional[datetime]) -> bool:
+    """Does ``flt`` start before ``floor``, the oldest month still in Postgres?"""
+
+    return floor is not None and flt.start is not None and _aware(flt.start) < floor
+
+
+def floor_from(name: Optional[str]) -> Optional[datetime]:
+    """Start of the month held by partition ``events_pYYYYMM``."""
+
+    if not name:
+        return None
+    return datetime(int(name[8:12]), int(name[12:14]), 1, tzinfo=timezone.utc)
+
+
+def filesystem(uri: str):
+    """Return ``(pyarrow filesystem, root path)``; mirrors the ingest archiver."""
+
+    from pyarrow import fs
+
+    uri = uri or f"s3://{os.getenv('MINIO_BUCKET', 'raw')}/archive"
+    if uri.startswith("s3://"):
+        s3 = fs.S3FileSystem(
+            access_key=os.getenv("MINIO_ROOT_USER", ""),
+            secret_key=os.getenv("MINIO_ROOT_PASSWORD", ""),
+            endpoint_override=f"{os.getenv('MINIO_HOST', 'minio')}:{os.getenv('MINIO_PORT', '9000')}",
+            scheme="http",
+        )
+        return s3, uri[len("s3://"):].rstrip("/")
+    return fs.LocalFileSystem(), os.path.abspath(uri.removeprefix("file://"))
+
+
+def dataset(uri: str):
+    """Open the archive as a dataset, or ``None`` when nothing is archived yet."""
+
+    import pyarrow.dataset as ds
+
+    fs, root = filesystem(uri)
+    try:
+        dset = ds.dataset(f"{root}/events", filesystem=fs, format="parquet", partitioning="hive")
+    except (FileNotFoundError, OSError):
+        return None
+    if "cluster_id" not in dset.schema.names:
+        # Months archived before clustering lack the column; read it as null.
+        import pyarrow as pa
+
+        dset = dset.replace_schema(dset.schema.append(pa.field("cluster_id", pa.int64())))
+    return dset
+
+
+class Tier:
+    """The archive dataset and floor, reopened at most every ``ttl`` seconds.
+
+    Listing the files and looking up the floor are too slow to repeat per
+    request, and both only change when the archiver moves a month.
+    """
+
+    def __init__(self, floor_name: Callable[[], Optional[str]], ttl: float = 60.0) -> None:
+        self._floor_name = floor_name
+        self.ttl = ttl
+        self._cached: Optional[tuple] = None
+
+    def get(self, uri: str):
+        """``(dataset, floor)``; either is ``None`` when nothing is archived."""
+
+        cached = self._cached
+        now = time.monotonic()
+        if cached is None or cached[0] != uri or now - cached[1] >= self.ttl:
+            floor = floor_from(self._floor_name())
+            cached = self._cached = (uri, now, dataset(uri) if floor is not None else None, floor)
+        return cached[2], cached[3]
+
+    def clear(self) -> None:
+        self._cached = None
+
+
+def _month_bound(ds, when: datetime, op: str):
+    year, month = ds.field("year"), ds.field("month")
+    if op == ">=":
+        return (year > when.year) | ((year == when.year) & (month >= when.month))
+    return (year < when.year) | ((year == when.year) & (month <= when.month))
+
+
+def expression(flt: EventFilter, floor: datetime, months: bool = True):
+    """Translate ``flt`` (restricted to rows before ``floor``) into a dataset filter.
+
+    ``months`` adds the ``year``/``month`` partition bounds that prune whole
+    files; leave them out when filtering a single file's rows.
+    """
+
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    ts = pa.timestamp("us", tz="UTC")
+    detected = ds.field("detected_at")
+    expr = detected < pa.scalar(floor, type=ts)
+    if months:
+        expr &= _month_bound(ds, floor, "<=")
+    if flt.event_type is not None:
+        expr &= ds.field("event_type") == flt.event_type
+    if flt.source_id is not None:
+        expr &= ds.field("source_id") == flt.source_id
+    if flt.start is not None:
+        start = _aware(flt.start)
+        expr &= detected >= pa.scalar(start, type=ts)
+        if months:
+            expr &= _month_bound(ds, start, ">=")
+    if flt.end is not None:
+        end = _aware(flt.end)
+        expr &= detected <= pa.scalar(end, type=ts)
+        if months:
+            expr &= _month_bound(ds, end, "<=")
+    if flt.bbox is not None:
+        minlon, minlat, maxlon, maxlat = flt.bbox
+        lon, lat = ds.field("lon"), ds.field("lat")
+        expr &= (lon >= minlon) & (lon <= maxlon) & (lat >= minlat) & (lat <= maxlat)
+    if flt.q is not None:
+        title = pc.match_substring(ds.field("title"), flt.q, ignore_case=True)
+        body = pc.match_substring(ds.field("body"), flt.q, ignore_case=True)
+        expr &= title | pc.coalesce(body, False)
+    if flt.before is not None:
+        at, event_id = flt.before
+        at = pa.scalar(_aware(at), type=ts)
+        expr &= (detected < at) | ((detected == at) & (ds.field("id") < event_id))
+    if flt.collapse:
+        cluster = ds.field("cluster_id")
+        expr &= cluster.is_null() | (cluster == ds.field("id"))
+    return expr
+
+
+def _months(dset, expr) -> List[Tuple[Tuple[int, int], list]]:
+    """Fragments matching ``expr`` grouped by ``(year, month)``, newest first."""
+
+    by_month: Dict[Tuple[int, int], list] = defaultdict(list)
+    for fragment in dset.get_fragments(filter=expr):
+        match = _MONTH_DIR.search(fragment.path)
+        by_month[(int(match[1]), int(match[2]))].append(fragment)
+    return sorted(by_month.items(), reverse=True)
+
+
+def sort_key(order: str):
+    """Descending-order key on ``order`` then ``id``; ``NULL`` sorts first as in Postgres."""
+
+    def key(row: Dict):
+        value = row[order]
+        return (value is None, _OLDEST if value is None else _aware(value), row["id"])
+
+    return key
+
+
+def merge(hot: List[Dict], cold: List[Dict], order: str = "detected_at") -> List[Dict]:
+    """Rows of both tiers in one descending ``order``."""
+
+    return sorted(hot + cold, key=sort_key(order), reverse=True)
+
+
+def fetch_events(
+    dset,
+    flt: EventFilter,
+    floor: datetime,
+    limit: int,
+    include_raw: bool = False,
+    columns: Sequence[str] = EVENT_COLUMNS,
+    order: str = "detected_at",
+    located: bool = False,
+) -> List[Dict]:
+    """First ``limit`` archived events matching ``flt`` by descending ``order``.
+
+    Months are read newest first; when ordering by ``detected_at`` the walk
+    stops at a month that ends before the current ``limit``-th row.
+    ``located`` keeps only events with coordinates.
+    """
+
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+
+    cols = list(columns) + (["raw"] if include_raw else [])
+    rows_expr = expression(flt, floor, months=False)
+    if located:
+        rows_expr &= ds.field("lon").is_valid() & ds.field("lat").is_valid()
+    key = sort_key(order)
+    heap: List[tuple] = []
+    for (year, month), fragments in _months(dset, expression(flt, floor)):
+        if order == "detected_at" and len(heap) == limit:
+            month_end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+            if heap[0][0][1] >= month_end:
+                break
+        for fragment in fragments:
+            for batch in fragment.to_batches(columns=cols, filter=rows_expr, schema=dset.schema):
+                if order == "detected_at" and batch.num_rows > limit:
+                    batch = batch.take(
+                        pc.select_k_unstable(
+                            batch, k=limit, sort_keys=[("detected_at", "descending"), ("id", "descending")]
+                        )
+                    )
+                for row in batch.to_pylist():
+                    item = (key(row), row)
+                    if len(heap) < limit:
+                        heapq.heappush(heap, item)
+                    elif item[0] > heap[0][0]:
+                        heapq.heapreplace(heap, item)
+    rows = [row for _, row in sorted(heap, key=lambda item: item[0], reverse=True)]
+    if include_raw:
+        for row in rows:
+            row["raw"] = json.loads(row["raw"]) if row["raw"] else None
+    return rows
+
+
+def count_events(dset, flt: EventFilter, floor: datetime) -> Dict:
+    """Exact archived counts for ``flt``: ``total`` plus ``by_type``/``by_source`` dicts.
+
+    Counted batch by batch over two columns, so memory stays flat however
+    many months match.
+    """
+
+    import pyarrow.compute as pc
+
+    by_type: Dict[Optional[str], int] = defaultdict(int)
+    by_source: Dict[Optional[str], int] = defaultdict(int)
+    for batch in dset.to_batches(columns=["event_type", "source"], filter=expression(flt, floor)):
+        for column, counts in ((batch.column(0), by_type), (batch.column(1), by_source)):
+            for vc in pc.value_counts(column).to_pylist():
+                counts[vc["values"]] += vc["counts"]
+    return {"total": sum(by_type.values()), "by_type": dict(by_type), "by_source": dict(by_source)}
+
+
+def lookup(dset, keys: Sequence[Tuple[int, datetime]], columns: Sequence[str]) -> Dict[int, Dict]:
+    """Archived rows for ``(id, detected_at)`` keys, by id; only their months are read."""
+
+    import pyarrow.dataset as ds
+
+    if not keys:
+        return {}
+    at = [_aware(k[1]) for k in keys]
+    expr = _month_bound(ds, min(at), ">=") & _month_bound(ds, max(at), "<=")
+    expr &= ds.field("id").isin([int(k[0]) for k in keys])
+    return {row["id"]: row for row in dset.to_table(columns=list(columns), filter=expr).to_pylist()}
+
+
+def export_rows(dset, flt: EventFilter, floor: datetime, columns: Sequence[str], batch_size: int) -> Iterator[List[tuple]]:
+    """Yield archived rows in ``(detected_at, id)`` order, ``batch_size`` at a time.
+
+    Files are read month by month in path order, and each file was written
+    sorted, so no global sort is needed.
+    """
+
+    rows = expression(flt, floor, months=False)
+    fragments = sorted(dset.get_fragments(filter=expression(flt, floor)), key=lambda f: f.path)
+    for fragment in fragments:
+        for batch in fragment.to_batches(columns=list(columns), filter=rows, batch_size=batch_size, schema=dset.schema):
+            if batch.num_rows:
+                yield list(zip(*(col.to_pylist() for col in batch.columns)))
@@ -2,7 +2,6 @@ import os
 from datetime import datetime, timedelta
 
 from fastapi import HTTPException, Request, status
-from jose import JWTError, jwt
 from structlog.contextvars import bind_contextvars
 
 
@@ -12,6 +11,16 @@ ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))
 
 
+def __getattr__(name: str):
+    """Resolve ``jwt`` / ``JWTError`` lazily so importing the API skips python-jose."""
+
+    if name in ("jwt", "JWTError"):
+        from jose import JWTError, jwt
+
+        return {"jwt": jwt, "JWTError": JWTError}[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
     """Create a signed JWT from ``data``."""
 
@@ -20,6 +29,8 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire})
+    from jose import jwt
+
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
@@ -60,6 +71,9 @@ def get_current_user(request: Request):
             detail="Invalid authorization header",
         )
 
+    # Imported lazily: anonymous requests never need the JWT backend.
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError as exc:  # pragma: no cover - detail for client
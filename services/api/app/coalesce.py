@@ -0,0 +1,142 @@
+"""Single-flight coalescing of identical concurrent requests.
+
+When a dashboard refresh fires dozens of identical ``/stats/summary`` or
+``/events/geojson`` requests at once, only the first one (the *leader*) runs
+the query; the others await the leader's result.  The computation runs in
+the thread pool so the blocking database call does not stall the event loop
+while followers wait.
+
+With ``redis_url`` configured the leader additionally takes a short Redis lock
+and publishes its result under the same key, so followers on *other* replicas
+can reuse it instead of issuing the same query.  Redis problems never fail a
+request: the flight silently falls back to computing locally.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+import orjson
+import structlog
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import COALESCED_COUNTER
+
+logger = structlog.get_logger()
+
+
+def make_key(route: str, **params: Any) -> str:
+    """Return a stable key for ``route`` and its (normalised) parameters.
+
+    ``None`` values are dropped and parameters are sorted, so ``?a=1&b=2``,
+    ``?b=2&a=1`` and ``?a=1&b=2&c=`` all coalesce together.
+    """
+
+    items = sorted((k, str(v)) for k, v in params.items() if v is not None and v != "")
+    return f"{route}?{urlencode(items)}"
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one computation."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        lock_ttl: float = 10.0,
+        result_ttl: float = 2.0,
+        poll_interval: float = 0.025,
+    ) -> None:
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.redis_url = redis_url
+        self.lock_ttl = lock_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._redis = None
+
+    async def do(self, key: str, fn: Callable[..., Any], *args: Any, route: str = "", **kwargs: Any) -> Any:
+        """Return ``fn(*args, **kwargs)``, sharing the result with identical calls."""
+
+        task = self._inflight.get(key)
+        if task is not None:
+            COALESCED_COUNTER.labels(route or key.split("?", 1)[0]).inc()
+        else:
+            task = asyncio.ensure_future(self._compute(key, fn, args, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._inflight.pop(k, None))
+        # Shield so a disconnecting client does not cancel work others await.
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        client = self._get_redis()
+        if client is None:
+            return await run_in_threadpool(fn, *args, **kwargs)
+        try:
+            return await self._compute_shared(client, key, fn, args, kwargs)
+        except _RedisUnavailable:
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+    def _get_redis(self):
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError:  # pragma: no cover - redis is a hard dependency today
+                self.redis_url = None
+                return None
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=0.5)
+        return self._redis
+
+    async def _compute_shared(self, client, key: str, fn, args: tuple, kwargs: dict) -> Any:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        lock_key = f"sf:lock:{digest}"
+        result_key = f"sf:result:{digest}"
+        token = uuid.uuid4().hex
+        try:
+            cached = await client.get(result_key)
+            if cached is not None:
+                COALESCED_COUNTER.labels(key.split("?", 1)[0]).inc()
+                return orjson.loads(cached)
+            acquired = await client.set(lock_key, token, nx=True, px=int(self.lock_ttl * 1000))
+        except Exception as exc:
+            logger.warning("singleflight_redis_error", error=str(exc))
+            raise _RedisUnavailable from exc
+
+        if not acquired:
+            deadline = time.monotonic() + self.lock_ttl
+            try:
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(self.poll_interval)
+                    cached = await client.get(result_key)
+                    if cached is not None:
+                        COALESCED_COUNTER.labels(key.split("?", 1)[0]).inc()
+                        return orjson.loads(cached)
+                    if not await client.exists(lock_key):
+                        break
+            except Exception as exc:
+                logger.warning("singleflight_redis_error", error=str(exc))
+            # The remote leader failed or timed out: compute locally.
+            return await run_in_threadpool(fn, *args, **kwargs)
+
+        try:
+            result = await run_in_threadpool(fn, *args, **kwargs)
+            try:
+                await client.set(result_key, orjson.dumps(result), px=int(self.result_ttl * 1000))
+            except Exception as exc:
+                logger.warning("singleflight_redis_error", error=str(exc))
+            return result
+        finally:
+            try:
+                if await client.get(lock_key) == token.encode():
+                    await client.delete(lock_key)
+            except Exception:
+                pass
+
+
+class _RedisUnavailable(Exception):
+    pass
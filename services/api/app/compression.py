@@ -0,0 +1,276 @@
+"""Negotiated response compression (zstd, brotli, gzip).
+
+Large GeoJSON and graph payloads dominate transfer time for remote analysts,
+so responses above ``minimum_size`` are compressed with the best encoding the
+client advertises in ``Accept-Encoding``.  ``zstandard`` and ``brotli`` are
+optional; when either library is missing that encoding is simply not offered
+and gzip (stdlib) remains available.
+
+Buffered responses are compressed in one shot and the result is kept in a
+small content-addressed LRU, so popular payloads (the dashboard's default
+GeoJSON, summary stats) are compressed once and re-served from memory.
+Streaming responses are compressed chunk by chunk and flushed after every
+chunk so clients still receive data progressively.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Server preference when the client ranks several encodings equally.
+PREFERENCE = ("zstd", "br", "gzip")
+
+# Media types that are already compressed (or gain nothing from it).
+SKIP_MEDIA_PREFIXES = (
+    "image/",
+    "video/",
+    "audio/",
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/vnd.apache.parquet",
+)
+
+
+class _StreamCompressor:
+    """Uniform incremental interface over the three codecs."""
+
+    def __init__(self, encoding: str, level: Optional[int] = None) -> None:
+        self.encoding = encoding
+        if encoding == "zstd":
+            import zstandard
+
+            self._obj = zstandard.ZstdCompressor(level=level or 3).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        elif encoding == "br":
+            import brotli
+
+            self._obj = brotli.Compressor(quality=level or 5)
+        else:
+            self._obj = zlib.compressobj(level or 6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress ``data`` and flush so the chunk is decodable immediately."""
+
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush(self._flush_mode)
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the final ``data`` and terminate the stream."""
+
+        if self.encoding == "zstd":
+            return self._obj.compress(data) + self._obj.flush()
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.finish()
+        return self._obj.compress(data) + self._obj.flush()
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    """Compress a complete body with ``encoding``."""
+
+    return _StreamCompressor(encoding, level).finish(data)
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the encodings supported by the installed libraries."""
+
+    # find_spec checks availability without importing the codec at startup.
+    modules = {"zstd": "zstandard", "br": "brotli"}
+    return tuple(
+        encoding
+        for encoding in PREFERENCE
+        if encoding not in modules or importlib.util.find_spec(modules[encoding]) is not None
+    )
+
+
+def negotiate(accept_encoding: str, supported: tuple[str, ...]) -> Optional[str]:
+    """Pick the encoding for an ``Accept-Encoding`` header value.
+
+    Quality values are honoured (``q=0`` disables an encoding); ties are
+    broken by :data:`PREFERENCE` order.  ``*`` matches any supported encoding
+    not listed explicitly.  Returns ``None`` when identity should be used.
+    """
+
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[token] = q
+    best: Optional[str] = None
+    best_q = 0.0
+    for encoding in supported:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed by encoding and content digest."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[tuple[str, bytes], bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, body: bytes, encoding: str, fn: Callable[[bytes, str], bytes]) -> bytes:
+        if self.max_entries <= 0:
+            return fn(body, encoding)
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+                return hit
+        compressed = fn(body, encoding)
+        if len(compressed) > self.max_bytes:
+            return compressed
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = compressed
+                self._bytes += len(compressed)
+                while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                    _, evicted = self._data.popitem(last=False)
+                    self._bytes -= len(evicted)
+        return compressed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying negotiated content-encoding to responses."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Optional[tuple[str, ...]] = None,
+        cache_entries: int = 256,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        supported = available_encodings()
+        if encodings:
+            supported = tuple(e for e in supported if e in encodings)
+        self.encodings = supported
+        self.cache = CompressedBodyCache(max_entries=cache_entries)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressionResponder(self.app, encoding, self.minimum_size, self.cache)
+        await responder(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int, cache: CompressedBodyCache) -> None:
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.send: Send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.stream: Optional[_StreamCompressor] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def _should_skip(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return True
+        if message.get("status", 200) in (204, 304) or message.get("status", 200) < 200:
+            return True
+        media = headers.get("content-type", "").lower()
+        return media.startswith(SKIP_MEDIA_PREFIXES)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk tells us
+            # whether the response is large enough to be worth compressing.
+            self.initial_message = message
+            self.passthrough = self._should_skip(message)
+            return
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if not self.started:
+            self.started = True
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            if not more_body:
+                if len(body) < self.minimum_size:
+                    await self.send(self.initial_message)
+                    await self.send(message)
+                    return
+                body = self.cache.get_or_compress(body, self.encoding, compress)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                await self.send(self.initial_message)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            # Streaming response: the total size is unknown, so compress
+            # every chunk as it arrives.
+            self.stream = _StreamCompressor(self.encoding)
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.send(self.initial_message)
+
+        if self.stream is None:  # pragma: no cover - defensive
+            await self.send(message)
+            return
+        chunk = self.stream.compress(body) if more_body else self.stream.finish(body)
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
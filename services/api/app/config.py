@@ -1,24 +1,102 @@
 from functools import lru_cache
-from pydantic import BaseModel
+from typing import Any, Callable
+from pydantic import BaseModel, Field
 import os
 
 
+def _env(name: str, default: str, cast: Callable[[str], Any] = str) -> Any:
+    """Field whose value is read from ``name`` when ``Settings`` is instantiated.
+
+    Reading the environment at class-definition time would freeze whatever was
+    set when the module was first imported.
+    """
+    return Field(default_factory=lambda: cast(os.getenv(name, default)))
+
+
+def _flag(value: str) -> bool:
+    return value.lower() == "true"
+
+
+def _redis_host() -> str:
+    return os.getenv("REDIS_HOST", os.getenv("REDIS_URL", "redis://redis:6379").split("://")[-1].split(":")[0])
+
+
+def _redis_url() -> str:
+    return os.getenv("REDIS_URL", f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}")
+
+
+def _qdrant_url() -> str:
+    return os.getenv("QDRANT_URL", f"http://{os.getenv('QDRANT_HOST', 'qdrant')}:{os.getenv('QDRANT_PORT', '6333')}")
+
+
 class Settings(BaseModel):
     # Primary database URL
-    database_url: str = os.getenv("DATABASE_URL", "postgresql://aoidb:aoidb@db:5432/aoidb")
+    database_url: str = _env("DATABASE_URL", "postgresql://aoidb:aoidb@db:5432/aoidb")
 
     # Redis configuration
-    redis_host: str = os.getenv("REDIS_HOST", os.getenv("REDIS_URL", "redis://redis:6379").split("://")[-1].split(":")[0])
-    redis_port: int = int(os.getenv("REDIS_PORT", "6379"))
-    redis_url: str = os.getenv("REDIS_URL", f"redis://{os.getenv('REDIS_HOST', 'redis')}:{os.getenv('REDIS_PORT', '6379')}")
+    redis_host: str = Field(default_factory=_redis_host)
+    redis_port: int = _env("REDIS_PORT", "6379", int)
+    redis_url: str = Field(default_factory=_redis_url)
 
     # Qdrant configuration
-    qdrant_host: str = os.getenv("QDRANT_HOST", "qdrant")
-    qdrant_port: int = int(os.getenv("QDRANT_PORT", "6333"))
-    qdrant_url: str = os.getenv("QDRANT_URL", f"http://{os.getenv('QDRANT_HOST', 'qdrant')}:{os.getenv('QDRANT_PORT', '6333')}")
+    qdrant_host: str = _env("QDRANT_HOST", "qdrant")
+    qdrant_port: int = _env("QDRANT_PORT", "6333", int)
+    qdrant_url: str = Field(default_factory=_qdrant_url)
+    qdrant_collection: str = _env("QDRANT_COLLECTION", "events")
+    # Vector index for /search/semantic: "qdrant", or "memory" for tests/local runs
+    vector_backend: str = _env("VECTOR_BACKEND", "qdrant")
+    embedding_dim: int = _env("EMBEDDING_DIM", "384", int)
+    # Precomputed /events/{id}/related lists: length and time window (days)
+    related_k: int = _env("RELATED_K", "10", int)
+    related_window_days: float = _env("RELATED_WINDOW_DAYS", "30", float)
+
+    # MinIO raw store (probed by the health checker)
+    minio_host: str = _env("MINIO_HOST", "minio")
+    minio_port: int = _env("MINIO_PORT", "9000", int)
+
+    # Background health probing
+    health_interval: float = _env("HEALTH_INTERVAL", "10", float)
+    health_timeout: float = _env("HEALTH_TIMEOUT", "2", float)
+    # Dependencies that must be up for the API to report ready
+    health_critical: str = _env("HEALTH_CRITICAL", "postgres,redis")
 
     # API settings
-    api_port: int = int(os.getenv("API_PORT", 8000))
+    api_port: int = _env("API_PORT", "8000", int)
+
+    # Response compression: bodies smaller than this are sent as-is
+    compression_min_size: int = _env("COMPRESSION_MIN_SIZE", "1024", int)
+    # Comma separated subset of zstd,br,gzip; empty means all installed codecs
+    compression_encodings: str = _env("COMPRESSION_ENCODINGS", "")
+    # Number of compressed bodies kept in memory (0 disables the cache)
+    compression_cache_entries: int = _env("COMPRESSION_CACHE_ENTRIES", "256", int)
+
+    # Share identical in-flight query results across replicas through Redis
+    coalesce_redis: bool = _env("COALESCE_REDIS", "false", _flag)
+    coalesce_result_ttl: float = _env("COALESCE_RESULT_TTL", "2", float)
+
+    # Admission control for expensive endpoints (per endpoint, per process)
+    admission_concurrency: int = _env("ADMISSION_CONCURRENCY", "8", int)
+    admission_queue: int = _env("ADMISSION_QUEUE", "16", int)
+    admission_queue_timeout: float = _env("ADMISSION_QUEUE_TIMEOUT", "2", float)
+    # Per-user token bucket shared through Redis ("redis" or "local")
+    rate_limit_per_minute: float = _env("RATE_LIMIT_PER_MINUTE", "120", float)
+    rate_limit_burst: float = _env("RATE_LIMIT_BURST", "30", float)
+    rate_limit_backend: str = _env("RATE_LIMIT_BACKEND", "redis")
+
+    # Heap blocks read by /stats/summary?approx=1 sampled estimates
+    stats_sample_blocks: int = _env("STATS_SAMPLE_BLOCKS", "2000", int)
+
+    # Entity typeahead cache (0 disables it; suggestions then query Postgres)
+    suggest_cache_entries: int = _env("SUGGEST_CACHE_ENTRIES", "50000", int)
+    suggest_max_age: float = _env("SUGGEST_MAX_AGE", "300", float)
+
+    # Parquet cold tier written by the ingest archiver
+    archive_enabled: bool = _env("ENABLE_ARCHIVE", "false", _flag)
+    # s3://bucket/prefix on MinIO or a local directory; empty means s3://$MINIO_BUCKET/archive
+    archive_uri: str = _env("EVENTS_ARCHIVE_URI", "")
+    archive_after_months: int = _env("EVENTS_ARCHIVE_AFTER_MONTHS", "6", int)
+    # How long the opened archive and the hot tier's floor are reused
+    archive_cache_seconds: float = _env("ARCHIVE_CACHE_SECONDS", "60", float)
 
 
 @lru_cache(maxsize=1)
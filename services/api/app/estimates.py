@@ -0,0 +1,178 @@
+"""Approximate event counts for ``/stats/summary?approx=1``.
+
+Exact summaries run ``count(*)`` scans over the whole filtered window.  The
+dashboard header only needs ballpark figures, so two cheaper estimators are
+offered:
+
+* **planner** (no filters): per-partition ``reltuples`` for the total and the
+  ``pg_stats`` most-common-value frequencies of ``event_type`` and
+  ``source_id`` for the breakdowns.  Free to compute; as fresh as the last
+  ``ANALYZE``.  Values outside a column's MCV list are not reported.
+* **sample** (any filter): the filtered query over ``TABLESAMPLE SYSTEM (p)``,
+  which reads roughly ``p`` percent of the heap blocks.  SYSTEM includes each
+  block independently with probability ``p``, so per-block counts ``y`` give
+  the Horvitz-Thompson estimate ``sum(y) / p`` with variance estimate
+  ``(1 - p) / p**2 * sum(y**2)``; every count carries a 95% interval.
+
+The sampling rate targets a fixed number of blocks, so cost stays flat as the
+table grows.  When the table is smaller than the target, counts are exact.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Fetch = Callable[..., List[dict]]
+
+# events itself (unpartitioned databases) and its leaf partitions.
+RELATIONS_SQL = """
+    SELECT c.relname, c.reltuples, c.relpages
+    FROM pg_class c
+    WHERE c.relkind = 'r'
+      AND (c.oid = 'events'::regclass
+           OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'events'::regclass))
+"""
+
+MCV_SQL = """
+    SELECT s.tablename, s.attname, s.null_frac,
+           s.most_common_vals::text AS vals, s.most_common_freqs AS freqs
+    FROM pg_stats s
+    WHERE s.schemaname = current_schema()
+      AND s.tablename = ANY(%s)
+      AND s.attname IN ('event_type', 'source_id')
+      AND NOT s.inherited
+"""
+
+ANALYZED_SQL = """
+    SELECT max(greatest(last_analyze, last_autoanalyze)) AS as_of
+    FROM pg_stat_user_tables
+    WHERE relname = ANY(%s)
+"""
+
+# One row per (sampled block, type, source) with the block's matching rows.
+SAMPLE_SQL = """
+    SELECT e.tableoid AS rel, (e.ctid::text::point)[0]::bigint AS blk,
+           e.event_type, s.name AS source_name, count(*) AS y
+    FROM events e TABLESAMPLE SYSTEM (%s)
+    LEFT JOIN sources s ON s.id = e.source_id
+    {where}
+    GROUP BY 1, 2, 3, 4
+"""
+
+Z95 = 1.96
+
+
+def _relations(fetch_all: Fetch) -> List[dict]:
+    return fetch_all(RELATIONS_SQL)
+
+
+def _parse_array(text: Optional[str]) -> List[str]:
+    """Parse the text form of a one-dimensional array of simple values."""
+
+    if not text or text == "{}":
+        return []
+    return [v.strip('"') for v in text.strip("{}").split(",")]
+
+
+def planner(fetch_all: Fetch) -> Optional[dict]:
+    """Summary from planner statistics; ``None`` if the table was never analyzed."""
+
+    rels = [r for r in _relations(fetch_all) if r["reltuples"] and r["reltuples"] > 0]
+    if not rels:
+        return None
+    rows = {r["relname"]: float(r["reltuples"]) for r in rels}
+    names = list(rows)
+    by_type: Dict[str, float] = defaultdict(float)
+    by_source_id: Dict[Optional[int], float] = defaultdict(float)
+    for st in fetch_all(MCV_SQL, [names]):
+        n = rows.get(st["tablename"], 0.0)
+        freqs = st["freqs"] or []
+        vals = _parse_array(st["vals"])
+        if st["attname"] == "event_type":
+            for val, freq in zip(vals, freqs):
+                by_type[val] += freq * n
+        else:
+            for val, freq in zip(vals, freqs):
+                by_source_id[int(val)] += freq * n
+            by_source_id[None] += (st["null_frac"] or 0.0) * n
+    source_names = {r["id"]: r["name"] for r in fetch_all("SELECT id, name FROM sources")}
+    by_source: Dict[Optional[str], float] = defaultdict(float)
+    for sid, c in by_source_id.items():
+        if c:
+            by_source[source_names.get(sid) if sid is not None else None] += c
+    analyzed = fetch_all(ANALYZED_SQL, [names])
+    return {
+        "total": round(sum(rows.values())),
+        "counts_by_type": [
+            {"event_type": k, "c": round(v)} for k, v in sorted(by_type.items(), key=lambda kv: -kv[1])
+        ],
+        "counts_by_source": [
+            {"source_name": k, "c": round(v)} for k, v in sorted(by_source.items(), key=lambda kv: -kv[1])
+        ],
+        "approx": {"method": "planner", "as_of": analyzed[0]["as_of"] if analyzed else None},
+    }
+
+
+def sample_percent(fetch_all: Fetch, target_blocks: int) -> float:
+    """Percentage of heap blocks to sample so about ``target_blocks`` are read."""
+
+    pages = sum(max(r["relpages"] or 0, 0) for r in _relations(fetch_all))
+    if pages <= target_blocks:
+        return 100.0
+    return 100.0 * target_blocks / pages
+
+
+def _interval(y: float, y2: float, p: float) -> Tuple[int, List[int]]:
+    est = y / p
+    half = Z95 * math.sqrt(max((1.0 - p) / (p * p) * y2, 0.0))
+    # Rows seen in the sample certainly exist, so they bound the interval below.
+    return round(est), [max(round(est - half), round(y)), round(est + half)]
+
+
+def from_blocks(rows: Sequence[dict], percent: float) -> dict:
+    """Combine per-block sample counts into estimates with 95% intervals."""
+
+    p = percent / 100.0
+    blocks: Dict[Tuple, float] = defaultdict(float)
+    type_blocks: Dict[Tuple, float] = defaultdict(float)
+    source_blocks: Dict[Tuple, float] = defaultdict(float)
+    for r in rows:
+        blk = (r["rel"], r["blk"])
+        blocks[blk] += r["y"]
+        type_blocks[(r["event_type"],) + blk] += r["y"]
+        source_blocks[(r["source_name"],) + blk] += r["y"]
+
+    def _groups(per_block: Dict[Tuple, float], label: str) -> List[dict]:
+        sums: Dict = defaultdict(lambda: [0.0, 0.0])
+        for key, y in per_block.items():
+            acc = sums[key[0]]
+            acc[0] += y
+            acc[1] += y * y
+        out = []
+        for name, (y, y2) in sums.items():
+            c, ci = _interval(y, y2, p)
+            out.append({label: name, "c": c, "ci95": ci})
+        return sorted(out, key=lambda g: -g["c"])
+
+    total, total_ci = _interval(sum(blocks.values()), sum(y * y for y in blocks.values()), p)
+    return {
+        "total": total,
+        "counts_by_type": _groups(type_blocks, "event_type"),
+        "counts_by_source": _groups(source_blocks, "source_name"),
+        "approx": {
+            "method": "sample" if p < 1.0 else "exact",
+            "sample_percent": round(percent, 4),
+            "matched_blocks": len(blocks),
+            "total_ci95": total_ci,
+        },
+    }
+
+
+def sampled(fetch_all: Fetch, where: str, params: Sequence, target_blocks: int) -> dict:
+    """Estimate the filtered summary from a block sample of ``events``."""
+
+    percent = sample_percent(fetch_all, target_blocks)
+    rows = fetch_all(SAMPLE_SQL.format(where=where), [percent, *params])
+    return from_blocks(rows, percent)
@@ -0,0 +1,234 @@
+"""One parser and SQL compiler for event filters.
+
+Every event query endpoint accepts some mix of ``q``, ``bbox``,
+``time_range``/``since``/``until``, ``source_id`` and ``type``.  They used to
+assemble their own ``WHERE`` clauses, which drifted apart (some filtered on
+``occurred_at``, others on ``detected_at``; some qualified columns, some did
+not), so identical filters produced different SQL text and Postgres could
+not share plans or indexes between them.
+
+:func:`parse` normalises the raw query parameters once into an immutable
+:class:`EventFilter`.  :meth:`EventFilter.compile` always emits the same
+clause order and column names for the same set of active filters, against
+the ``events e`` alias, filtering time on the indexed ``detected_at``
+column.  The clause text depends only on which filters are present, so it
+is memoised per shape.  :attr:`EventFilter.cache_key` is a stable string for
+coalescing and caching.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+BBox = Tuple[float, float, float, float]
+
+# Text matching modes: substring ILIKE on title/body, or the GIN-indexed
+# full-text expression used by /v1/search.
+TEXT_MODES = ("ilike", "fts")
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO8601 timestamp (``Z`` suffix allowed); ``None`` if invalid."""
+
+    if not value:
+        return None
+    value = value.strip()
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_time_range(value: Optional[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Parse ``"start..end"``; either side may be empty or omitted."""
+
+    if not value:
+        return None, None
+    start, sep, end = value.partition("..")
+    return parse_timestamp(start), parse_timestamp(end if sep else "")
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """Parse ``"minLon,minLat,maxLon,maxLat"``; malformed values are ignored."""
+
+    if not value:
+        return None
+    try:
+        minlon, minlat, maxlon, maxlat = (float(x) for x in value.split(","))
+    except ValueError:
+        return None
+    return (minlon, minlat, maxlon, maxlat)
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc)
+    return value
+
+
+@dataclass(frozen=True)
+class EventFilter:
+    """Normalised event filter; build with :func:`parse`."""
+
+    event_type: Optional[str] = None
+    source_id: Optional[int] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    bbox: Optional[BBox] = None
+    q: Optional[str] = None
+    # Keyset pagination position: rows strictly before (detected_at, id).
+    before: Optional[Tuple[datetime, int]] = None
+    # Show one event per near-duplicate cluster (its earliest member).
+    collapse: bool = False
+
+    def compile(self, text: str = "ilike", require_geom: bool = False) -> Tuple[str, List]:
+        """Return ``(where_sql, params)`` for the ``events e`` alias.
+
+        ``where_sql`` is ``""`` or starts with ``" WHERE "``.  ``require_geom``
+        restricts to located events (map endpoints).
+        """
+
+        if text not in TEXT_MODES:
+            raise ValueError(f"unknown text mode {text!r}")
+        where = _where(
+            self.event_type is not None,
+            self.source_id is not None,
+            self.start is not None,
+            self.end is not None,
+            self.bbox is not None,
+            require_geom,
+            text if self.q is not None else None,
+            self.before is not None,
+            self.collapse,
+            os.getenv("USE_POSTGIS", "1") == "1",
+        )
+        params: List = []
+        if self.event_type is not None:
+            params.append(self.event_type)
+        if self.source_id is not None:
+            params.append(self.source_id)
+        if self.start is not None:
+            params.append(self.start)
+        if self.end is not None:
+            params.append(self.end)
+        if self.bbox is not None:
+            minlon, minlat, maxlon, maxlat = self.bbox
+            if os.getenv("USE_POSTGIS", "1") == "1":
+                params.extend([minlon, minlat, maxlon, maxlat])
+            else:
+                params.extend([minlon, maxlon, minlat, maxlat])
+        if self.q is not None:
+            if text == "fts":
+                params.append(self.q)
+            else:
+                like = f"%{self.q}%"
+                params.extend([like, like])
+        if self.before is not None:
+            params.extend(self.before)
+        return where, params
+
+    @property
+    def cache_key(self) -> str:
+        """Stable key: equal filters give equal keys however they were spelled."""
+
+        parts = []
+        if self.event_type is not None:
+            parts.append(f"type={self.event_type}")
+        if self.source_id is not None:
+            parts.append(f"source={self.source_id}")
+        if self.start is not None:
+            parts.append(f"from={self.start.isoformat()}")
+        if self.end is not None:
+            parts.append(f"to={self.end.isoformat()}")
+        if self.bbox is not None:
+            parts.append("bbox=" + ",".join(repr(v) for v in self.bbox))
+        if self.q is not None:
+            parts.append(f"q={self.q}")
+        if self.before is not None:
+            parts.append(f"before={self.before[0].isoformat()},{self.before[1]}")
+        if self.collapse:
+            parts.append("collapse=1")
+        return "&".join(parts)
+
+
+def parse(
+    q: Optional[str] = None,
+    bbox: Optional[str] = None,
+    time_range: Optional[str] = None,
+    source_id: Optional[int] = None,
+    event_type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    before: Optional[Tuple[datetime, int]] = None,
+    collapse: bool = False,
+) -> EventFilter:
+    """Normalise raw query parameters into an :class:`EventFilter`.
+
+    Empty strings and ``source_id=0`` mean "no filter", as before.  Explicit
+    ``since``/``until`` take precedence over the matching ``time_range`` side.
+    Text is stripped and lower-cased (both matching modes are
+    case-insensitive), so ``?q=Fire`` and ``?q=fire `` share a key.
+    """
+
+    start, end = parse_time_range(time_range)
+    q = (q or "").strip().lower() or None
+    return EventFilter(
+        event_type=event_type or None,
+        source_id=int(source_id) if source_id else None,
+        start=_utc(since or start),
+        end=_utc(until or end),
+        bbox=parse_bbox(bbox),
+        q=q,
+        before=(_utc(before[0]), int(before[1])) if before else None,
+        collapse=bool(collapse),
+    )
+
+
+@lru_cache(maxsize=512)
+def _where(
+    event_type: bool,
+    source_id: bool,
+    start: bool,
+    end: bool,
+    bbox: bool,
+    require_geom: bool,
+    text: Optional[str],
+    before: bool,
+    collapse: bool,
+    postgis: bool,
+) -> str:
+    clauses = []
+    if event_type:
+        clauses.append("e.event_type = %s")
+    if source_id:
+        clauses.append("e.source_id = %s")
+    if start:
+        clauses.append("e.detected_at >= %s")
+    if end:
+        clauses.append("e.detected_at <= %s")
+    if bbox or require_geom:
+        clauses.append("e.geom IS NOT NULL")
+    if bbox:
+        if postgis:
+            clauses.append("ST_Intersects(e.geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))")
+        else:
+            clauses.append(
+                "ST_X(e.geom::geometry) BETWEEN %s AND %s AND ST_Y(e.geom::geometry) BETWEEN %s AND %s"
+            )
+    if text == "fts":
+        clauses.append("to_tsvector('simple', e.title || ' ' || coalesce(e.body,'')) @@ plainto_tsquery('simple', %s)")
+    elif text:
+        clauses.append("(e.title ILIKE %s OR e.body ILIKE %s)")
+    if before:
+        clauses.append("(e.detected_at, e.id) < (%s, %s)")
+    if collapse:
+        clauses.append("(e.cluster_id IS NULL OR e.cluster_id = e.id)")
+    return (" WHERE " + " AND ".join(clauses)) if clauses else ""
@@ -0,0 +1,237 @@
+"""Background-probed dependency health.
+
+Orchestrator probes hit ``/healthz`` several times a second per replica, so
+the endpoint must not open a Postgres connection or build a Redis client on
+every call.  Instead a :class:`HealthProber` checks each dependency on a fixed
+interval (reusing one long-lived connection per dependency), records status
+and latency, and the endpoints serve the cached snapshot.
+
+A snapshot older than ``stale_after`` is reported as stale and is no longer
+considered *ready*, so a wedged prober cannot keep a replica in rotation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Optional
+
+import structlog
+
+from .metrics import DEPENDENCY_LATENCY, DEPENDENCY_UP
+
+logger = structlog.get_logger()
+
+
+class PostgresCheck:
+    """``SELECT 1`` over a connection kept open between probes."""
+
+    def __init__(self, dsn: Callable[[], str], timeout: float = 2.0) -> None:
+        self.dsn = dsn
+        self.timeout = timeout
+        self._conn = None
+
+    def __call__(self) -> None:
+        import psycopg
+
+        if self._conn is None or self._conn.closed:
+            self._conn = psycopg.connect(self.dsn(), autocommit=True, connect_timeout=max(1, int(self.timeout)))
+        try:
+            self._conn.execute("SELECT 1")
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+
+class RedisCheck:
+    """``PING`` through a single shared client (it pools its own connections)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 2.0) -> None:
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._client = None
+
+    def __call__(self) -> None:
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis(
+                host=self.host,
+                port=self.port,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+            )
+        self._client.ping()
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+class HttpCheck:
+    """GET ``url`` and require a non-error status (used for MinIO's liveness URL)."""
+
+    def __init__(self, url: str, timeout: float = 2.0) -> None:
+        self.url = url
+        self.timeout = timeout
+
+    def __call__(self) -> None:
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as resp:
+            if resp.status >= 400:
+                raise RuntimeError(f"HTTP {resp.status}")
+
+
+class HealthProber:
+    """Run ``checks`` periodically and keep the latest result of each."""
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], None]],
+        critical: Iterable[str] = (),
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        stale_after: Optional[float] = None,
+    ) -> None:
+        self.checks = checks
+        self.critical = set(critical)
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else 3 * interval
+        self._results: Dict[str, dict] = {}
+        self._probed_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _run_check(self, name: str, check: Callable[[], None]) -> dict:
+        started = time.perf_counter()
+        error = None
+        try:
+            await asyncio.wait_for(asyncio.to_thread(check), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            error = f"timed out after {self.timeout:g}s"
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        latency = time.perf_counter() - started
+        DEPENDENCY_UP.labels(name).set(0 if error else 1)
+        DEPENDENCY_LATENCY.labels(name).set(latency)
+        if error:
+            logger.warning("health_check_failed", dependency=name, error=error)
+        return {
+            "status": "error" if error else "ok",
+            "latency_ms": round(latency * 1000, 2),
+            "checked_at": time.time(),
+            "monotonic": time.monotonic(),
+            "error": error,
+        }
+
+    async def probe(self) -> None:
+        """Check every dependency concurrently and store the results."""
+
+        names = list(self.checks)
+        results = await asyncio.gather(*(self._run_check(n, self.checks[n]) for n in names))
+        self._results = dict(zip(names, results))
+        self._probed_at = time.monotonic()
+
+    def is_stale(self) -> bool:
+        return self._probed_at is None or time.monotonic() - self._probed_at > self.stale_after
+
+    async def current(self) -> dict:
+        """Return the cached snapshot, probing inline only if it is missing or stale.
+
+        The inline probe covers requests that arrive before the first
+        background probe (or after the loop died); concurrent callers share
+        one probe.
+        """
+
+        if self.is_stale():
+            loop = asyncio.get_running_loop()
+            if self._lock is None or self._lock_loop is not loop:
+                self._lock = asyncio.Lock()
+                self._lock_loop = loop
+            async with self._lock:
+                if self.is_stale():
+                    await self.probe()
+        return self.snapshot()
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        deps = {}
+        critical_down = False
+        degraded = False
+        for name, result in self._results.items():
+            critical = name in self.critical
+            if result["status"] != "ok":
+                critical_down = critical_down or critical
+                degraded = True
+            deps[name] = {
+                "status": result["status"],
+                "critical": critical,
+                "latency_ms": result["latency_ms"],
+                "checked_at": _iso(result["checked_at"]),
+                "age_seconds": round(now - result["monotonic"], 3),
+                "error": result["error"],
+            }
+        stale = self.is_stale()
+        if critical_down:
+            status = "unhealthy"
+        elif degraded:
+            status = "degraded"
+        else:
+            status = "ok"
+        return {
+            "status": status,
+            "ready": not critical_down and not stale and bool(self._results),
+            "stale": stale,
+            "age_seconds": None if self._probed_at is None else round(now - self._probed_at, 3),
+            "dependencies": deps,
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.probe()
+            except Exception as exc:  # pragma: no cover - checks already trap errors
+                logger.error("health_probe_loop_error", error=str(exc))
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for check in self.checks.values():
+            close = getattr(check, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+
+    def reset(self) -> None:
+        """Forget cached results (used by tests)."""
+
+        self._results = {}
+        self._probed_at = None
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
@@ -3,30 +3,53 @@ from uuid import UUID, uuid4
 
 import structlog
 from structlog.contextvars import bind_contextvars, clear_contextvars
+import time
+
 from fastapi import FastAPI, Query, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import ORJSONResponse, JSONResponse
+from fastapi.responses import ORJSONResponse, JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
+from contextlib import asynccontextmanager
 import base64
-import os
+import itertools
 
 from .schemas import (
     Event,
-    Entity,
+    GeofenceCreate,
+    SavedSearchCreate,
     Notebook,
     NotebookCreate,
+    NotebookItemsCreate,
     NotebookUpdate,
-    SearchQuery,
 )
-from .db import fetch_all, fetch_one, get_conn
+from .db import execute, fetch_all, fetch_one, stream_rows
+from . import archive as archive_mod
+from . import export as export_mod
+from . import estimates
+from . import filters
+from . import related as related_mod
+from . import suggest
+from . import vectors
 from .auth import get_current_user, create_access_token
 from .routes import router as v1_router
 from .config import get_settings
-import redis
-from prometheus_client import Counter, generate_latest, CONTENT_TYPE_LATEST
+from .compression import CompressionMiddleware
+from .coalesce import SingleFlight, make_key
+from .admission import ConcurrencyLimiter, TokenBucket, admission
+from .health import HealthProber, HttpCheck, PostgresCheck, RedisCheck
+from .metrics import (
+    ERROR_COUNTER,
+    IN_FLIGHT,
+    REQUEST_COUNTER,
+    REQUEST_LATENCY,
+    RESPONSE_SIZE,
+    route_template,
+    status_class,
+)
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
 
 logging.basicConfig(level=logging.INFO)
 structlog.configure(
@@ -39,9 +62,65 @@ structlog.configure(
 )
 logger = structlog.get_logger()
 
+_settings = get_settings()
+
+# Dependency health is probed in the background; /healthz serves the cache.
+prober = HealthProber(
+    {
+        "postgres": PostgresCheck(lambda: _settings.database_url, timeout=_settings.health_timeout),
+        "redis": RedisCheck(_settings.redis_host, _settings.redis_port, timeout=_settings.health_timeout),
+        "minio": HttpCheck(
+            f"http://{_settings.minio_host}:{_settings.minio_port}/minio/health/live",
+            timeout=_settings.health_timeout,
+        ),
+    },
+    critical=[c.strip() for c in _settings.health_critical.split(",") if c.strip()],
+    interval=_settings.health_interval,
+    timeout=_settings.health_timeout,
+)
+
+# Popular entity names for typeahead, updated when entities change.
+suggest_cache = suggest.SuggestCache(
+    lambda n: fetch_all(suggest.POPULAR_SQL, (n,)),
+    max_entries=_settings.suggest_cache_entries,
+    max_age=_settings.suggest_max_age,
+    changed=lambda ids: fetch_all(suggest.CHANGED_SQL, (ids,)),
+)
+
+
+# Query embedder and vector index for /search/semantic; the embedding job
+# (python -m app.vectors) fills the index with the same model.
+# Opened archive dataset and hot-tier floor, shared by every archive read.
+archive_tier = archive_mod.Tier(
+    lambda: (fetch_one(archive_mod.FLOOR_SQL) or {}).get("name"), _settings.archive_cache_seconds
+)
+
+embedder = vectors.HashingEmbedder(_settings.embedding_dim)
+vector_index = vectors.index_for(_settings)
+
+
+def _listen_conn():
+    import psycopg
+
+    return psycopg.connect(_settings.database_url, autocommit=True)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    prober.start()
+    if _settings.suggest_cache_entries > 0:
+        suggest_cache.start(_listen_conn)
+    try:
+        yield
+    finally:
+        suggest_cache.stop()
+        await prober.stop()
+
+
 app = FastAPI(
     title="Aussie Open Intelligence API",
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
     dependencies=[Depends(get_current_user)],
 )
 
@@ -54,12 +133,45 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large payloads (GeoJSON, graphs) for clients that accept it
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=_settings.compression_min_size,
+    encodings=tuple(e.strip() for e in _settings.compression_encodings.split(",") if e.strip()) or None,
+    cache_entries=_settings.compression_cache_entries,
+)
+
+# Identical concurrent dashboard queries share one database round trip
+coalescer = SingleFlight(
+    redis_url=_settings.redis_url if _settings.coalesce_redis else None,
+    result_ttl=_settings.coalesce_result_ttl,
+)
+
+# Expensive endpoints get a concurrency cap with a short bounded queue plus a
+# per-user token bucket; cheap reads and health checks are not guarded.
+user_rate_limit = TokenBucket(
+    rate=_settings.rate_limit_per_minute / 60.0,
+    burst=_settings.rate_limit_burst,
+    redis_url=_settings.redis_url if _settings.rate_limit_backend == "redis" else None,
+)
+
+
+def _limiter() -> ConcurrencyLimiter:
+    return ConcurrencyLimiter(
+        limit=_settings.admission_concurrency,
+        max_queue=_settings.admission_queue,
+        queue_timeout=_settings.admission_queue_timeout,
+    )
+
+
+admit_search = admission("/search", _limiter(), user_rate_limit, when=lambda r: bool(r.query_params.get("q")))
+admit_stats = admission("/stats/summary", _limiter(), user_rate_limit)
+admit_graph = admission("/graph", _limiter(), user_rate_limit)
+admit_hexbins = admission("/events/hexbins", _limiter(), user_rate_limit)
+
 # Mount v1 API routes
 app.include_router(v1_router)
 
-REQUEST_COUNTER = Counter("request_total", "Total HTTP requests")
-ERROR_COUNTER = Counter("error_total", "Total HTTP errors")
-
 
 class Token(BaseModel):
     access_token: str
@@ -82,14 +194,39 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
     REQUEST_COUNTER.inc()
+    method = request.method
+    IN_FLIGHT.labels(method).inc()
+    start = time.perf_counter()
     try:
         response = await call_next(request)
-        if response.status_code >= 500:
-            ERROR_COUNTER.inc()
-        return response
     except Exception:
         ERROR_COUNTER.inc()
+        IN_FLIGHT.labels(method).dec()
+        REQUEST_LATENCY.labels(route_template(request.scope), method, "5xx").observe(
+            time.perf_counter() - start
+        )
         raise
+    if response.status_code >= 500:
+        ERROR_COUNTER.inc()
+
+    # The route is only known after routing, and the body may still be
+    # streaming, so latency and size are observed once the last chunk is sent.
+    labels = (route_template(request.scope), method, status_class(response.status_code))
+    body_iterator = response.body_iterator
+
+    async def _observed_body():
+        size = 0
+        try:
+            async for chunk in body_iterator:
+                size += len(chunk)
+                yield chunk
+        finally:
+            IN_FLIGHT.labels(method).dec()
+            REQUEST_LATENCY.labels(*labels).observe(time.perf_counter() - start)
+            RESPONSE_SIZE.labels(*labels).observe(size)
+
+    response.body_iterator = _observed_body()
+    return response
 
 
 @app.middleware("http")
@@ -123,15 +260,19 @@ async def health():
 
 @app.get("/healthz")
 async def healthz():
-    settings = get_settings()
-    try:
-        with get_conn() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1")
-        redis.Redis(host=settings.redis_host, port=settings.redis_port).ping()
-    except Exception:
-        raise HTTPException(status_code=500, detail="unhealthy")
-    return {"status": "ok"}
+    """Cached per-dependency health; 500 when a critical dependency is down."""
+    state = await prober.current()
+    return ORJSONResponse(state, status_code=500 if state["status"] == "unhealthy" else 200)
+
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: critical dependencies up and the cached state fresh."""
+    state = await prober.current()
+    return ORJSONResponse(
+        {"ready": state["ready"], "stale": state["stale"], "age_seconds": state["age_seconds"]},
+        status_code=200 if state["ready"] else 503,
+    )
 
 
 @app.get("/metrics")
@@ -139,7 +280,7 @@ async def metrics():
     return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
-@app.get("/search")
+@app.get("/search", dependencies=[Depends(admit_search)])
 async def search(
     q: Optional[str] = None,
     bbox: Optional[str] = None,
@@ -149,62 +290,14 @@ async def search(
     sort: str = "detected_at",
     source_id: Optional[int] = None,
     debug: int = 0,
+    collapse: int = 0,
 ):
-    params: List = []
-    clauses: List[str] = []
-
-    # Text filter
-    if q:
-        clauses.append("(title ILIKE %s OR body ILIKE %s)")
-        like = f"%{q}%"
-        params.extend([like, like])
-
-    # Time range filter: "start..end" (ISO8601); each side optional
-    if time_range:
-        try:
-            start_s, end_s = time_range.split("..", 1)
-        except ValueError:
-            start_s, end_s = time_range, ""
-        def _parse(ts: str | None):
-            if not ts:
-                return None
-            ts = ts.strip()
-            if not ts:
-                return None
-            # Accept Z suffix
-            if ts.endswith("Z"):
-                ts = ts.replace("Z", "+00:00")
-            try:
-                return datetime.fromisoformat(ts)
-            except Exception:
-                return None
-        start_dt = _parse(start_s)
-        end_dt = _parse(end_s)
-        if start_dt:
-            clauses.append("detected_at >= %s")
-            params.append(start_dt)
-        if end_dt:
-            clauses.append("detected_at <= %s")
-            params.append(end_dt)
-
-    # BBOX filter: "minLon,minLat,maxLon,maxLat"
-    if bbox:
-        try:
-            minlon, minlat, maxlon, maxlat = [float(x) for x in bbox.split(",")]
-            clauses.append("geom IS NOT NULL AND ST_Intersects(geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))")
-            params.extend([minlon, minlat, maxlon, maxlat])
-        except Exception:
-            pass
-
-    # Source filter
-    if source_id:
-        clauses.append("source_id = %s")
-        params.append(int(source_id))
+    flt = filters.parse(q=q, bbox=bbox, time_range=time_range, source_id=source_id, collapse=bool(collapse))
+    where, params = flt.compile()
 
     clamped_limit = max(1, min(int(limit or 50), 500))
     clamped_offset = max(0, int(offset or 0))
     sort_col = "detected_at" if (sort not in {"detected_at", "occurred_at"}) else sort
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
     geom_debug = ", CASE WHEN e.geom IS NOT NULL THEN ST_AsText(e.geom::geometry) END AS geom_wkt" if debug else ""
     sql = f"""
         SELECT e.id, e.source_id, s.name AS source_name, e.title, e.body, e.event_type, e.occurred_at, e.detected_at, e.jurisdiction, e.confidence, e.severity,
@@ -213,18 +306,137 @@ async def search(
         FROM events e
         LEFT JOIN sources s ON s.id = e.source_id
         {where}
-        ORDER BY {sort_col} DESC
+        ORDER BY e.{sort_col} DESC
         OFFSET %s
         LIMIT %s
     """
-    params.extend([clamped_offset, clamped_limit])
-    rows = fetch_all(sql, params)
+    dset, floor = _archive_for(flt)
+    if dset is None:
+        rows = fetch_all(sql, params + [clamped_offset, clamped_limit])
+    else:
+        # Neither tier knows how many of the other's rows precede a page, so
+        # both return the first offset + limit rows and the merge is sliced.
+        depth = clamped_offset + clamped_limit
+        hot = fetch_all(sql, params + [0, depth])
+        cold = _with_source_name(
+            archive_mod.fetch_events(dset, flt, floor, depth, columns=archive_mod.SEARCH_COLUMNS, order=sort_col)
+        )
+        if debug:
+            for r in cold:
+                r["geom_wkt"] = _point_wkt(r["lon"], r["lat"])
+        rows = archive_mod.merge(hot, cold, sort_col)[clamped_offset:depth]
     return {
         "query": {"q": q, "bbox": bbox, "time_range": time_range, "limit": clamped_limit, "offset": clamped_offset, "sort": sort_col},
         "results": rows,
     }
 
 
+@app.get("/search/semantic", dependencies=[Depends(admit_search)])
+async def semantic_search(
+    q: str = Query(..., min_length=2),
+    type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    time_range: Optional[str] = None,
+    bbox: Optional[str] = None,
+    source_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    collapse: int = 0,
+):
+    """Events ranked by embedding similarity to ``q``.
+
+    Type, source, time and bbox filters are pushed into the vector search;
+    hits are then read back through the usual event filter SQL (which also
+    drops events no longer in Postgres) and keep their similarity ``score``.
+    """
+
+    flt = filters.parse(
+        bbox=bbox,
+        time_range=time_range,
+        source_id=source_id,
+        event_type=type,
+        since=since,
+        until=until,
+        collapse=bool(collapse),
+    )
+    try:
+        hits = vector_index.search(embedder.embed([q])[0], limit * 4, flt)
+    except Exception as exc:
+        logger.warning("vector_search_failed", error=str(exc))
+        raise HTTPException(status_code=503, detail="Vector index unavailable")
+    results = []
+    if hits:
+        scores = dict(hits)
+        where, params = flt.compile()
+        where += (" AND " if where else " WHERE ") + "e.id = ANY(%s)"
+        rows = fetch_all(
+            f"""
+            SELECT e.id, e.source_id, s.name AS source_name, e.title, e.body, e.event_type, e.occurred_at, e.detected_at, e.jurisdiction, e.confidence, e.severity,
+                   CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
+                   CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat
+            FROM events e
+            LEFT JOIN sources s ON s.id = e.source_id
+            {where}
+            """,
+            params + [list(scores)],
+        )
+        for r in rows:
+            r["score"] = round(scores[r["id"]], 4)
+        results = sorted(rows, key=lambda r: (-r["score"], r["id"]))[:limit]
+    return {
+        "query": {"q": q, "bbox": bbox, "time_range": time_range, "limit": limit, "model": embedder.model},
+        "results": results,
+    }
+
+
+def _decode_cursor(cursor: Optional[str]):
+    """Decode a keyset cursor into ``(detected_at, id)``; invalid cursors are ignored."""
+
+    if not cursor:
+        return None
+    try:
+        dec = base64.urlsafe_b64decode(cursor.encode()).decode()
+        ts_s, id_s = dec.split("|", 1)
+        return (datetime.fromisoformat(ts_s), int(id_s))
+    except Exception:
+        return None
+
+
+def _encode_cursor(detected_at: datetime, event_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{detected_at.isoformat()}|{event_id}".encode()).decode()
+
+
+def _with_source_name(rows: List[Dict]) -> List[Dict]:
+    """Archived rows carry the source name as ``source``; rename it to match the SQL."""
+
+    for r in rows:
+        r["source_name"] = r.pop("source")
+    return rows
+
+
+def _point_wkt(lon: Optional[float], lat: Optional[float]) -> Optional[str]:
+    if lon is None or lat is None:
+        return None
+    return f"POINT({lon:.15g} {lat:.15g})"
+
+
+def _archive_for(flt: filters.EventFilter):
+    """Return ``(dataset, floor)`` when ``flt`` reaches into the Parquet archive.
+
+    ``(None, None)`` otherwise; the floor lookup only runs for time ranges
+    starting before the configured hot window, and is cached by ``archive_tier``.
+    """
+
+    if not _settings.archive_enabled or not export_mod.available():
+        return None, None
+    if not archive_mod.may_reach(flt, _settings.archive_after_months):
+        return None, None
+    dset, floor = archive_tier.get(_settings.archive_uri)
+    if dset is None or not archive_mod.reaches(flt, floor):
+        return None, None
+    return dset, floor
+
+
 @app.get("/events", response_model=List[Event], response_model_exclude_none=True)
 async def list_events(
     response: Response,
@@ -236,6 +448,7 @@ async def list_events(
     limit: int = Query(50, ge=1, le=100),
     cursor: Optional[str] = None,
     include_raw: int = 0,
+    collapse: int = 0,
 ):
     """Return a slice of events filtered by the supplied query params.
 
@@ -245,53 +458,21 @@ async def list_events(
 
     The SQL query uses indexed columns (``event_type`` and ``detected_at``) and
     optionally PostGIS spatial indexes when available.
+
+    ``collapse=1`` returns one event per near-duplicate cluster (its earliest
+    member); each clustered event carries ``cluster_id``.
     """
 
-    clauses: List[str] = []
-    params: List = []
+    before = _decode_cursor(cursor)
+    flt = filters.parse(
+        q=q, bbox=bbox, event_type=type, since=since, until=until, before=before, collapse=bool(collapse)
+    )
+    where, params = flt.compile()
 
-    if type:
-        clauses.append("e.event_type = %s")
-        params.append(type)
-    if since:
-        clauses.append("e.detected_at >= %s")
-        params.append(since)
-    if until:
-        clauses.append("e.detected_at <= %s")
-        params.append(until)
-    if q:
-        clauses.append("e.title ILIKE %s")
-        params.append(f"%{q}%")
-    if bbox:
-        try:
-            minlon, minlat, maxlon, maxlat = [float(x) for x in bbox.split(",")]
-            if os.getenv("USE_POSTGIS", "1") == "1":
-                clauses.append(
-                    "e.geom IS NOT NULL AND ST_Intersects(e.geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))"
-                )
-            else:
-                clauses.append(
-                    "e.geom IS NOT NULL AND ST_X(e.geom::geometry) BETWEEN %s AND %s AND ST_Y(e.geom::geometry) BETWEEN %s AND %s"
-                )
-            params.extend([minlon, minlat, maxlon, maxlat])
-        except Exception:
-            pass
-    if cursor:
-        try:
-            dec = base64.urlsafe_b64decode(cursor.encode()).decode()
-            ts_s, id_s = dec.split("|", 1)
-            cur_ts = datetime.fromisoformat(ts_s)
-            cur_id = int(id_s)
-            clauses.append("(e.detected_at, e.id) < (%s, %s)")
-            params.extend([cur_ts, cur_id])
-        except Exception:
-            pass
-
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
     raw_col = ", e.raw" if include_raw else ""
     sql = f"""
         SELECT e.id, e.source_id, e.title, e.body, e.event_type, e.occurred_at, e.detected_at,
-               e.jurisdiction, e.confidence, e.severity,
+               e.jurisdiction, e.confidence, e.severity, e.cluster_id,
                CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
                CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat{raw_col}
         FROM events e
@@ -301,6 +482,10 @@ async def list_events(
     """
     params.append(limit)
     rows = fetch_all(sql, params)
+    dset, floor = _archive_for(flt)
+    if dset is not None:
+        rows = archive_mod.merge(rows, archive_mod.fetch_events(dset, flt, floor, limit, include_raw=bool(include_raw)))
+        rows = rows[:limit]
     events = []
     for r in rows:
         lon = r.pop("lon", None)
@@ -316,14 +501,50 @@ async def list_events(
         events.append(evt)
     if len(rows) == limit:
         last = rows[-1]
-        next_cursor = base64.urlsafe_b64encode(
-            f"{last['detected_at'].isoformat()}|{last['id']}".encode()
-        ).decode()
         if response is not None:
-            response.headers["X-Next-Cursor"] = next_cursor
+            response.headers["X-Next-Cursor"] = _encode_cursor(last["detected_at"], last["id"])
     return events
 
 
+@app.get("/events/export")
+async def export_events(
+    fmt: str = Query("arrow", alias="format", pattern="^(arrow|parquet)$"),
+    type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    bbox: Optional[str] = None,
+    q: Optional[str] = None,
+    source_id: Optional[int] = None,
+    batch_size: int = Query(50_000, ge=1_000, le=500_000),
+):
+    """Stream matching events as Arrow IPC or Parquet.
+
+    Rows are read from a server-side cursor ``batch_size`` at a time and each
+    batch is written as one Arrow record batch (or Parquet row group), so
+    exports of months of events run in constant memory.
+    """
+
+    if not export_mod.available():
+        raise HTTPException(status_code=501, detail="Columnar export requires pyarrow")
+
+    flt = filters.parse(q=q, bbox=bbox, source_id=source_id, event_type=type, since=since, until=until)
+    where, params = flt.compile()
+    sql = f"{export_mod.SELECT_SQL} {where} ORDER BY e.detected_at, e.id"
+    batches = stream_rows(sql, params, batch_size)
+    dset, floor = _archive_for(flt)
+    if dset is not None:
+        # Archived months are all older than the hot tier, so they go first.
+        batches = itertools.chain(
+            archive_mod.export_rows(dset, flt, floor, export_mod.COLUMNS, batch_size), batches
+        )
+    body = export_mod.encode(batches, fmt)
+    return StreamingResponse(
+        body,
+        media_type=export_mod.MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="events.{fmt}"'},
+    )
+
+
 @app.get("/events/{event_id:int}")
 async def get_event(event_id: int, debug_geom: int = 0):
     if debug_geom:
@@ -358,6 +579,18 @@ async def get_event(event_id: int, debug_geom: int = 0):
     return row
 
 
+@app.get("/events/{event_id:int}/related")
+async def related_events(event_id: int, limit: int = Query(10, ge=1, le=50)):
+    """Precomputed nearest neighbours of an event, best first.
+
+    Lists are maintained by ``python -m app.related``; an event that has not
+    been processed yet (or has no neighbours) returns an empty list.
+    """
+
+    rows = fetch_all(related_mod.RELATED_SQL, (event_id, limit))
+    return {"event_id": event_id, "related": rows}
+
+
 @app.get("/events/{event_id:uuid}")
 async def get_event_detail(event_id: UUID, include_raw: int = 0):
     row = fetch_one(
@@ -398,6 +631,36 @@ async def get_event_detail(event_id: UUID, include_raw: int = 0):
     return event
 
 
+@app.get("/entities/suggest")
+async def suggest_entities(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    type: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Entities whose name starts with ``prefix``, most linked first."""
+
+    hits = suggest_cache.lookup(prefix, limit, type) if suggest_cache.ready else []
+    if len(hits) < limit and not (suggest_cache.ready and suggest_cache.complete):
+        # Not (fully) cached: top up from the prefix index.
+        seen = {h["id"] for h in hits}
+        params = [suggest.like_prefix(prefix), *([type] if type else []), limit]
+        for row in fetch_all(suggest.entity_sql(type), params):
+            if row["id"] not in seen and len(hits) < limit:
+                hits.append(row)
+    return {"prefix": prefix, "suggestions": hits}
+
+
+@app.get("/events/suggest")
+async def suggest_events(
+    prefix: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Most recent events whose title starts with ``prefix``."""
+
+    rows = fetch_all(suggest.EVENT_SQL, (suggest.like_prefix(prefix), limit))
+    return {"prefix": prefix, "suggestions": rows}
+
+
 @app.get("/entities/{entity_id:uuid}")
 async def get_entity(entity_id: UUID):
     ent = fetch_one(
@@ -421,7 +684,108 @@ async def get_entity(entity_id: UUID):
     return ent
 
 
-@app.get("/graph")
+@app.get("/entities/{entity_id:int}/events")
+async def entity_events(
+    entity_id: int,
+    response: Response,
+    type: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    time_range: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    counts: int = 0,
+):
+    """Timeline of events linked to an entity, newest first.
+
+    Pages with the same ``(detected_at, id)`` keyset cursor as ``/events``
+    (``next_cursor`` in the body and the ``X-Next-Cursor`` header).  Links
+    carry their event's ``detected_at`` and ``event_type``, so each page is a
+    range scan of ``idx_event_entities_timeline`` however long the entity's
+    history is; ``counts=1`` adds per-type totals for the same window.
+    """
+
+    if not fetch_one("SELECT id FROM entities WHERE id=%s", (entity_id,)):
+        raise HTTPException(status_code=404, detail="Entity not found")
+    start, end = filters.parse_time_range(time_range)
+    clauses = ["ee.entity_id = %s"]
+    params: list = [entity_id]
+    if type:
+        clauses.append("ee.event_type = %s")
+        params.append(type)
+    if since or start:
+        clauses.append("ee.detected_at >= %s")
+        params.append(since or start)
+    if until or end:
+        clauses.append("ee.detected_at <= %s")
+        params.append(until or end)
+    window = " AND ".join(clauses)
+    page_where, page_params = window, list(params)
+    before = _decode_cursor(cursor)
+    if before:
+        page_where += " AND (ee.detected_at, ee.event_id) < (%s, %s)"
+        page_params.extend(before)
+
+    # The inner query reads only the covering index; events are then fetched
+    # by primary key (id, detected_at), which also prunes partitions.  Links
+    # whose event has moved to the archive are kept, flagged ``archived``.
+    rows = fetch_all(
+        f"""
+        SELECT ee.event_id AS id, ee.detected_at, ee.event_type, ee.relations,
+               e.source_id, e.title, e.occurred_at, e.jurisdiction, e.confidence, e.severity,
+               e.id IS NULL AS archived
+        FROM (
+            SELECT ee.event_id, ee.detected_at, ee.event_type, array_agg(ee.relation) AS relations
+            FROM event_entities ee
+            WHERE {page_where}
+            GROUP BY ee.detected_at, ee.event_id, ee.event_type
+            ORDER BY ee.detected_at DESC, ee.event_id DESC
+            LIMIT %s
+        ) ee
+        LEFT JOIN events e ON e.id = ee.event_id AND e.detected_at = ee.detected_at
+        ORDER BY ee.detected_at DESC, ee.event_id DESC
+        """,
+        page_params + [limit],
+    )
+    _fill_archived(rows)
+    body = {"entity_id": entity_id, "events": rows, "next_cursor": None}
+    if len(rows) == limit:
+        body["next_cursor"] = _encode_cursor(rows[-1]["detected_at"], rows[-1]["id"])
+        response.headers["X-Next-Cursor"] = body["next_cursor"]
+    if counts:
+        body["counts_by_type"] = fetch_all(
+            f"""
+            SELECT ee.event_type, count(DISTINCT ee.event_id) AS c
+            FROM event_entities ee
+            WHERE {window}
+            GROUP BY ee.event_type
+            ORDER BY c DESC
+            """,
+            params,
+        )
+    return body
+
+
+def _fill_archived(rows: List[Dict]) -> None:
+    """Fill timeline rows whose event has moved to the archive from Parquet.
+
+    Rows stay flagged ``archived``; without an archive their fields stay null.
+    """
+
+    keys = [(r["id"], r["detected_at"]) for r in rows if r["archived"]]
+    if not keys or not _settings.archive_enabled or not export_mod.available():
+        return
+    dset, _ = archive_tier.get(_settings.archive_uri)
+    if dset is None:
+        return
+    found = archive_mod.lookup(dset, keys, archive_mod.TIMELINE_COLUMNS)
+    for r in rows:
+        if r["archived"] and r["id"] in found:
+            cold = found[r["id"]]
+            r.update({k: cold[k] for k in archive_mod.TIMELINE_COLUMNS if k not in ("id", "detected_at")})
+
+
+@app.get("/graph", dependencies=[Depends(admit_graph)])
 async def graph(
     entity_id: int = Query(..., description="Root entity id"),
     max: int = Query(200, ge=1, le=1000),
@@ -684,6 +1048,57 @@ async def add_notebook_item(
     return row
 
 
+# One statement: the ownership check, payload de-duplication and the
+# multi-row insert of everything not already pinned.
+_BULK_ITEMS_SQL = """
+    WITH nb AS (
+        SELECT id FROM notebooks WHERE id=%s AND created_by=%s
+    ), new AS (
+        SELECT * FROM unnest(%s::uuid[], %s::text[], %s::uuid[], %s::text[]) AS t(id, kind, ref_id, note)
+    )
+    INSERT INTO notebook_items (id, notebook_id, kind, ref_id, note)
+    SELECT new.id, nb.id, new.kind, new.ref_id, new.note
+    FROM new CROSS JOIN nb
+    WHERE NOT EXISTS (
+        SELECT 1 FROM notebook_items i WHERE i.notebook_id = nb.id AND i.ref_id = new.ref_id
+    )
+    RETURNING id, notebook_id, kind, ref_id, note, created_at
+"""
+
+
+@app.post("/notebooks/{notebook_id}/items/bulk", status_code=201)
+async def add_notebook_items(
+    notebook_id: UUID,
+    body: NotebookItemsCreate,
+    user: dict = Depends(get_current_user),
+):
+    """Pin many items in one round trip; ``ref_id``s already pinned are skipped.
+
+    Within the payload the first item per ``ref_id`` wins.
+    """
+
+    unique = {}
+    for item in body.items:
+        unique.setdefault(item.ref_id, item)
+    items = list(unique.values())
+    rows = execute(
+        _BULK_ITEMS_SQL,
+        (
+            notebook_id,
+            user.get("sub"),
+            [uuid4() for _ in items],
+            [item.kind for item in items],
+            [item.ref_id for item in items],
+            [item.note for item in items],
+        ),
+    )
+    if not rows and not fetch_one(
+        "SELECT 1 AS ok FROM notebooks WHERE id=%s AND created_by=%s", (notebook_id, user.get("sub"))
+    ):
+        raise HTTPException(status_code=404, detail="Notebook not found")
+    return {"items": rows, "created": len(rows), "skipped": len(body.items) - len(rows)}
+
+
 @app.delete("/notebooks/{notebook_id}/items/{item_id}")
 async def delete_notebook_item(
     notebook_id: UUID,
@@ -835,17 +1250,188 @@ async def export_notebook(
     raise HTTPException(status_code=400, detail="Unsupported format")
 
 
+_GEOFENCE_COLUMNS = "id, owner, name, kind, active, created_at, updated_at"
+
+
+@app.post("/geofences", status_code=201)
+async def create_geofence(fence: GeofenceCreate, user: dict = Depends(get_current_user)):
+    """Register an area of interest; new events inside it raise alerts.
+
+    Self-intersecting rings are repaired with ``ST_MakeValid``.
+    """
+
+    rows = execute(
+        f"""
+        INSERT INTO geofences (owner, name, kind, geom)
+        VALUES (%s, %s, %s, ST_Multi(ST_CollectionExtract(ST_MakeValid(ST_SetSRID(ST_GeomFromGeoJSON(%s), 4326)), 3)))
+        RETURNING {_GEOFENCE_COLUMNS}, ST_AsGeoJSON(geom)::json AS geometry
+        """,
+        (user.get("sub"), fence.name, fence.kind, fence.geometry.model_dump_json()),
+    )
+    return rows[0]
+
+
+@app.get("/geofences")
+async def list_geofences(geometry: int = 0, user: dict = Depends(get_current_user)):
+    geom_col = ", ST_AsGeoJSON(geom)::json AS geometry" if geometry else ""
+    rows = fetch_all(
+        f"SELECT {_GEOFENCE_COLUMNS}{geom_col} FROM geofences WHERE owner=%s ORDER BY id",
+        (user.get("sub"),),
+    )
+    return {"results": rows, "count": len(rows)}
+
+
+@app.delete("/geofences/{geofence_id:int}")
+async def delete_geofence(geofence_id: int, user: dict = Depends(get_current_user)):
+    rows = execute(
+        "DELETE FROM geofences WHERE id=%s AND owner=%s RETURNING id",
+        (geofence_id, user.get("sub")),
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Geofence not found")
+    return {"status": "deleted", "id": geofence_id}
+
+
+@app.get("/geofences/alerts")
+async def geofence_alerts(
+    geofence_id: Optional[int] = None,
+    after_id: int = 0,
+    limit: int = Query(100, ge=1, le=500),
+    user: dict = Depends(get_current_user),
+):
+    """Alerts for the caller's geofences, oldest first after ``after_id``.
+
+    Poll with the last alert id seen to receive only new alerts.
+    """
+
+    fence_clause = " AND g.id = %s" if geofence_id is not None else ""
+    params = [user.get("sub"), after_id] + ([geofence_id] if geofence_id is not None else []) + [limit]
+    rows = fetch_all(
+        f"""
+        SELECT a.id, a.geofence_id, g.name AS geofence_name, a.created_at,
+               e.id AS event_id, e.title, e.event_type, e.detected_at,
+               ST_X(e.geom::geometry) AS lon, ST_Y(e.geom::geometry) AS lat
+        FROM geofence_alerts a
+        JOIN geofences g ON g.id = a.geofence_id
+        JOIN events e ON e.id = a.event_id AND e.detected_at = a.event_detected_at
+        WHERE g.owner = %s AND a.id > %s{fence_clause}
+        ORDER BY a.id
+        LIMIT %s
+        """,
+        params,
+    )
+    return {"alerts": rows, "last_id": rows[-1]["id"] if rows else after_id}
+
+
+_SAVED_SEARCH_COLUMNS = (
+    "id, owner, name, q, event_type, source_id, minlon, minlat, maxlon, maxlat, seen_hit_id, active, created_at"
+)
+
+
+@app.post("/saved-searches", status_code=201)
+async def create_saved_search(search: SavedSearchCreate, user: dict = Depends(get_current_user)):
+    """Save a standing query; ingest records matching new events as hits.
+
+    Criteria are normalised like the event filters (``q`` is a
+    case-insensitive substring of title or body).  Only events ingested
+    after the search is saved are matched.
+    """
+
+    flt = filters.parse(q=search.q, bbox=search.bbox, source_id=search.source_id, event_type=search.type)
+    if search.bbox and flt.bbox is None:
+        raise HTTPException(status_code=422, detail="bbox must be minLon,minLat,maxLon,maxLat")
+    if not (flt.q or flt.bbox or flt.event_type or flt.source_id):
+        raise HTTPException(status_code=422, detail="A saved search needs q, type, source_id or bbox")
+    box = flt.bbox or (None, None, None, None)
+    rows = execute(
+        f"""
+        INSERT INTO saved_searches (owner, name, q, event_type, source_id, minlon, minlat, maxlon, maxlat)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        RETURNING {_SAVED_SEARCH_COLUMNS}
+        """,
+        (user.get("sub"), search.name, flt.q, flt.event_type, flt.source_id, *box),
+    )
+    return rows[0]
+
+
+@app.get("/saved-searches")
+async def list_saved_searches(user: dict = Depends(get_current_user)):
+    """The caller's saved searches with the number of unread hits."""
+
+    rows = fetch_all(
+        f"""
+        SELECT {_SAVED_SEARCH_COLUMNS},
+               (SELECT count(*) FROM saved_search_hits h WHERE h.search_id = s.id AND h.id > s.seen_hit_id) AS new_hits
+        FROM saved_searches s
+        WHERE s.owner = %s
+        ORDER BY s.id
+        """,
+        (user.get("sub"),),
+    )
+    return {"results": rows, "count": len(rows)}
+
+
+@app.delete("/saved-searches/{search_id:int}")
+async def delete_saved_search(search_id: int, user: dict = Depends(get_current_user)):
+    rows = execute(
+        "DELETE FROM saved_searches WHERE id=%s AND owner=%s RETURNING id",
+        (search_id, user.get("sub")),
+    )
+    if not rows:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return {"status": "deleted", "id": search_id}
+
+
+@app.get("/saved-searches/{search_id:int}/hits")
+async def saved_search_hits(
+    search_id: int,
+    after_id: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    mark_seen: int = 0,
+    user: dict = Depends(get_current_user),
+):
+    """Events matched by a saved search, oldest first.
+
+    Without ``after_id`` this is "what's new": hits after the last one marked
+    seen.  ``mark_seen=1`` advances that marker to the last hit returned.
+    """
+
+    search = fetch_one(
+        "SELECT id, seen_hit_id FROM saved_searches WHERE id=%s AND owner=%s",
+        (search_id, user.get("sub")),
+    )
+    if not search:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    start = search["seen_hit_id"] if after_id is None else after_id
+    rows = fetch_all(
+        """
+        SELECT h.id, h.created_at AS matched_at, e.id AS event_id, e.source_id, e.title, e.event_type,
+               e.detected_at,
+               CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
+               CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat
+        FROM saved_search_hits h
+        JOIN events e ON e.id = h.event_id AND e.detected_at = h.event_detected_at
+        WHERE h.search_id = %s AND h.id > %s
+        ORDER BY h.id
+        LIMIT %s
+        """,
+        (search_id, start, limit),
+    )
+    last_id = rows[-1]["id"] if rows else start
+    if mark_seen and last_id > search["seen_hit_id"]:
+        execute(
+            "UPDATE saved_searches SET seen_hit_id=%s WHERE id=%s AND seen_hit_id < %s",
+            (last_id, search_id, last_id),
+        )
+    return {"search_id": search_id, "hits": rows, "last_id": last_id}
+
+
 @app.get("/events/recent")
 async def recent_events(limit: int = 50, offset: int = 0, sort: str = "detected_at", source_id: Optional[int] = None, debug: int = 0):
     clamped = max(1, min(int(limit or 50), 200))
     clamped_offset = max(0, int(offset or 0))
     sort_col = "detected_at" if (sort not in {"detected_at", "occurred_at"}) else sort
-    clauses: List[str] = []
-    params: List = []
-    if source_id:
-        clauses.append("e.source_id = %s")
-        params.append(int(source_id))
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    where, params = filters.parse(source_id=source_id).compile()
     geom_debug = ", CASE WHEN e.geom IS NOT NULL THEN ST_AsText(e.geom::geometry) END AS geom_wkt" if debug else ""
     rows = fetch_all(
         f"""
@@ -856,7 +1442,7 @@ async def recent_events(limit: int = 50, offset: int = 0, sort: str = "detected_
         FROM events e
         LEFT JOIN sources s ON s.id = e.source_id
         {where}
-        ORDER BY {sort_col} DESC
+        ORDER BY e.{sort_col} DESC
         OFFSET %s
         LIMIT %s
         """,
@@ -865,112 +1451,72 @@ async def recent_events(limit: int = 50, offset: int = 0, sort: str = "detected_
     return {"results": rows, "limit": clamped, "offset": clamped_offset, "sort": sort_col}
 
 
-@app.get("/stats/summary")
-async def stats_summary(q: Optional[str] = None, bbox: Optional[str] = None, time_range: Optional[str] = None, source_id: Optional[int] = None):
-    params: List = []
-    clauses: List[str] = []
-
-    if q:
-        clauses.append("(title ILIKE %s OR body ILIKE %s)")
-        like = f"%{q}%"
-        params.extend([like, like])
+@app.get("/stats/summary", dependencies=[Depends(admit_stats)])
+async def stats_summary(
+    q: Optional[str] = None,
+    bbox: Optional[str] = None,
+    time_range: Optional[str] = None,
+    source_id: Optional[int] = None,
+    approx: int = 0,
+):
+    """Event counts in total, by type and by source.
 
-    if time_range:
-        try:
-            start_s, end_s = time_range.split("..", 1)
-        except ValueError:
-            start_s, end_s = time_range, ""
-        def _parse(ts: str | None):
-            if not ts:
-                return None
-            ts = ts.strip()
-            if not ts:
-                return None
-            if ts.endswith("Z"):
-                ts = ts.replace("Z", "+00:00")
-            try:
-                return datetime.fromisoformat(ts)
-            except Exception:
-                return None
-        start_dt = _parse(start_s)
-        end_dt = _parse(end_s)
-        if start_dt:
-            clauses.append("detected_at >= %s")
-            params.append(start_dt)
-        if end_dt:
-            clauses.append("detected_at <= %s")
-            params.append(end_dt)
-
-    if bbox:
-        try:
-            minlon, minlat, maxlon, maxlat = [float(x) for x in bbox.split(",")]
-            clauses.append("geom IS NOT NULL AND ST_Intersects(geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))")
-            params.extend([minlon, minlat, maxlon, maxlat])
-        except Exception:
-            pass
+    ``approx=1`` returns estimates instead of exact counts (see
+    ``app.estimates``): planner statistics when no filter is given, otherwise
+    a block sample with 95% intervals under ``ci95``.
+    """
 
-    if source_id:
-        clauses.append("source_id = %s")
-        params.append(int(source_id))
+    flt = filters.parse(q=q, bbox=bbox, time_range=time_range, source_id=source_id)
+    key = make_key("/stats/summary", filter=flt.cache_key, approx=bool(approx))
+    return await coalescer.do(key, _stats_summary, flt, bool(approx), route="/stats/summary")
 
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
 
-    total = fetch_all(f"SELECT count(*) AS c FROM events {where}", params)[0]["c"] if True else 0
-    by_type = fetch_all(f"SELECT event_type, count(*) AS c FROM events {where} GROUP BY event_type ORDER BY c DESC", params)
-    by_source = fetch_all(f"SELECT s.name AS source_name, count(*) AS c FROM events e LEFT JOIN sources s ON s.id=e.source_id {where.replace(' WHERE ',' WHERE ')} GROUP BY s.name ORDER BY c DESC", params)
-    return {"total": total, "counts_by_type": by_type, "counts_by_source": by_source}
+def _stats_summary(flt: filters.EventFilter, approx: bool = False):
+    where, params = flt.compile()
+    if approx:
+        summary = estimates.planner(fetch_all) if flt == filters.EventFilter() else None
+        summary = summary or estimates.sampled(fetch_all, where, params, _settings.stats_sample_blocks)
+    else:
+        total = fetch_all(f"SELECT count(*) AS c FROM events e {where}", params)[0]["c"]
+        by_type = fetch_all(f"SELECT e.event_type, count(*) AS c FROM events e {where} GROUP BY e.event_type ORDER BY c DESC", params)
+        by_source = fetch_all(f"SELECT s.name AS source_name, count(*) AS c FROM events e LEFT JOIN sources s ON s.id=e.source_id {where} GROUP BY s.name ORDER BY c DESC", params)
+        summary = {"total": total, "counts_by_type": by_type, "counts_by_source": by_source}
+    dset, floor = _archive_for(flt)
+    if dset is not None:
+        _add_archived_counts(summary, archive_mod.count_events(dset, flt, floor))
+    return summary
+
+
+def _add_archived_counts(summary: Dict, cold: Dict) -> None:
+    """Add exact archived counts to a summary; estimated intervals shift by the same amount."""
+
+    interval = "total_ci95" in summary.get("approx", {})
+    summary["total"] += cold["total"]
+    if interval:
+        summary["approx"]["total_ci95"] = [b + cold["total"] for b in summary["approx"]["total_ci95"]]
+    for key, label, counts in (
+        ("counts_by_type", "event_type", cold["by_type"]),
+        ("counts_by_source", "source_name", cold["by_source"]),
+    ):
+        groups = {g[label]: g for g in summary[key]}
+        for name, c in counts.items():
+            group = groups.setdefault(name, {label: name, "c": 0, **({"ci95": [0, 0]} if interval else {})})
+            group["c"] += c
+            if interval:
+                group["ci95"] = [b + c for b in group["ci95"]]
+        summary[key] = sorted(groups.values(), key=lambda g: -g["c"])
 
 
 @app.get("/events/geojson")
-async def events_geojson(q: Optional[str] = None, bbox: Optional[str] = None, time_range: Optional[str] = None, limit: int = 500, source_id: Optional[int] = None):
-    params: List = []
-    clauses: List[str] = ["geom IS NOT NULL"]
+async def events_geojson(q: Optional[str] = None, bbox: Optional[str] = None, time_range: Optional[str] = None, limit: int = 500, source_id: Optional[int] = None, collapse: int = 0):
+    flt = filters.parse(q=q, bbox=bbox, time_range=time_range, source_id=source_id, collapse=bool(collapse))
+    key = make_key("/events/geojson", filter=flt.cache_key, limit=limit)
+    return await coalescer.do(key, _events_geojson, flt, limit, route="/events/geojson")
 
-    if q:
-        clauses.append("(title ILIKE %s OR body ILIKE %s)")
-        like = f"%{q}%"
-        params.extend([like, like])
-
-    if time_range:
-        try:
-            start_s, end_s = time_range.split("..", 1)
-        except ValueError:
-            start_s, end_s = time_range, ""
-        def _parse(ts: str | None):
-            if not ts:
-                return None
-            ts = ts.strip()
-            if not ts:
-                return None
-            if ts.endswith("Z"):
-                ts = ts.replace("Z", "+00:00")
-            try:
-                return datetime.fromisoformat(ts)
-            except Exception:
-                return None
-        start_dt = _parse(start_s)
-        end_dt = _parse(end_s)
-        if start_dt:
-            clauses.append("detected_at >= %s")
-            params.append(start_dt)
-        if end_dt:
-            clauses.append("detected_at <= %s")
-            params.append(end_dt)
-
-    if bbox:
-        try:
-            minlon, minlat, maxlon, maxlat = [float(x) for x in bbox.split(",")]
-            clauses.append("ST_Intersects(geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))")
-            params.extend([minlon, minlat, maxlon, maxlat])
-        except Exception:
-            pass
-
-    if source_id:
-        clauses.append("e.source_id = %s")
-        params.append(int(source_id))
 
+def _events_geojson(flt: filters.EventFilter, limit: int):
+    where, params = flt.compile(require_geom=True)
     clamped = max(1, min(int(limit or 500), 1000))
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
     rows = fetch_all(
         f"""
         SELECT e.id, e.title, e.body, e.event_type, e.occurred_at, e.detected_at,
@@ -980,11 +1526,17 @@ async def events_geojson(q: Optional[str] = None, bbox: Optional[str] = None, ti
         FROM events e
         LEFT JOIN sources s ON s.id = e.source_id
         {where}
-        ORDER BY detected_at DESC
+        ORDER BY e.detected_at DESC
         LIMIT %s
         """,
         params + [clamped],
     )
+    dset, floor = _archive_for(flt)
+    if dset is not None:
+        cold = archive_mod.fetch_events(
+            dset, flt, floor, clamped, columns=archive_mod.GEOJSON_COLUMNS, located=True
+        )
+        rows = archive_mod.merge(rows, _with_source_name(cold))[:clamped]
 
     features = []
     for r in rows:
@@ -1003,6 +1555,117 @@ async def events_geojson(q: Optional[str] = None, bbox: Optional[str] = None, ti
     return {"type": "FeatureCollection", "features": features, "count": len(features)}
 
 
+@app.get("/events/nearby")
+async def events_nearby(
+    lon: float = Query(..., ge=-180, le=180),
+    lat: float = Query(..., ge=-90, le=90),
+    k: int = Query(20, ge=1, le=200),
+    within_km: Optional[float] = Query(None, gt=0, le=20_000),
+    time_range: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    type: Optional[str] = None,
+    source_id: Optional[int] = None,
+    collapse: int = 0,
+):
+    """The ``k`` located events closest to ``lon``/``lat``, nearest first.
+
+    Ordering by the geography ``<->`` operator lets Postgres walk
+    ``idx_events_geom`` in distance order (one ordered index scan per
+    partition, merged) and stop after ``k`` rows instead of sorting every
+    candidate; ``within_km`` adds an index-assisted ``ST_DWithin`` cut-off.
+    ``distance_m`` is the sphere distance the ordering uses.
+    """
+
+    flt = filters.parse(
+        time_range=time_range,
+        since=since,
+        until=until,
+        event_type=type,
+        source_id=source_id,
+        collapse=bool(collapse),
+    )
+    key = make_key("/events/nearby", filter=flt.cache_key, lon=lon, lat=lat, k=k, within_km=within_km)
+    return await coalescer.do(key, _events_nearby, flt, lon, lat, k, within_km, route="/events/nearby")
+
+
+_POINT = "ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography"
+
+
+def _events_nearby(flt: filters.EventFilter, lon: float, lat: float, k: int, within_km: Optional[float]):
+    where, params = flt.compile(require_geom=True)
+    point = [lon, lat]
+    if within_km is not None:
+        where += f" AND ST_DWithin(e.geom, {_POINT}, %s)"
+        params += point + [within_km * 1000.0]
+    rows = fetch_all(
+        f"""
+        SELECT e.id, e.source_id, s.name AS source_name, e.title, e.event_type, e.occurred_at, e.detected_at,
+               e.jurisdiction, e.severity,
+               ST_X(e.geom::geometry) AS lon, ST_Y(e.geom::geometry) AS lat,
+               e.geom <-> {_POINT} AS distance_m
+        FROM events e
+        LEFT JOIN sources s ON s.id = e.source_id
+        {where}
+        ORDER BY e.geom <-> {_POINT}
+        LIMIT %s
+        """,
+        point + params + point + [k],
+    )
+    return {"center": {"lon": lon, "lat": lat}, "k": k, "within_km": within_km, "events": rows}
+
+
+# Resolutions precomputed at ingest (events.h3_r3/h3_r5/h3_r7).
+HEX_RESOLUTIONS = (3, 5, 7)
+
+
+@app.get("/events/hexbins", dependencies=[Depends(admit_hexbins)])
+async def events_hexbins(
+    res: int = 5,
+    q: Optional[str] = None,
+    bbox: Optional[str] = None,
+    time_range: Optional[str] = None,
+    source_id: Optional[int] = None,
+    type: Optional[str] = None,
+    limit: int = Query(10_000, ge=1, le=100_000),
+):
+    """Event counts per H3 cell with the dominant ``event_type`` of each cell.
+
+    Cells are read from the precomputed ``h3_r{res}`` columns, whose covering
+    indexes hold the type, time and source, so unfiltered and
+    time/type/source-filtered maps aggregate from the index alone.
+    """
+
+    if res not in HEX_RESOLUTIONS:
+        raise HTTPException(status_code=422, detail=f"res must be one of {list(HEX_RESOLUTIONS)}")
+    flt = filters.parse(q=q, bbox=bbox, time_range=time_range, source_id=source_id, event_type=type)
+    key = make_key("/events/hexbins", filter=flt.cache_key, res=res, limit=limit)
+    return await coalescer.do(key, _events_hexbins, flt, res, limit, route="/events/hexbins")
+
+
+def _events_hexbins(flt: filters.EventFilter, res: int, limit: int):
+    where, params = flt.compile()
+    cell = f"e.h3_r{res}"
+    where = f"{where} AND {cell} IS NOT NULL" if where else f" WHERE {cell} IS NOT NULL"
+    rows = fetch_all(
+        f"""
+        SELECT to_hex(cell) AS h3, sum(c)::bigint AS count,
+               (array_agg(event_type ORDER BY c DESC, event_type))[1] AS dominant_type
+        FROM (
+            SELECT {cell} AS cell, e.event_type::text AS event_type, count(*) AS c
+            FROM events e
+            {where}
+            GROUP BY {cell}, e.event_type
+        ) per_type
+        GROUP BY cell
+        ORDER BY count DESC
+        LIMIT %s
+        """,
+        params + [limit],
+    )
+    return {"res": res, "cells": rows, "count": len(rows)}
+
+
 @app.get("/sources")
 async def list_sources():
     rows = fetch_all(
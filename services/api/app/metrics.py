@@ -0,0 +1,99 @@
+"""Prometheus collectors for the API.
+
+Collectors live in their own module so they are registered exactly once per
+process, even when :mod:`app.main` is reloaded (as the auth tests do) or this
+module is imported under a second name (``app.metrics`` and
+``services.api.app.metrics`` share one registry).
+
+Per-request series are labelled by the matched route *template* (for example
+``/events/{event_id}``) rather than the raw path so label cardinality stays
+bounded no matter how many distinct ids clients request.
+"""
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+
+
+def _collector(cls, name: str, *args, **kwargs):
+    """Create ``cls(name, ...)``, or reuse the collector already registered as ``name``."""
+
+    existing = REGISTRY._names_to_collectors.get(name)
+    if isinstance(existing, cls):
+        return existing
+    return cls(name, *args, **kwargs)
+
+
+REQUEST_COUNTER = _collector(Counter, "request_total", "Total HTTP requests")
+ERROR_COUNTER = _collector(Counter, "error_total", "Total HTTP errors")
+
+REQUEST_LABELS = ("route", "method", "status_class")
+
+REQUEST_LATENCY = _collector(
+    Histogram,
+    "http_request_duration_seconds",
+    "HTTP request duration in seconds, measured until the last body byte is sent",
+    REQUEST_LABELS,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+RESPONSE_SIZE = _collector(
+    Histogram,
+    "http_response_size_bytes",
+    "HTTP response body size in bytes",
+    REQUEST_LABELS,
+    buckets=(100, 1_000, 10_000, 100_000, 500_000, 1_000_000, 5_000_000, 25_000_000, 100_000_000),
+)
+IN_FLIGHT = _collector(
+    Gauge,
+    "http_requests_in_flight",
+    "HTTP requests currently being served",
+    ("method",),
+)
+
+COALESCED_COUNTER = _collector(
+    Counter,
+    "request_coalesced_total",
+    "Requests answered from another identical in-flight request",
+    ("route",),
+)
+
+SHED_COUNTER = _collector(
+    Counter,
+    "request_shed_total",
+    "Requests rejected by admission control",
+    ("route", "reason"),
+)
+
+DEPENDENCY_UP = _collector(
+    Gauge,
+    "dependency_up",
+    "1 if the last background health probe of the dependency succeeded",
+    ("dependency",),
+)
+DEPENDENCY_LATENCY = _collector(
+    Gauge,
+    "dependency_check_latency_seconds",
+    "Latency of the last background health probe of the dependency",
+    ("dependency",),
+)
+
+# Label used when no route matched (404s, probes for random paths).
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: dict) -> str:
+    """Return the route template matched for ``scope``.
+
+    FastAPI stores the matched :class:`~fastapi.routing.APIRoute` on the scope
+    once routing has happened; ``path_format`` strips converters so
+    ``/events/{event_id:int}`` is reported as ``/events/{event_id}``.
+    """
+
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def status_class(status_code: int) -> str:
+    """Collapse ``status_code`` into ``2xx``/``4xx``/... buckets."""
+
+    return f"{status_code // 100}xx"
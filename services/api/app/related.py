@@ -0,0 +1,291 @@
+"""Precomputed "related events" lists behind ``/events/{id}/related``.
+
+Ranking an event's neighbours at click time would mean comparing its vector
+with every recent event.  Instead :func:`run` keeps a top-``k`` list per
+event in ``event_related`` and the endpoint reads one row by primary key.
+
+A neighbour's score blends three signals::
+
+    W_TEXT * cosine(embeddings)
+  + W_GEO  * exp(-distance_km / GEO_SCALE_KM)      (0 when either is unlocated)
+  + W_TIME * exp(-|hours apart| / TIME_SCALE_HOURS)
+
+Pairs further apart than ``window_days`` or with cosine below ``MIN_TEXT``
+are never related, so place and time alone do not link unrelated reports.
+
+Each pass takes the next batch of newly embedded events (``event_embeddings``
+past the highest id already listed), scores them against every embedded
+event in their time window with blocked NumPy matrix products, and writes
+their lists.  Existing events only change when a new event lands in a list:
+each new event is offered to the lists of its own top-``k`` neighbours, which
+are merged in place instead of recomputed.
+
+    python -m app.related            # keep up with new embeddings
+    python -m app.related --once
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from datetime import timedelta
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+import structlog
+
+from .vectors import LOOKBACK_HOURS
+
+if TYPE_CHECKING:  # numpy is imported where used, keeping `import app.main` light
+    import numpy as np
+
+logger = structlog.get_logger(__name__)
+
+K = 10
+W_TEXT, W_GEO, W_TIME = 0.7, 0.15, 0.15
+GEO_SCALE_KM = 100.0
+TIME_SCALE_HOURS = 72.0
+MIN_TEXT = 0.2
+BLOCK = 20_000
+
+_EARTH_KM = 6371.0
+
+_SELECT = """
+    SELECT m.event_id AS id, m.detected_at, m.vector,
+           CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
+           CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat
+    FROM event_embeddings m
+    JOIN events e ON e.id = m.event_id AND e.detected_at = m.detected_at
+"""
+
+# Embedded events without a list: above the highest listed id, or recent
+# enough to have been embedded after higher ids.
+PENDING_SQL = _SELECT + """
+    WHERE m.model = %s
+      AND (m.event_id > (SELECT coalesce(max(event_id), 0) FROM event_related)
+           OR m.detected_at >= now() - %s * interval '1 hour')
+      AND NOT EXISTS (SELECT 1 FROM event_related r WHERE r.event_id = m.event_id)
+    ORDER BY m.event_id
+    LIMIT %s
+"""
+
+POOL_SQL = _SELECT + """
+    WHERE m.model = %s AND m.detected_at BETWEEN %s AND %s
+"""
+
+LISTS_SQL = """
+    SELECT event_id, detected_at, related_ids, related_at, scores
+    FROM event_related
+    WHERE event_id = ANY(%s)
+"""
+
+UPSERT_SQL = """
+    INSERT INTO event_related(event_id, detected_at, related_ids, related_at, scores, computed_at)
+    VALUES (%s, %s, %s, %s, %s, now())
+    ON CONFLICT (event_id) DO UPDATE
+      SET related_ids = excluded.related_ids, related_at = excluded.related_at,
+          scores = excluded.scores, computed_at = now()
+"""
+
+
+# Neighbours joined on (id, detected_at) so each probe prunes to one partition.
+RELATED_SQL = """
+    SELECT e.id, e.source_id, s.name AS source_name, e.title, e.event_type, e.detected_at,
+           CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
+           CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat,
+           u.score
+    FROM event_related r
+    CROSS JOIN LATERAL unnest(r.related_ids, r.related_at, r.scores) WITH ORDINALITY AS u(id, detected_at, score, rank)
+    JOIN events e ON e.id = u.id AND e.detected_at = u.detected_at
+    LEFT JOIN sources s ON s.id = e.source_id
+    WHERE r.event_id = %s
+    ORDER BY u.rank
+    LIMIT %s
+"""
+
+
+class Block:
+    """Column arrays (ids, times, unit vectors, radians) for a set of embedded events."""
+
+    def __init__(self, ids, at, hours, vecs, lon, lat) -> None:
+        self.ids, self.at, self.hours, self.vecs, self.lon, self.lat = ids, at, hours, vecs, lon, lat
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict], dim: int) -> "Block":
+        import numpy as np
+
+        vecs = (
+            np.frombuffer(b"".join(bytes(r["vector"]) for r in rows), dtype=np.float32).reshape(len(rows), dim)
+            if rows
+            else np.zeros((0, dim), dtype=np.float32)
+        )
+        lon = np.array([np.nan if r["lon"] is None else r["lon"] for r in rows], dtype=np.float64)
+        lat = np.array([np.nan if r["lat"] is None else r["lat"] for r in rows], dtype=np.float64)
+        return cls(
+            np.array([r["id"] for r in rows], dtype=np.int64),
+            [r["detected_at"] for r in rows],
+            np.array([r["detected_at"].timestamp() / 3600.0 for r in rows], dtype=np.float64),
+            vecs,
+            np.radians(lon),
+            np.radians(lat),
+        )
+
+    def __getitem__(self, sl: slice) -> "Block":
+        return Block(self.ids[sl], self.at[sl], self.hours[sl], self.vecs[sl], self.lon[sl], self.lat[sl])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+def scores(a: Block, b: Block, window_hours: float) -> np.ndarray:
+    """Blended relatedness of every pair, shape ``(len(a), len(b))``; ``-inf`` if unrelated.
+
+    Distance and time terms are only evaluated for pairs that pass the text
+    and window cut-offs, usually a small fraction of the block.
+    """
+
+    import numpy as np
+
+    text = a.vecs @ b.vecs.T
+    dt = np.abs(a.hours[:, None] - b.hours[None, :])
+    keep = (text >= MIN_TEXT) & (dt <= window_hours) & (a.ids[:, None] != b.ids[None, :])
+    out = np.full(text.shape, -np.inf)
+    i, j = np.nonzero(keep)
+    if len(i):
+        lat1, lat2 = a.lat[i], b.lat[j]
+        h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((b.lon[j] - a.lon[i]) / 2) ** 2
+        km = 2 * _EARTH_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+        geo = np.nan_to_num(np.exp(-km / GEO_SCALE_KM), nan=0.0)
+        out[i, j] = W_TEXT * text[i, j] + W_GEO * geo + W_TIME * np.exp(-dt[i, j] / TIME_SCALE_HOURS)
+    return out
+
+
+def top_k(new: Block, pool: Block, k: int, window_hours: float, block: int = BLOCK) -> Tuple[np.ndarray, np.ndarray]:
+    """Best ``k`` pool columns per new row as ``(indices, scores)``, best first.
+
+    The pool is scored ``block`` columns at a time and merged into a running
+    top-``k``, so memory stays at ``len(new) * (block + k)`` scores.
+    """
+
+    import numpy as np
+
+    n = len(new)
+    best_idx = np.full((n, 0), -1, dtype=np.int64)
+    best = np.full((n, 0), -np.inf)
+    for start in range(0, len(pool), block):
+        part = pool[start : start + block]
+        cand = np.concatenate([best, scores(new, part, window_hours)], axis=1)
+        cand_idx = np.concatenate(
+            [best_idx, np.broadcast_to(np.arange(start, start + len(part)), (n, len(part)))], axis=1
+        )
+        if cand.shape[1] > k:
+            keep = np.argpartition(-cand, k - 1, axis=1)[:, :k]
+            cand = np.take_along_axis(cand, keep, axis=1)
+            cand_idx = np.take_along_axis(cand_idx, keep, axis=1)
+        best, best_idx = cand, cand_idx
+    order = np.argsort(-best, axis=1, kind="stable")
+    return np.take_along_axis(best_idx, order, axis=1), np.take_along_axis(best, order, axis=1)
+
+
+def merge(current: List[Tuple[float, int, object]], offered: List[Tuple[float, int, object]], k: int):
+    """Merge ``(score, id, detected_at)`` entries, best ``k`` by score, one per id."""
+
+    seen = {}
+    for entry in current + offered:
+        if entry[1] not in seen or entry[0] > seen[entry[1]][0]:
+            seen[entry[1]] = entry
+    return sorted(seen.values(), key=lambda e: (-e[0], e[1]))[:k]
+
+
+def _row(event_id, detected_at, entries) -> tuple:
+    return (
+        int(event_id),
+        detected_at,
+        [int(e[1]) for e in entries],
+        [e[2] for e in entries],
+        [round(float(e[0]), 4) for e in entries],
+    )
+
+
+def process_batch(cur, model: str, dim: int, k: int = K, window_days: float = 30, batch_size: int = 500) -> int:
+    """List neighbours for the next batch of embedded events; return its size."""
+
+    import numpy as np
+
+    cur.execute(PENDING_SQL, (model, LOOKBACK_HOURS, batch_size))
+    rows = cur.fetchall()
+    if not rows:
+        return 0
+    new = Block.from_rows(rows, dim)
+    window = timedelta(days=window_days)
+    cur.execute(POOL_SQL, (model, min(new.at) - window, max(new.at) + window))
+    pool = Block.from_rows(cur.fetchall(), dim)
+    idx, best = top_k(new, pool, k, window_days * 24)
+
+    writes = []
+    offers: Dict[int, List[Tuple[float, int, object]]] = {}
+    batch_ids = set(new.ids.tolist())
+    for i in range(len(new)):
+        entries = [
+            (float(s), int(pool.ids[j]), pool.at[j]) for j, s in zip(idx[i], best[i]) if np.isfinite(s)
+        ]
+        writes.append(_row(new.ids[i], new.at[i], entries))
+        for score, neighbour, _ in entries:
+            if neighbour not in batch_ids:
+                offers.setdefault(neighbour, []).append((score, int(new.ids[i]), new.at[i]))
+
+    if offers:
+        cur.execute(LISTS_SQL, (list(offers),))
+        for r in cur.fetchall():
+            current = list(zip(r["scores"], r["related_ids"], r["related_at"]))
+            merged = merge(current, offers[r["event_id"]], k)
+            if merged != sorted(current, key=lambda e: (-e[0], e[1]))[:k]:
+                writes.append(_row(r["event_id"], r["detected_at"], merged))
+    cur.executemany(UPSERT_SQL, writes)
+    return len(new)
+
+
+def run(conn, model: str, dim: int, k: int = K, window_days: float = 30, batch_size: int = 500) -> int:
+    """Process every pending embedded event; return how many were listed."""
+
+    from psycopg.rows import dict_row
+
+    total = 0
+    with conn.cursor(row_factory=dict_row) as cur:
+        while True:
+            done = process_batch(cur, model, dim, k, window_days, batch_size)
+            conn.commit()
+            total += done
+            if done < batch_size:
+                return total
+
+
+def main() -> None:
+    from .config import get_settings
+    from .vectors import HashingEmbedder
+
+    parser = argparse.ArgumentParser(description="Precompute related-event lists")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between passes")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+
+    import psycopg
+
+    settings = get_settings()
+    model = HashingEmbedder(settings.embedding_dim).model
+    while True:
+        try:
+            with psycopg.connect(settings.database_url) as conn:
+                done = run(conn, model, settings.embedding_dim, settings.related_k, settings.related_window_days, args.batch_size)
+            logger.info("related_lists_updated", count=done)
+        except Exception as exc:
+            if args.once:
+                raise
+            logger.warning("related_pass_failed", error=str(exc))
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
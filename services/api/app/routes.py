@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Optional, List
-from datetime import datetime
+from typing import Optional
 
+from . import filters
 from .auth import get_current_user
 from .db import fetch_all, fetch_one
 
@@ -9,74 +9,17 @@ from .db import fetch_all, fetch_one
 router = APIRouter(prefix="/v1", dependencies=[Depends(get_current_user)])
 
 
-def _parse_timerange(rng: Optional[str]) -> tuple[Optional[datetime], Optional[datetime]]:
-    if not rng:
-        return None, None
-    try:
-        start_s, end_s = rng.split("..", 1)
-    except ValueError:
-        start_s, end_s = rng, ""
-
-    def _p(ts: Optional[str]) -> Optional[datetime]:
-        if not ts:
-            return None
-        ts = ts.strip()
-        if not ts:
-            return None
-        if ts.endswith("Z"):
-            ts = ts.replace("Z", "+00:00")
-        try:
-            return datetime.fromisoformat(ts)
-        except Exception:
-            return None
-
-    return _p(start_s), _p(end_s)
-
-
 @router.get("/search")
 async def search(
     q: Optional[str] = Query(default=None, description="Full-text query on title/body"),
     bbox: Optional[str] = Query(default=None, description="minLon,minLat,maxLon,maxLat"),
-    time_range: Optional[str] = Query(default=None, description="ISO8601 start..end on occurred_at"),
+    time_range: Optional[str] = Query(default=None, description="ISO8601 start..end on detected_at"),
     source_id: Optional[int] = Query(default=None),
     limit: int = Query(default=50, ge=1, le=1000),
 ):
-    clauses: List[str] = []
-    params: List = []
-
-    # FTS on title/body using expression index
-    if q:
-        clauses.append(
-            "to_tsvector('simple', e.title || ' ' || coalesce(e.body,'')) @@ plainto_tsquery('simple', %s)"
-        )
-        params.append(q)
-
-    # Time window on occurred_at
-    start_dt, end_dt = _parse_timerange(time_range)
-    if start_dt:
-        clauses.append("e.occurred_at >= %s")
-        params.append(start_dt)
-    if end_dt:
-        clauses.append("e.occurred_at <= %s")
-        params.append(end_dt)
-
-    # Optional bbox on geom (geography) if provided
-    if bbox:
-        try:
-            minlon, minlat, maxlon, maxlat = [float(x) for x in bbox.split(",")]
-            clauses.append(
-                "e.geom IS NOT NULL AND ST_Intersects(e.geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))"
-            )
-            params.extend([minlon, minlat, maxlon, maxlat])
-        except Exception:
-            # ignore malformed bbox
-            pass
-
-    if source_id:
-        clauses.append("e.source_id = %s")
-        params.append(int(source_id))
-
-    where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+    # FTS on title/body uses the expression index; time filters detected_at
+    # like every other event endpoint.
+    where, params = filters.parse(q=q, bbox=bbox, time_range=time_range, source_id=source_id).compile(text="fts")
 
     rows = fetch_all(
         f"""
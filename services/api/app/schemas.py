@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Literal, Any
 from datetime import datetime
 from uuid import UUID
@@ -36,6 +36,7 @@ class Event(BaseModel):
     jurisdiction: Optional[str] = None
     confidence: Optional[float] = None
     severity: Optional[float] = None
+    cluster_id: Optional[int] = Field(default=None, description="Earliest event of its near-duplicate cluster")
     geom: Optional[Any] = Field(default=None, description="Point/Polygon geometry placeholder")
     raw: Optional[Any] = None
 
@@ -64,9 +65,47 @@ class NotebookUpdate(BaseModel):
     title: Optional[str] = None
 
 
+class NotebookItemCreate(BaseModel):
+    kind: Literal["event", "entity"]
+    ref_id: UUID
+    note: Optional[str] = None
+
+    @field_validator("kind", mode="before")
+    @classmethod
+    def _lower_kind(cls, value):
+        return value.lower() if isinstance(value, str) else value
+
+
+class NotebookItemsCreate(BaseModel):
+    items: list[NotebookItemCreate] = Field(min_length=1, max_length=1000)
+
+
 class SearchQuery(BaseModel):
     q: Optional[str] = None
     bbox: Optional[str] = None
     time_range: Optional[str] = None
     limit: int = 50
 
+
+
+class GeofenceGeometry(BaseModel):
+    """GeoJSON polygon or multipolygon in lon/lat (EPSG:4326)."""
+
+    type: Literal["Polygon", "MultiPolygon"]
+    coordinates: list
+
+
+class GeofenceCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=200)
+    kind: Optional[str] = Field(default=None, description="e.g. port, infrastructure, lga")
+    geometry: GeofenceGeometry
+
+
+class SavedSearchCreate(BaseModel):
+    """Standing query; at least one criterion is required."""
+
+    name: str = Field(min_length=1, max_length=200)
+    q: Optional[str] = None
+    type: Optional[str] = None
+    source_id: Optional[int] = None
+    bbox: Optional[str] = Field(default=None, description="minLon,minLat,maxLon,maxLat")
@@ -0,0 +1,232 @@
+"""Typeahead for entity names and event titles.
+
+Entity suggestions are served from :class:`SuggestCache`, an in-process
+sorted array of the most linked entity names: a prefix lookup is two
+``bisect`` calls plus a top-k over the matching slice, well under a
+millisecond.  The cache holds at most ``max_entries`` names; when it is
+partial and a prefix has fewer cached matches than requested, the caller
+falls back to the ``lower(name) text_pattern_ops`` index.
+
+Freshness is update-on-write: statement triggers on ``entities`` and
+``event_entities`` send ``NOTIFY entities_changed`` with the ids of the
+entities a statement touched, and a listener thread re-reads just those
+entities and their link counts (``CHANGED_SQL``, an index lookup per id) at
+most once per ``min_interval`` seconds.  Only a notification without ids
+triggers a full reload.  ``POPULAR_SQL`` counts links over all of
+``event_entities``, so the periodic full reload every ``max_age`` seconds, in
+case notifications are missed, is the one full scan per API process.
+
+Event titles are too many to cache; they are matched with the trigram index
+on ``lower(title)``.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import threading
+import time
+from typing import Callable, Collection, List, Optional, Sequence, Set
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+CHANNEL = "entities_changed"
+
+POPULAR_SQL = """
+    SELECT e.id, e.type::text AS type, e.name, coalesce(c.n, 0) AS n
+    FROM entities e
+    LEFT JOIN (SELECT entity_id, count(*) AS n FROM event_entities GROUP BY entity_id) c
+      ON c.entity_id = e.id
+    ORDER BY n DESC, e.id
+    LIMIT %s
+"""
+
+CHANGED_SQL = """
+    SELECT e.id, e.type::text AS type, e.name,
+           (SELECT count(*) FROM event_entities l WHERE l.entity_id = e.id) AS n
+    FROM entities e
+    WHERE e.id = ANY(%s)
+"""
+
+ENTITY_SQL = """
+    SELECT e.id, e.type::text AS type, e.name
+    FROM entities e
+    WHERE lower(e.name) LIKE %s{kind}
+    ORDER BY length(e.name), lower(e.name)
+    LIMIT %s
+"""
+
+EVENT_SQL = """
+    SELECT e.id, e.title, e.event_type, e.detected_at
+    FROM events e
+    WHERE lower(e.title) LIKE %s
+    ORDER BY e.detected_at DESC
+    LIMIT %s
+"""
+
+
+def like_prefix(prefix: str) -> str:
+    """``LIKE`` pattern matching strings that start with ``prefix`` literally."""
+
+    escaped = prefix.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+def entity_sql(kind: Optional[str]) -> str:
+    return ENTITY_SQL.format(kind=" AND e.type::text = %s" if kind else "")
+
+
+def parse_ids(payload: str) -> Optional[List[int]]:
+    """Entity ids of a notification payload, ``None`` when it carries none."""
+
+    try:
+        return [int(part) for part in payload.split(",")] if payload else None
+    except ValueError:
+        return None
+
+
+def _entry(row) -> dict:
+    return {"id": row["id"], "type": row["type"], "name": row["name"], "n": row["n"]}
+
+
+class SuggestCache:
+    """Sorted array of popular entity names with prefix lookup."""
+
+    def __init__(
+        self,
+        loader: Callable[[int], Sequence[dict]],
+        max_entries: int = 50_000,
+        min_interval: float = 5.0,
+        max_age: float = 300.0,
+        changed: Optional[Callable[[List[int]], Sequence[dict]]] = None,
+    ) -> None:
+        self._loader = loader
+        self._changed = changed
+        self.max_entries = max_entries
+        self.min_interval = min_interval
+        self.max_age = max_age
+        self._keys: List[str] = []
+        self._rows: List[dict] = []
+        self.complete = False
+        self.loaded_at: Optional[float] = None
+        self._pending: Set[int] = set()
+        self._full = False
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded_at is not None
+
+    def _swap(self, entries: List[dict]) -> None:
+        entries.sort(key=lambda r: r["name"].lower())
+        # Swap both arrays at once; readers never see a half-built index.
+        self._keys, self._rows = [r["name"].lower() for r in entries], entries
+
+    def refresh(self) -> None:
+        rows = list(self._loader(self.max_entries))
+        self._swap([_entry(r) for r in rows])
+        self.complete = len(rows) < self.max_entries
+        self.loaded_at = time.monotonic()
+        logger.info("suggest_cache_refreshed", entries=len(rows), complete=self.complete)
+
+    def update(self, ids: Collection[int]) -> None:
+        """Re-read entities ``ids``; those without a row were deleted.
+
+        A partial cache keeps the ``max_entries`` most linked names, so a
+        changed entity displaces the least linked one when it outranks it.
+        """
+
+        rows = self._changed(list(ids))
+        by_id = {r["id"]: r for r in self._rows}
+        for entity_id in ids:
+            by_id.pop(entity_id, None)
+        entries = list(by_id.values()) + [_entry(r) for r in rows]
+        if len(entries) > self.max_entries:
+            entries = heapq.nlargest(self.max_entries, entries, key=lambda r: (r["n"], -r["id"]))
+            self.complete = False
+        self._swap(entries)
+        logger.info("suggest_cache_updated", changed=len(ids), entries=len(entries))
+
+    def lookup(self, prefix: str, limit: int, kind: Optional[str] = None) -> List[dict]:
+        """Most linked cached entities whose name starts with ``prefix``."""
+
+        keys, rows = self._keys, self._rows
+        prefix = prefix.lower()
+        lo = bisect.bisect_left(keys, prefix)
+        hi = bisect.bisect_left(keys, prefix + "\U0010ffff", lo)
+        matches = (rows[i] for i in range(lo, hi))
+        if kind:
+            matches = (r for r in matches if r["type"] == kind)
+        best = heapq.nsmallest(limit, matches, key=lambda r: (-r["n"], len(r["name"]), r["name"]))
+        return [{"id": r["id"], "type": r["type"], "name": r["name"]} for r in best]
+
+    def mark_dirty(self, payload: str = "") -> None:
+        ids = parse_ids(payload)
+        with self._lock:
+            if ids is None:
+                self._full = True
+            else:
+                self._pending.update(ids)
+        self._dirty.set()
+
+    def _stale(self) -> bool:
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= self.max_age
+
+    def start(self, connect: Optional[Callable[[], object]] = None) -> None:
+        """Load in a background thread and keep refreshing on notifications.
+
+        ``connect`` returns an autocommit psycopg connection for ``LISTEN``;
+        without it the cache only refreshes every ``max_age`` seconds.
+        """
+
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(connect,), name="suggest-cache", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._dirty.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self, connect) -> None:
+        if connect is not None:
+            threading.Thread(target=self._listen, args=(connect,), name="suggest-listen", daemon=True).start()
+        while not self._stop.is_set():
+            self._dirty.clear()
+            with self._lock:
+                ids, full = self._pending, self._full
+                self._pending, self._full = set(), False
+            try:
+                if full or self._changed is None or self._stale():
+                    self.refresh()
+                elif ids:
+                    self.update(ids)
+            except Exception as exc:  # pragma: no cover - logged, retried
+                logger.warning("suggest_cache_refresh_failed", error=str(exc))
+                with self._lock:
+                    self._full = True
+            self._dirty.wait(self.max_age)
+            # Debounce bursts of writes (an ingest batch) into one reload.
+            self._stop.wait(self.min_interval)
+
+    def _listen(self, connect) -> None:
+        while not self._stop.is_set():
+            try:
+                conn = connect()
+                with conn:
+                    conn.execute(f"LISTEN {CHANNEL}")
+                    while not self._stop.is_set():
+                        for notify in conn.notifies(timeout=1.0, stop_after=1):
+                            self.mark_dirty(notify.payload)
+            except Exception as exc:  # pragma: no cover - logged, retried
+                logger.warning("suggest_listen_failed", error=str(exc))
+                self._stop.wait(self.max_age)
@@ -0,0 +1,362 @@
+"""Event embeddings and the vector index behind ``/search/semantic``.
+
+Embeddings come from :class:`HashingEmbedder`, a local feature-hashing model
+that needs no download or GPU: word unigrams, word bigrams and character
+4-grams of each word are hashed (CRC32, so vectors are stable across
+processes) into ``dim`` signed buckets, damped with ``log1p`` and
+L2-normalised.  Cosine similarity then rewards shared words, phrases and word
+stems ("flood"/"flooding"), which covers the dashboard's keyword-heavy alert
+text.  A batch of texts becomes one ``np.bincount`` over all features.
+
+Vectors are kept in Qdrant (``QdrantIndex``, plain REST over ``httpx``) with
+the payload fields the event filters need (``event_type``, ``source_id``,
+``detected_at`` as epoch seconds and a geo ``location``), so filters are
+applied inside the vector search instead of after it.  :class:`MemoryIndex`
+is a brute-force stand-in with the same interface for tests and local runs.
+
+:func:`run` embeds events newer than the last embedded id, and unembedded
+events of the last ``LOOKBACK_HOURS`` (ids are drawn before their ingest
+transactions commit, so a lower id can appear late), in batches; it upserts
+them to the index in bulk and records them in ``event_embeddings``:
+
+    python -m app.vectors            # keep up with new events
+    python -m app.vectors --once     # backfill and exit
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import structlog
+
+from .filters import EventFilter
+
+if TYPE_CHECKING:  # numpy is imported where used, keeping `import app.main` light
+    import numpy as np
+
+logger = structlog.get_logger(__name__)
+
+DIM = 384
+LOOKBACK_HOURS = 24
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+# Relative weight of each feature family.
+_WORD, _BIGRAM, _CHARS = 1.0, 0.7, 0.35
+
+
+def _features(text: str) -> Tuple[List[bytes], List[float]]:
+    words = _TOKEN.findall(text.lower())
+    feats: List[bytes] = []
+    weights: List[float] = []
+    for w in words:
+        feats.append(b"w:" + w.encode())
+        weights.append(_WORD)
+        padded = f"<{w}>"
+        for i in range(max(len(padded) - 3, 1)):
+            feats.append(b"c:" + padded[i : i + 4].encode())
+            weights.append(_CHARS)
+    for a, b in zip(words, words[1:]):
+        feats.append(f"b:{a} {b}".encode())
+        weights.append(_BIGRAM)
+    return feats, weights
+
+
+class HashingEmbedder:
+    """Feature-hashing text embedder; ``embed`` returns unit ``float32`` rows."""
+
+    def __init__(self, dim: int = DIM) -> None:
+        self.dim = dim
+        self.model = f"hash-v1-{dim}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        import numpy as np
+
+        rows: List[int] = []
+        hashes: List[int] = []
+        weights: List[float] = []
+        for i, text in enumerate(texts):
+            feats, w = _features(text or "")
+            rows.extend([i] * len(feats))
+            hashes.extend(zlib.crc32(f) for f in feats)
+            weights.extend(w)
+        n = len(texts)
+        if not hashes:
+            return np.zeros((n, self.dim), dtype=np.float32)
+        h = np.array(hashes, dtype=np.uint32)
+        # The top bit picks the sign so colliding features tend to cancel.
+        signed = np.where(h >> np.uint32(31), -1.0, 1.0) * np.array(weights)
+        cells = np.array(rows, dtype=np.int64) * self.dim + (h % np.uint32(self.dim))
+        vecs = np.bincount(cells, weights=signed, minlength=n * self.dim).reshape(n, self.dim)
+        vecs = np.sign(vecs) * np.log1p(np.abs(vecs))
+        norms = np.linalg.norm(vecs, axis=1, keepdims=True)
+        np.divide(vecs, norms, out=vecs, where=norms > 0)
+        return vecs.astype(np.float32)
+
+
+def _epoch(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def payload(row: Dict) -> Dict:
+    """Index payload for an event row (``event_type``, ``source_id``, ``detected_at``, ``lon``/``lat``)."""
+
+    out = {
+        "event_type": row.get("event_type"),
+        "source_id": row.get("source_id"),
+        "detected_at": _epoch(row.get("detected_at")),
+    }
+    if row.get("lon") is not None and row.get("lat") is not None:
+        out["location"] = {"lon": row["lon"], "lat": row["lat"]}
+    return out
+
+
+def qdrant_filter(flt: EventFilter) -> Optional[Dict]:
+    """Translate the non-text parts of ``flt`` into a Qdrant filter."""
+
+    must: List[Dict] = []
+    if flt.event_type is not None:
+        must.append({"key": "event_type", "match": {"value": flt.event_type}})
+    if flt.source_id is not None:
+        must.append({"key": "source_id", "match": {"value": flt.source_id}})
+    if flt.start is not None or flt.end is not None:
+        rng = {}
+        if flt.start is not None:
+            rng["gte"] = _epoch(flt.start)
+        if flt.end is not None:
+            rng["lte"] = _epoch(flt.end)
+        must.append({"key": "detected_at", "range": rng})
+    if flt.bbox is not None:
+        minlon, minlat, maxlon, maxlat = flt.bbox
+        must.append(
+            {
+                "key": "location",
+                "geo_bounding_box": {
+                    "top_left": {"lon": minlon, "lat": maxlat},
+                    "bottom_right": {"lon": maxlon, "lat": minlat},
+                },
+            }
+        )
+    return {"must": must} if must else None
+
+
+def matches(data: Dict, flt: EventFilter) -> bool:
+    """Python evaluation of :func:`qdrant_filter` for :class:`MemoryIndex`."""
+
+    if flt.event_type is not None and data.get("event_type") != flt.event_type:
+        return False
+    if flt.source_id is not None and data.get("source_id") != flt.source_id:
+        return False
+    at = data.get("detected_at")
+    if flt.start is not None and (at is None or at < _epoch(flt.start)):
+        return False
+    if flt.end is not None and (at is None or at > _epoch(flt.end)):
+        return False
+    if flt.bbox is not None:
+        loc = data.get("location")
+        minlon, minlat, maxlon, maxlat = flt.bbox
+        if not loc or not (minlon <= loc["lon"] <= maxlon and minlat <= loc["lat"] <= maxlat):
+            return False
+    return True
+
+
+class MemoryIndex:
+    """In-process brute-force cosine index with the :class:`QdrantIndex` interface."""
+
+    def __init__(self, dim: int = DIM) -> None:
+        self.dim = dim
+        self._ids: List[int] = []
+        self._pos: Dict[int, int] = {}
+        self._payloads: List[Dict] = []
+        self._vecs: Optional[np.ndarray] = None
+
+    def ensure(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray, payloads: Sequence[Dict]) -> None:
+        import numpy as np
+
+        if self._vecs is None:
+            self._vecs = np.zeros((0, self.dim), dtype=np.float32)
+        new = []
+        for event_id, vec, data in zip(ids, vectors, payloads):
+            pos = self._pos.get(int(event_id))
+            if pos is None:
+                new.append((int(event_id), vec, data))
+            else:
+                self._vecs[pos] = vec
+                self._payloads[pos] = data
+        if new:
+            start = len(self._ids)
+            for offset, (event_id, _, data) in enumerate(new):
+                self._pos[event_id] = start + offset
+                self._ids.append(event_id)
+                self._payloads.append(data)
+            self._vecs = np.vstack([self._vecs, np.stack([v for _, v, _ in new]).astype(np.float32)])
+
+    def search(self, vector: np.ndarray, limit: int, flt: EventFilter = EventFilter()) -> List[Tuple[int, float]]:
+        import numpy as np
+
+        if not self._ids:
+            return []
+        scores = self._vecs @ vector
+        keep = np.array([matches(p, flt) for p in self._payloads])
+        scores = np.where(keep, scores, -np.inf)
+        top = np.argsort(-scores, kind="stable")[:limit]
+        return [(self._ids[i], float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+
+class QdrantIndex:
+    """One Qdrant collection of event vectors, spoken to over REST."""
+
+    def __init__(self, url: str, collection: str = "events", dim: int = DIM, timeout: float = 5.0) -> None:
+        self.url = url.rstrip("/")
+        self.collection = collection
+        self.dim = dim
+        self.timeout = timeout
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import httpx
+
+            self._client = httpx.Client(base_url=f"{self.url}/collections/{self.collection}", timeout=self.timeout)
+        return self._client
+
+    def ensure(self) -> None:
+        """Create the collection and its payload indexes if missing."""
+
+        if self.client.get("").status_code == 200:
+            return
+        self.client.put("", json={"vectors": {"size": self.dim, "distance": "Cosine"}}).raise_for_status()
+        for field, schema in (
+            ("event_type", "keyword"),
+            ("source_id", "integer"),
+            ("detected_at", "float"),
+            ("location", "geo"),
+        ):
+            self.client.put("/index", json={"field_name": field, "field_schema": schema}).raise_for_status()
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray, payloads: Sequence[Dict]) -> None:
+        points = [
+            {"id": int(event_id), "vector": vec.tolist(), "payload": data}
+            for event_id, vec, data in zip(ids, vectors, payloads)
+        ]
+        self.client.put("/points", params={"wait": "true"}, json={"points": points}).raise_for_status()
+
+    def search(self, vector: np.ndarray, limit: int, flt: EventFilter = EventFilter()) -> List[Tuple[int, float]]:
+        body = {"vector": vector.tolist(), "limit": limit, "with_payload": False}
+        query_filter = qdrant_filter(flt)
+        if query_filter:
+            body["filter"] = query_filter
+        resp = self.client.post("/points/search", json=body)
+        resp.raise_for_status()
+        return [(int(hit["id"]), float(hit["score"])) for hit in resp.json()["result"]]
+
+
+def index_for(settings) -> "QdrantIndex | MemoryIndex":
+    if settings.vector_backend == "memory":
+        return MemoryIndex(settings.embedding_dim)
+    return QdrantIndex(settings.qdrant_url, settings.qdrant_collection, settings.embedding_dim)
+
+
+# --- Embedding job ----------------------------------------------------------
+
+PENDING_SQL = """
+    SELECT e.id, e.detected_at, e.event_type, e.source_id, e.title || ' ' || coalesce(e.body, '') AS text,
+           CASE WHEN e.geom IS NOT NULL THEN ST_X(e.geom::geometry) END AS lon,
+           CASE WHEN e.geom IS NOT NULL THEN ST_Y(e.geom::geometry) END AS lat
+    FROM events e
+    WHERE (e.id > %s OR e.detected_at >= now() - %s * interval '1 hour')
+      AND NOT EXISTS (SELECT 1 FROM event_embeddings m WHERE m.event_id = e.id AND m.model = %s)
+    ORDER BY e.id
+    LIMIT %s
+"""
+
+STORE_SQL = """
+    INSERT INTO event_embeddings(event_id, detected_at, model, vector)
+    VALUES (%s, %s, %s, %s)
+    ON CONFLICT (event_id) DO UPDATE
+      SET detected_at = excluded.detected_at, model = excluded.model,
+          vector = excluded.vector, embedded_at = now()
+"""
+
+
+def embed_batch(cur, embedder: HashingEmbedder, index, batch_size: int) -> int:
+    """Embed and index the next ``batch_size`` unembedded events; return the count."""
+
+    cur.execute("SELECT coalesce(max(event_id), 0) AS id FROM event_embeddings WHERE model = %s", (embedder.model,))
+    watermark = cur.fetchone()["id"]
+    cur.execute(PENDING_SQL, (watermark, LOOKBACK_HOURS, embedder.model, batch_size))
+    rows = cur.fetchall()
+    if not rows:
+        return 0
+    vecs = embedder.embed([r["text"] for r in rows])
+    # Index first: a crash before the Postgres write only re-embeds the batch.
+    index.upsert([r["id"] for r in rows], vecs, [payload(r) for r in rows])
+    cur.executemany(
+        STORE_SQL,
+        [(r["id"], r["detected_at"], embedder.model, vecs[i].tobytes()) for i, r in enumerate(rows)],
+    )
+    return len(rows)
+
+
+def run(conn, embedder: HashingEmbedder, index, batch_size: int = 1000) -> int:
+    """Embed every pending event; return how many were indexed."""
+
+    from psycopg.rows import dict_row
+
+    index.ensure()
+    total = 0
+    with conn.cursor(row_factory=dict_row) as cur:
+        while True:
+            done = embed_batch(cur, embedder, index, batch_size)
+            conn.commit()
+            total += done
+            if done < batch_size:
+                return total
+
+
+def main() -> None:
+    from .config import get_settings
+
+    parser = argparse.ArgumentParser(description="Embed new events into the vector index")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between passes")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+
+    import psycopg
+
+    settings = get_settings()
+    embedder = HashingEmbedder(settings.embedding_dim)
+    index = index_for(settings)
+    while True:
+        try:
+            with psycopg.connect(settings.database_url) as conn:
+                done = run(conn, embedder, index, args.batch_size)
+            logger.info("events_embedded", count=done, model=embedder.model)
+        except Exception as exc:
+            if args.once:
+                raise
+            logger.warning("embedding_pass_failed", error=str(exc))
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@ import os
 from contextlib import contextmanager
 from typing import Any
 
-import psycopg
-from psycopg.rows import dict_row
+# psycopg is imported inside the helpers so importing the API (and its
+# tooling) does not pay for the driver until the first query.
 
 
 def _dsn() -> str:
@@ -14,6 +14,8 @@ def _dsn() -> str:
 @contextmanager
 def get_conn():
     """Yield a new psycopg connection."""
+    import psycopg
+
     conn = psycopg.connect(_dsn())
     try:
         yield conn
@@ -23,6 +25,8 @@ def get_conn():
 
 def fetch_one(sql: str, params: tuple | list = ()):  # type: ignore
     """Fetch a single row as a dict."""
+    from psycopg.rows import dict_row
+
     with get_conn() as conn:
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
@@ -31,7 +35,39 @@ def fetch_one(sql: str, params: tuple | list = ()):  # type: ignore
 
 def fetch_all(sql: str, params: tuple | list = ()):  # type: ignore
     """Fetch all rows as a list of dicts."""
+    from psycopg.rows import dict_row
+
     with get_conn() as conn:
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
             return cur.fetchall()
+
+
+def execute(sql: str, params: tuple | list = ()):  # type: ignore
+    """Run a write statement, commit, and return any ``RETURNING`` rows as dicts."""
+    from psycopg.rows import dict_row
+
+    with get_conn() as conn:
+        with conn.cursor(row_factory=dict_row) as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall() if cur.description else []
+        conn.commit()
+        return rows
+
+
+def stream_rows(sql: str, params: tuple | list = (), batch_size: int = 10_000):  # type: ignore
+    """Yield lists of tuple rows from a server-side (named) cursor.
+
+    Large result sets are fetched ``batch_size`` rows at a time instead of
+    being materialised in memory.  The connection stays open until the
+    generator is exhausted or closed.
+    """
+    with get_conn() as conn:
+        with conn.cursor(name="stream_rows") as cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
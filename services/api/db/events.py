@@ -3,8 +3,6 @@ from datetime import datetime
 from typing import Any
 from uuid import UUID
 
-from psycopg.rows import dict_row
-
 from . import get_conn
 
 
@@ -38,6 +36,8 @@ def upsert_event(
     if lon is not None and lat is not None:
         params.extend([lon, lat])
     params.extend([json.dumps(entities or []), source, json.dumps(raw or {})])
+    from psycopg.rows import dict_row
+
     with get_conn() as conn:
         with conn.cursor(row_factory=dict_row) as cur:
             cur.execute(sql, params)
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.admission import ConcurrencyLimiter, Overloaded, TokenBucket, admission
+
+
+def test_limiter_queues_then_sheds():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=1, queue_timeout=0.5)
+        await limiter.acquire()
+        queued = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        # Queue is full: the next caller is rejected without waiting.
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+        await limiter.release()
+        await queued
+        assert limiter.active == 1
+        await limiter.release()
+
+    asyncio.run(run())
+
+
+def test_limiter_queue_timeout():
+    async def run():
+        limiter = ConcurrencyLimiter(limit=1, max_queue=5, queue_timeout=0.05)
+        await limiter.acquire()
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+        assert limiter.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_local_token_bucket():
+    bucket = TokenBucket(rate=1.0, burst=2)
+    assert asyncio.run(bucket.take("u")) == (True, 0.0)
+    assert asyncio.run(bucket.take("u"))[0] is True
+    allowed, wait = asyncio.run(bucket.take("u"))
+    assert allowed is False and 0 < wait <= 1.0
+    # Buckets are per user.
+    assert asyncio.run(bucket.take("other"))[0] is True
+
+
+def test_unreachable_redis_falls_back_to_local_bucket():
+    bucket = TokenBucket(rate=1.0, burst=1, redis_url="redis://127.0.0.1:1/0")
+    assert asyncio.run(bucket.take("u"))[0] is True
+    assert asyncio.run(bucket.take("u"))[0] is False
+
+
+def test_dependency_returns_429_with_retry_after():
+    app = FastAPI()
+    guard = admission("/x", ConcurrencyLimiter(4, 4, 1.0), TokenBucket(rate=0.1, burst=1))
+
+    @app.get("/x", dependencies=[Depends(guard)])
+    def x():
+        return {"ok": True}
+
+    @app.get("/cheap")
+    def cheap():
+        return {"ok": True}
+
+    client = TestClient(app)
+    assert client.get("/x").status_code == 200
+    r = client.get("/x")
+    assert r.status_code == 429
+    assert int(r.headers["retry-after"]) >= 1
+    assert client.get("/cheap").status_code == 200
+
+
+def test_search_only_guarded_with_text_query(client, mock_fetch_all):
+    import app.main as m
+
+    guard = admission("/search", m._limiter(), TokenBucket(rate=0.01, burst=0), when=lambda r: bool(r.query_params.get("q")))
+    m.app.dependency_overrides[m.admit_search] = guard
+    try:
+        assert client.get("/search").status_code == 200
+        assert client.get("/search?q=fire").status_code == 429
+    finally:
+        m.app.dependency_overrides.clear()
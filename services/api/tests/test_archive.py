@@ -0,0 +1,250 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+import app.main as m
+from app import archive, export
+
+UTC = timezone.utc
+
+
+def _write_month(root, year, month, rows, clustered=True):
+    """Write one month the way ``ingest.archive`` lays it out.
+
+    ``rows`` are ``(id, title, event_type, detected_at[, cluster_id])``;
+    ``clustered=False`` writes the layout from before ``cluster_id`` existed.
+    """
+
+    ts = pa.timestamp("us", tz="UTC")
+    sch = pa.schema(
+        [
+            ("id", pa.int64()),
+            ("source_id", pa.int32()),
+            ("source", pa.string()),
+            ("title", pa.string()),
+            ("body", pa.string()),
+            ("event_type", pa.string()),
+            ("occurred_at", ts),
+            ("detected_at", ts),
+            ("jurisdiction", pa.string()),
+            ("confidence", pa.float32()),
+            ("severity", pa.float32()),
+            ("lon", pa.float64()),
+            ("lat", pa.float64()),
+            ("cluster_id", pa.int64()),
+            ("raw", pa.string()),
+        ]
+    )
+    if not clustered:
+        sch = sch.remove(sch.get_field_index("cluster_id"))
+    path = root / "events" / f"year={year:04d}" / f"month={month:02d}"
+    path.mkdir(parents=True)
+    table = pa.Table.from_pylist(
+        [
+            {
+                "id": eid,
+                "source_id": 1,
+                "source": "BOM",
+                "title": title,
+                "body": None,
+                "event_type": etype,
+                "detected_at": at,
+                "lon": 153.0,
+                "lat": -27.4,
+                "cluster_id": cluster[0] if cluster else None,
+            }
+            for eid, title, etype, at, *cluster in rows
+        ],
+        schema=sch,
+    )
+    pq.write_table(table, path / f"events_p{year:04d}{month:02d}.parquet")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_tier():
+    m.archive_tier.clear()
+    yield
+    m.archive_tier.clear()
+
+
+@pytest.fixture
+def cold(tmp_path, monkeypatch):
+    _write_month(
+        tmp_path,
+        2023,
+        11,
+        [
+            (1, "Old storm", "Weather", datetime(2023, 11, 2, tzinfo=UTC)),
+            (2, "Old fire", "Wildfire", datetime(2023, 11, 20, tzinfo=UTC)),
+        ],
+    )
+    _write_month(tmp_path, 2023, 12, [(3, "Storm again", "Weather", datetime(2023, 12, 5, tzinfo=UTC))])
+    monkeypatch.setattr(m._settings, "archive_enabled", True)
+    monkeypatch.setattr(m._settings, "archive_uri", str(tmp_path))
+    # Oldest partition still in Postgres holds January 2024.
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): {"name": "events_p202401"})
+    return tmp_path
+
+
+def test_expression_prunes_to_matching_months(cold):
+    dset = archive.dataset(str(cold))
+    flt = m.filters.parse(time_range="2023-12-01T00:00:00Z..", event_type="Weather")
+    floor = archive.floor_from("events_p202401")
+    frags = list(dset.get_fragments(filter=archive.expression(flt, floor)))
+    assert [f.path.rsplit("/", 1)[-1] for f in frags] == ["events_p202312.parquet"]
+
+
+def test_events_merge_hot_and_cold_tiers(client, cold, monkeypatch):
+    hot = {
+        "id": 10, "source_id": 1, "title": "New storm", "body": None, "event_type": "Weather",
+        "occurred_at": None, "detected_at": datetime(2024, 1, 3, tzinfo=UTC), "jurisdiction": None,
+        "confidence": None, "severity": None, "lon": None, "lat": None,
+    }
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [dict(hot)])
+    r = client.get("/events", params={"since": "2023-01-01T00:00:00Z", "type": "Weather", "limit": 2})
+    assert r.status_code == 200
+    assert [e["id"] for e in r.json()] == [10, 3]
+    assert r.json()[1]["geom"] == {"type": "Point", "coordinates": [153.0, -27.4]}
+    assert "X-Next-Cursor" in r.headers
+
+
+def test_fetch_events_stops_at_older_months(cold, monkeypatch):
+    read = []
+
+    class Fragment:
+        def __init__(self, fragment):
+            self.fragment, self.path = fragment, fragment.path
+
+        def to_batches(self, **kw):
+            read.append(self.path.rsplit("/", 1)[-1])
+            return self.fragment.to_batches(**kw)
+
+    months = archive._months
+    monkeypatch.setattr(
+        archive, "_months", lambda *a: [(k, [Fragment(f) for f in frags]) for k, frags in months(*a)]
+    )
+    dset = archive.dataset(str(cold))
+    flt = m.filters.parse(since=datetime(2023, 1, 1, tzinfo=UTC))
+    floor = archive.floor_from("events_p202401")
+    assert [r["id"] for r in archive.fetch_events(dset, flt, floor, 1)] == [3]
+    assert read == ["events_p202312.parquet"]
+    assert [r["id"] for r in archive.fetch_events(dset, flt, floor, 2)] == [3, 2]
+
+
+def test_floor_lookup_is_cached(client, cold, monkeypatch):
+    calls = []
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): calls.append(sql) or {"name": "events_p202401"})
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [])
+    for _ in range(2):
+        assert client.get("/events", params={"since": "2023-01-01T00:00:00Z"}).status_code == 200
+    assert len(calls) == 1
+
+
+def test_events_without_start_skip_archive(client, cold, mock_fetch_all, monkeypatch):
+    monkeypatch.setattr(m, "fetch_one", lambda *a: pytest.fail("floor looked up"))
+    assert client.get("/events").json() == []
+
+
+def test_export_reads_archive_first(cold, monkeypatch):
+    flt = m.filters.parse(since=datetime(2023, 1, 1, tzinfo=UTC))
+    dset, floor = m._archive_for(flt)
+    batches = list(archive.export_rows(dset, flt, floor, export.COLUMNS, 1000))
+    rows = [row for batch in batches for row in batch]
+    assert [row[0] for row in rows] == [1, 2, 3]
+    assert rows[0][2] == "BOM" and len(rows[0]) == len(export.COLUMNS)
+
+
+def test_collapse_hides_archived_cluster_members(client, tmp_path, monkeypatch):
+    # The older month predates cluster_id; the newer one holds a cluster of 4 and 5.
+    _write_month(tmp_path, 2023, 11, [(1, "Old storm", "Weather", datetime(2023, 11, 2, tzinfo=UTC))], clustered=False)
+    _write_month(
+        tmp_path,
+        2023,
+        12,
+        [
+            (4, "Storm", "Weather", datetime(2023, 12, 5, tzinfo=UTC), 4),
+            (5, "Storm (update)", "Weather", datetime(2023, 12, 6, tzinfo=UTC), 4),
+        ],
+    )
+    monkeypatch.setattr(m._settings, "archive_enabled", True)
+    monkeypatch.setattr(m._settings, "archive_uri", str(tmp_path))
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): {"name": "events_p202401"})
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [])
+    params = {"since": "2023-01-01T00:00:00Z"}
+    assert [e["id"] for e in client.get("/events", params=params).json()] == [5, 4, 1]
+    collapsed = client.get("/events", params={**params, "collapse": 1}).json()
+    assert [(e["id"], e.get("cluster_id")) for e in collapsed] == [(4, 4), (1, None)]
+
+
+PRE_FLOOR = "2023-01-01T00:00:00Z.."
+
+
+def _hot(**extra):
+    row = {
+        "id": 10, "source_id": 1, "source_name": "BOM", "title": "New storm", "body": None,
+        "event_type": "Weather", "occurred_at": None, "detected_at": datetime(2024, 1, 3, tzinfo=UTC),
+        "jurisdiction": None, "confidence": None, "severity": None, "lon": 151.2, "lat": -33.9,
+    }
+    row.update(extra)
+    return row
+
+
+def test_search_pages_across_tiers(client, cold, monkeypatch):
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [_hot()])
+    r = client.get("/search", params={"time_range": PRE_FLOOR, "limit": 2, "offset": 1, "debug": 1})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [e["id"] for e in results] == [3, 2]
+    assert results[0]["source_name"] == "BOM" and results[0]["geom_wkt"] == "POINT(153 -27.4)"
+
+
+def test_geojson_includes_archived_features(client, cold, monkeypatch):
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [_hot()])
+    body = client.get("/events/geojson", params={"time_range": PRE_FLOOR, "limit": 3}).json()
+    assert [f["properties"]["id"] for f in body["features"]] == [10, 3, 2]
+    assert body["features"][1]["geometry"]["coordinates"] == [153.0, -27.4]
+    assert body["features"][1]["properties"]["source_name"] == "BOM"
+
+
+def test_stats_summary_counts_archived_rows(client, cold, monkeypatch):
+    def fake(sql, params=()):
+        if "GROUP BY e.event_type" in sql:
+            return [{"event_type": "Weather", "c": 1}]
+        if "GROUP BY s.name" in sql:
+            return [{"source_name": "BOM", "c": 1}]
+        return [{"c": 1}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    body = client.get("/stats/summary", params={"time_range": PRE_FLOOR}).json()
+    assert body["total"] == 4
+    assert body["counts_by_type"] == [{"event_type": "Weather", "c": 3}, {"event_type": "Wildfire", "c": 1}]
+    assert body["counts_by_source"] == [{"source_name": "BOM", "c": 4}]
+
+    approx = {
+        "total": 10,
+        "counts_by_type": [{"event_type": "Weather", "c": 10, "ci95": [8, 12]}],
+        "counts_by_source": [],
+        "approx": {"method": "sample", "total_ci95": [8, 12]},
+    }
+    m._add_archived_counts(approx, {"total": 2, "by_type": {"Weather": 1, "Wildfire": 1}, "by_source": {"BOM": 2}})
+    assert approx["approx"]["total_ci95"] == [10, 14]
+    assert approx["counts_by_type"][1] == {"event_type": "Wildfire", "c": 1, "ci95": [1, 1]}
+    assert approx["counts_by_source"] == [{"source_name": "BOM", "c": 2, "ci95": [2, 2]}]
+
+
+def test_entity_timeline_fills_archived_events(client, cold, monkeypatch):
+    links = [
+        {"id": 10, "detected_at": datetime(2024, 1, 3, tzinfo=UTC), "event_type": "Weather", "relations": ["mention"],
+         "source_id": 1, "title": "New storm", "occurred_at": None, "jurisdiction": None, "confidence": None,
+         "severity": None, "archived": False},
+        {"id": 2, "detected_at": datetime(2023, 11, 20, tzinfo=UTC), "event_type": "Wildfire", "relations": ["mention"],
+         "source_id": None, "title": None, "occurred_at": None, "jurisdiction": None, "confidence": None,
+         "severity": None, "archived": True},
+    ]
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [dict(r) for r in links])
+    events = client.get("/entities/7/events", params={"time_range": PRE_FLOOR}).json()["events"]
+    assert [(e["id"], e["title"], e["archived"]) for e in events] == [(10, "New storm", False), (2, "Old fire", True)]
+    assert events[1]["source_id"] == 1
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+import time
+
+from app.coalesce import SingleFlight, make_key
+from app.metrics import COALESCED_COUNTER
+
+
+def test_make_key_is_order_and_none_insensitive():
+    assert make_key("/x", a=1, b="2") == make_key("/x", b="2", a=1, c=None)
+    assert make_key("/x", a=1) != make_key("/y", a=1)
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+    lock = threading.Lock()
+
+    def slow(value):
+        with lock:
+            calls.append(value)
+        time.sleep(0.05)
+        return {"value": value}
+
+    before = COALESCED_COUNTER.labels("/test")._value.get()
+
+    async def run():
+        same = [flight.do("k1", slow, 1, route="/test") for _ in range(10)]
+        other = flight.do("k2", slow, 2, route="/test")
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(run())
+    assert results[:10] == [{"value": 1}] * 10
+    assert results[10] == {"value": 2}
+    assert sorted(calls) == [1, 2]
+    assert COALESCED_COUNTER.labels("/test")._value.get() - before == 9
+    # Nothing is cached once the flight has landed.
+    assert asyncio.run(flight.do("k1", slow, 3, route="/test")) == {"value": 3}
+
+
+def test_errors_propagate_to_all_waiters():
+    flight = SingleFlight()
+
+    def boom():
+        time.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def run():
+        return await asyncio.gather(*[flight.do("k", boom) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_stats_summary_runs_through_coalescer(client, monkeypatch):
+    import app.main as m
+
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [{"c": 0}])
+    r = client.get("/stats/summary", params={"source_id": 1})
+    assert r.status_code == 200
+    assert r.json()["total"] == 0
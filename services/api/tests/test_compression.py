@@ -0,0 +1,104 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.compression import CompressionMiddleware, available_encodings, negotiate
+
+
+def _app(**kwargs):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, **kwargs)
+
+    @app.get("/big")
+    def big():
+        return PlainTextResponse("x" * 5000)
+
+    @app.get("/small")
+    def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/stream")
+    def stream():
+        def gen():
+            for i in range(5):
+                yield ("chunk-%d " % i).encode() * 200
+
+        return StreamingResponse(gen(), media_type="text/plain")
+
+    return app
+
+
+def test_negotiate_honours_quality_and_preference():
+    supported = ("zstd", "br", "gzip")
+    assert negotiate("gzip, br, zstd", supported) == "zstd"
+    assert negotiate("gzip;q=1.0, br;q=0.5", supported) == "gzip"
+    assert negotiate("zstd;q=0, gzip", supported) == "gzip"
+    assert negotiate("*", ("gzip",)) == "gzip"
+    assert negotiate("identity", supported) is None
+    assert negotiate("", supported) is None
+
+
+def test_gzip_above_threshold_only():
+    client = TestClient(_app(minimum_size=1000, encodings=("gzip",)))
+    r = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in r.headers["vary"]
+    assert r.text == "x" * 5000
+
+    r = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in r.headers
+    assert r.text == "tiny"
+
+
+def test_streaming_response_is_compressed_incrementally():
+    client = TestClient(_app(minimum_size=10, encodings=("gzip",)))
+    r = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert r.headers["content-encoding"] == "gzip"
+    assert "content-length" not in r.headers
+    assert r.text.startswith("chunk-0 ")
+    assert r.text.endswith("chunk-4 ")
+
+
+def test_compressed_bodies_are_cached():
+    app = _app(minimum_size=10, encodings=("gzip",))
+    client = TestClient(app)
+    client.get("/big", headers={"Accept-Encoding": "gzip"})
+    client.get("/big", headers={"Accept-Encoding": "gzip"})
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    assert len(middleware.cache) == 1
+
+
+@pytest.mark.parametrize("encoding", ["zstd", "br"])
+def test_optional_codecs_round_trip(encoding):
+    if encoding not in available_encodings():
+        pytest.skip(f"{encoding} codec not installed")
+    from app.compression import _StreamCompressor
+
+    comp = _StreamCompressor(encoding)
+    data = comp.compress(b"hello ") + comp.compress(b"world") + comp.finish()
+    if encoding == "zstd":
+        import zstandard
+
+        out = zstandard.ZstdDecompressor().decompressobj().decompress(data)
+    else:
+        import brotli
+
+        out = brotli.decompress(data)
+    assert out == b"hello world"
+
+    client = TestClient(_app(minimum_size=10))
+    r = client.get("/big", headers={"Accept-Encoding": encoding})
+    assert r.headers["content-encoding"] == encoding
+
+
+def test_gzip_stream_decodes_with_stdlib():
+    from app.compression import _StreamCompressor
+
+    comp = _StreamCompressor("gzip")
+    data = comp.compress(b"hello ") + comp.compress(b"world") + comp.finish()
+    assert gzip.decompress(data) == b"hello world"
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+
+import app.main as m
+
+
+def _fake(monkeypatch, rows, entity=True):
+    calls = []
+
+    def fetch_all(sql, params=()):
+        calls.append((sql, list(params)))
+        if "count(DISTINCT" in sql:
+            return [{"event_type": "Maritime", "c": 7}]
+        return rows
+
+    monkeypatch.setattr(m, "fetch_all", fetch_all)
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): {"id": 5} if entity else None)
+    return calls
+
+
+def _row(event_id, day):
+    return {
+        "id": event_id,
+        "detected_at": datetime(2024, 3, day, tzinfo=timezone.utc),
+        "event_type": "Maritime",
+        "relations": ["mentions"],
+        "title": f"Sighting {event_id}",
+        "archived": False,
+    }
+
+
+def test_timeline_pages_with_keyset_cursor(client, monkeypatch):
+    calls = _fake(monkeypatch, [_row(9, 3), _row(8, 2)])
+    r = client.get("/entities/5/events", params={"limit": 2, "type": "Maritime", "since": "2024-01-01T00:00:00Z"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [e["id"] for e in body["events"]] == [9, 8]
+    assert body["next_cursor"] == r.headers["X-Next-Cursor"]
+    assert "counts_by_type" not in body
+    sql, params = calls[0]
+    assert "FROM event_entities ee" in sql and "ee.detected_at >= %s" in sql
+    assert "e.detected_at = ee.detected_at" in sql
+    assert params[:2] == [5, "Maritime"] and params[-1] == 2
+
+    calls = _fake(monkeypatch, [_row(7, 1)])
+    r = client.get("/entities/5/events", params={"limit": 2, "cursor": body["next_cursor"], "counts": 1})
+    body = r.json()
+    assert body["next_cursor"] is None
+    assert body["counts_by_type"] == [{"event_type": "Maritime", "c": 7}]
+    page_sql, page_params = calls[0]
+    assert "(ee.detected_at, ee.event_id) < (%s, %s)" in page_sql
+    assert page_params[2] == 8
+    # Counts cover the whole window, not just the page.
+    count_sql, count_params = calls[1]
+    assert "ee.event_id) <" not in count_sql and count_params == [5]
+
+
+def test_timeline_unknown_entity(client, monkeypatch):
+    _fake(monkeypatch, [], entity=False)
+    assert client.get("/entities/404/events").status_code == 404
@@ -0,0 +1,101 @@
+import math
+
+from app import estimates
+
+
+def _fake_fetch(responses, calls):
+    def _fetch(sql, params=()):
+        calls.append((sql, list(params)))
+        for marker, rows in responses.items():
+            if marker in sql:
+                return rows
+        return []
+
+    return _fetch
+
+
+def test_from_blocks_horvitz_thompson():
+    rows = [
+        {"rel": 1, "blk": 0, "event_type": "Weather", "source_name": "BOM", "y": 3},
+        {"rel": 1, "blk": 0, "event_type": "Wildfire", "source_name": "BOM", "y": 1},
+        {"rel": 2, "blk": 7, "event_type": "Weather", "source_name": None, "y": 2},
+    ]
+    out = estimates.from_blocks(rows, 10.0)
+    assert out["total"] == 60
+    # Blocks hold 4 and 2 matching rows: var = 0.9 / 0.01 * (16 + 4).
+    half = 1.96 * math.sqrt(0.9 / 0.01 * 20)
+    # The lower bound never drops below the six rows actually sampled.
+    assert out["approx"]["total_ci95"] == [max(round(60 - half), 6), round(60 + half)]
+    assert out["approx"]["matched_blocks"] == 2
+    assert out["counts_by_type"][0] == {"event_type": "Weather", "c": 50, "ci95": out["counts_by_type"][0]["ci95"]}
+    assert {g["source_name"] for g in out["counts_by_source"]} == {"BOM", None}
+
+
+def test_full_sample_is_exact():
+    rows = [{"rel": 1, "blk": 0, "event_type": "Weather", "source_name": "BOM", "y": 5}]
+    out = estimates.from_blocks(rows, 100.0)
+    assert out["total"] == 5 and out["approx"]["total_ci95"] == [5, 5]
+    assert out["approx"]["method"] == "exact"
+
+
+def test_planner_combines_partition_statistics():
+    calls = []
+    fetch = _fake_fetch(
+        {
+            "FROM pg_class": [
+                {"relname": "events_p202409", "reltuples": 100.0, "relpages": 10},
+                {"relname": "events_p202410", "reltuples": 300.0, "relpages": 30},
+                {"relname": "events_default", "reltuples": -1.0, "relpages": 0},
+            ],
+            "FROM pg_stats": [
+                {"tablename": "events_p202409", "attname": "event_type", "null_frac": 0.0,
+                 "vals": "{Weather,Wildfire}", "freqs": [0.5, 0.5]},
+                {"tablename": "events_p202410", "attname": "event_type", "null_frac": 0.0,
+                 "vals": "{Weather}", "freqs": [1.0]},
+                {"tablename": "events_p202410", "attname": "source_id", "null_frac": 0.1,
+                 "vals": "{1,2}", "freqs": [0.6, 0.3]},
+            ],
+            "FROM sources": [{"id": 1, "name": "BOM"}, {"id": 2, "name": "QFES"}],
+            "pg_stat_user_tables": [{"as_of": None}],
+        },
+        calls,
+    )
+    out = estimates.planner(fetch)
+    assert out["total"] == 400
+    assert out["counts_by_type"] == [{"event_type": "Weather", "c": 350}, {"event_type": "Wildfire", "c": 50}]
+    assert out["counts_by_source"] == [
+        {"source_name": "BOM", "c": 180},
+        {"source_name": "QFES", "c": 90},
+        {"source_name": None, "c": 30},
+    ]
+    assert out["approx"]["method"] == "planner"
+
+
+def test_planner_without_statistics_returns_none():
+    fetch = _fake_fetch({"FROM pg_class": [{"relname": "events", "reltuples": -1.0, "relpages": 0}]}, [])
+    assert estimates.planner(fetch) is None
+
+
+def test_approx_summary_with_filter_samples(client, monkeypatch):
+    import app.main as m
+
+    calls = []
+    fetch = _fake_fetch(
+        {
+            "FROM pg_class": [{"relname": "events_p202410", "reltuples": 1e6, "relpages": 20_000}],
+            "TABLESAMPLE": [{"rel": 1, "blk": 3, "event_type": "Weather", "source_name": "BOM", "y": 2}],
+        },
+        calls,
+    )
+    monkeypatch.setattr(m, "fetch_all", fetch)
+    r = client.get("/stats/summary", params={"source_id": 4, "approx": 1})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["approx"]["method"] == "sample"
+    assert body["approx"]["sample_percent"] == 10.0
+    assert body["total"] == 20
+    sql, params = calls[-1]
+    assert "TABLESAMPLE SYSTEM" in sql and "e.source_id = %s" in sql
+    assert params == [10.0, 4]
+    # Exact counts are still the default.
+    assert not any("TABLESAMPLE" in sql for sql, _ in calls[:-1])
@@ -0,0 +1,60 @@
+from datetime import datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import app.main as m
+
+
+def _rows():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        (1, 1, "BOM", "Storm", None, "Weather", None, ts, "QLD", 0.5, 0.2, 153.0, -27.4),
+        (2, 2, "QFES", "Fire", "body", "Wildfire", ts, ts, None, None, None, None, None),
+        (3, 1, "BOM", "Flood", None, "Weather", None, ts, "NSW", 0.9, 0.8, 151.2, -33.8),
+    ]
+
+
+@pytest.fixture
+def fake_stream(monkeypatch):
+    calls = {}
+
+    def _fake(sql, params=(), batch_size=10_000):
+        calls["sql"] = sql
+        calls["params"] = list(params)
+        rows = _rows()
+        yield rows[:2]
+        yield rows[2:]
+
+    monkeypatch.setattr(m, "stream_rows", _fake)
+    return calls
+
+
+def test_export_arrow_typed_columns(client, fake_stream):
+    r = client.get("/events/export", params={"format": "arrow", "type": "Weather", "since": "2023-12-01T00:00:00"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.num_rows == 3
+    assert pa.types.is_dictionary(table.schema.field("event_type").type)
+    assert pa.types.is_dictionary(table.schema.field("source").type)
+    assert pa.types.is_timestamp(table.schema.field("detected_at").type)
+    assert table.schema.field("lon").type == pa.float64()
+    assert table.column("lon").to_pylist() == [153.0, None, 151.2]
+    assert "e.event_type = %s" in fake_stream["sql"]
+    assert fake_stream["params"][0] == "Weather"
+
+
+def test_export_parquet(client, fake_stream):
+    import pyarrow.parquet as pq
+
+    r = client.get("/events/export", params={"format": "parquet"})
+    assert r.status_code == 200
+    table = pq.read_table(pa.BufferReader(r.content))
+    assert table.num_rows == 3
+    assert table.column("title").to_pylist() == ["Storm", "Fire", "Flood"]
+
+
+def test_export_rejects_unknown_format(client, fake_stream):
+    assert client.get("/events/export", params={"format": "csv"}).status_code == 422
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+from app import filters
+
+
+def test_same_filter_spelled_differently_shares_key_and_sql():
+    a = filters.parse(q=" Fire", bbox="149,-28,152,-25", time_range="2024-01-01T00:00:00Z..", source_id=3)
+    b = filters.parse(
+        q="fire",
+        bbox="149.0,-28.0,152.0,-25.0",
+        since=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        source_id=3,
+    )
+    assert a == b
+    assert a.cache_key == b.cache_key
+    assert a.compile() == b.compile()
+
+
+def test_canonical_clause_order_and_columns():
+    flt = filters.parse(
+        q="fire",
+        bbox="1,2,3,4",
+        event_type="Wildfire",
+        source_id=7,
+        time_range="2024-01-01..2024-02-01",
+        before=(datetime(2024, 1, 15), 99),
+    )
+    where, params = flt.compile()
+    assert where == (
+        " WHERE e.event_type = %s AND e.source_id = %s AND e.detected_at >= %s AND e.detected_at <= %s"
+        " AND e.geom IS NOT NULL AND ST_Intersects(e.geom, geography(ST_MakeEnvelope(%s,%s,%s,%s,4326)))"
+        " AND (e.title ILIKE %s OR e.body ILIKE %s) AND (e.detected_at, e.id) < (%s, %s)"
+    )
+    assert params == [
+        "Wildfire",
+        7,
+        datetime(2024, 1, 1),
+        datetime(2024, 2, 1),
+        1.0,
+        2.0,
+        3.0,
+        4.0,
+        "%fire%",
+        "%fire%",
+        datetime(2024, 1, 15),
+        99,
+    ]
+    assert "occurred_at" not in where
+
+
+def test_empty_and_malformed_values_are_ignored():
+    flt = filters.parse(q="  ", bbox="1,2,3", time_range="not-a-date..", source_id=0)
+    assert flt == filters.EventFilter()
+    assert flt.compile() == ("", [])
+    assert flt.compile(require_geom=True) == (" WHERE e.geom IS NOT NULL", [])
+
+
+def test_fts_mode_and_postgis_fallback(monkeypatch):
+    where, params = filters.parse(q="fire").compile(text="fts")
+    assert "plainto_tsquery('simple', %s)" in where
+    assert params == ["fire"]
+
+    monkeypatch.setenv("USE_POSTGIS", "0")
+    where, params = filters.parse(bbox="1,2,3,4").compile()
+    assert "ST_X(e.geom::geometry) BETWEEN %s AND %s" in where
+    assert params == [1.0, 3.0, 2.0, 4.0]
+
+
+def test_endpoints_share_filter_sql(client, monkeypatch):
+    import app.main as m
+
+    seen = []
+
+    def fake(sql, params=()):
+        seen.append(sql)
+        return [{"c": 0}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    query = {"q": "fire", "time_range": "2024-01-01..", "source_id": 2}
+    client.get("/search", params=query)
+    client.get("/stats/summary", params=query)
+    client.get("/events/geojson", params=query)
+    text = "(e.title ILIKE %s OR e.body ILIKE %s)"
+    expected = f" WHERE e.source_id = %s AND e.detected_at >= %s AND {text}"
+    located = f" WHERE e.source_id = %s AND e.detected_at >= %s AND e.geom IS NOT NULL AND {text}"
+    assert len(seen) == 5
+    assert all(expected in sql for sql in seen[:4])  # /search + three summary queries
+    assert located in seen[4]
+
+
+def test_collapse_keeps_cluster_representatives(client, monkeypatch):
+    import app.main as m
+
+    flt = filters.parse(q="fire", collapse=True)
+    where, params = flt.compile()
+    assert where.endswith(" AND (e.cluster_id IS NULL OR e.cluster_id = e.id)")
+    assert params == ["%fire%", "%fire%"]
+    assert flt.cache_key == "q=fire&collapse=1"
+    assert filters.parse(q="fire").cache_key == "q=fire"
+
+    seen = []
+
+    def fake(sql, params=()):
+        seen.append(sql)
+        return [
+            {"id": 5, "source_id": 1, "title": "Flood", "event_type": "Weather",
+             "detected_at": datetime(2024, 1, 2, tzinfo=timezone.utc), "cluster_id": 5, "lon": None, "lat": None}
+        ]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    resp = client.get("/events", params={"collapse": 1})
+    assert resp.status_code == 200
+    assert resp.json()[0]["cluster_id"] == 5
+    client.get("/search", params={"collapse": 1})
+    client.get("/events/geojson", params={"collapse": 1})
+    assert len(seen) == 3
+    assert all("e.cluster_id IS NULL OR e.cluster_id = e.id" in sql for sql in seen)
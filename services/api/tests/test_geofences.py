@@ -0,0 +1,53 @@
+import json
+
+import app.main as m
+
+SQUARE = {"type": "Polygon", "coordinates": [[[153.1, -27.45], [153.25, -27.45], [153.25, -27.3], [153.1, -27.3], [153.1, -27.45]]]}
+
+
+def test_create_geofence_stores_valid_multipolygon(client, monkeypatch):
+    calls = []
+
+    def fake_execute(sql, params=()):
+        calls.append((sql, params))
+        return [{"id": 1, "owner": "anonymous", "name": "Port of Brisbane", "kind": "port", "geometry": SQUARE}]
+
+    monkeypatch.setattr(m, "execute", fake_execute)
+    resp = client.post("/geofences", json={"name": "Port of Brisbane", "kind": "port", "geometry": SQUARE})
+    assert resp.status_code == 201
+    assert resp.json()["id"] == 1
+    sql, params = calls[0]
+    assert "ST_Multi(ST_CollectionExtract(ST_MakeValid(" in sql
+    assert params[:3] == ("anonymous", "Port of Brisbane", "port")
+    assert json.loads(params[3]) == SQUARE
+
+
+def test_create_geofence_rejects_non_polygons(client):
+    point = {"type": "Point", "coordinates": [153.0, -27.5]}
+    assert client.post("/geofences", json={"name": "x", "geometry": point}).status_code == 422
+    assert client.post("/geofences", json={"name": "", "geometry": SQUARE}).status_code == 422
+
+
+def test_delete_geofence_checks_owner(client, monkeypatch):
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): [])
+    assert client.delete("/geofences/5").status_code == 404
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): [{"id": 5}])
+    assert client.delete("/geofences/5").json() == {"status": "deleted", "id": 5}
+
+
+def test_alerts_poll_after_last_id(client, monkeypatch):
+    calls = []
+
+    def fake(sql, params=()):
+        calls.append((sql, list(params)))
+        return [{"id": 41, "geofence_id": 2, "event_id": 9}, {"id": 42, "geofence_id": 2, "event_id": 10}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    body = client.get("/geofences/alerts", params={"after_id": 40, "geofence_id": 2}).json()
+    assert body["last_id"] == 42 and len(body["alerts"]) == 2
+    sql, params = calls[0]
+    assert "a.id > %s AND g.id = %s" in sql
+    assert params == ["anonymous", 40, 2, 100]
+
+    monkeypatch.setattr(m, "fetch_all", lambda sql, params=(): [])
+    assert client.get("/geofences/alerts", params={"after_id": 42}).json() == {"alerts": [], "last_id": 42}
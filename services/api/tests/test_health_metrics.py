@@ -1,59 +1,69 @@
-from contextlib import contextmanager
+import asyncio
+import time
 
 import app.main as main
+from app.health import HealthProber
 from fastapi.testclient import TestClient
 
 
-def _ok_conn():
-    @contextmanager
-    def _conn():
-        class Cur:
-            def execute(self, sql):
-                pass
+def _ok():
+    pass
 
-            def __enter__(self):
-                return self
 
-            def __exit__(self, exc_type, exc, tb):
-                pass
+def _down():
+    raise Exception("db down")
 
-        class Conn:
-            def cursor(self):
-                return Cur()
 
-            def close(self):
-                pass
-
-        yield Conn()
-
-    return _conn()
-
-
-class _RedisOK:
-    def ping(self):
-        return True
+def _use_checks(monkeypatch, **checks):
+    monkeypatch.setattr(main.prober, "checks", checks)
+    main.prober.reset()
+    return TestClient(main.app)
 
 
 def test_healthz_ok(monkeypatch):
-    monkeypatch.setattr(main, "get_conn", _ok_conn)
-    monkeypatch.setattr(main.redis, "Redis", lambda *a, **k: _RedisOK())
-    client = TestClient(main.app)
+    client = _use_checks(monkeypatch, postgres=_ok, redis=_ok, minio=_ok)
     r = client.get("/healthz")
     assert r.status_code == 200
-    assert r.json()["status"] == "ok"
+    body = r.json()
+    assert body["status"] == "ok"
+    assert body["ready"] is True
+    assert body["dependencies"]["postgres"]["status"] == "ok"
+    assert "latency_ms" in body["dependencies"]["redis"]
+    assert client.get("/readyz").status_code == 200
 
 
 def test_healthz_db_failure(monkeypatch):
-    @contextmanager
-    def _bad_conn():
-        raise Exception("db down")
-        yield  # pragma: no cover
-
-    monkeypatch.setattr(main, "get_conn", _bad_conn)
-    monkeypatch.setattr(main.redis, "Redis", lambda *a, **k: _RedisOK())
-    client = TestClient(main.app)
+    client = _use_checks(monkeypatch, postgres=_down, redis=_ok, minio=_ok)
     r = client.get("/healthz")
     assert r.status_code == 500
+    assert r.json()["dependencies"]["postgres"]["error"] == "db down"
+    assert client.get("/readyz").status_code == 503
+
+
+def test_healthz_serves_cached_state(monkeypatch):
+    calls = []
+    client = _use_checks(monkeypatch, postgres=lambda: calls.append(1), redis=_ok, minio=_ok)
+    for _ in range(5):
+        assert client.get("/healthz").status_code == 200
+    assert len(calls) == 1
+
+
+def test_non_critical_failure_is_degraded(monkeypatch):
+    client = _use_checks(monkeypatch, postgres=_ok, redis=_ok, minio=_down)
+    r = client.get("/healthz")
+    assert r.status_code == 200
+    assert r.json()["status"] == "degraded"
+    assert client.get("/readyz").status_code == 200
+
+
+def test_prober_reports_staleness_and_timeouts():
+    prober = HealthProber({"slow": lambda: time.sleep(0.5)}, critical=["slow"], timeout=0.05, stale_after=60)
+    asyncio.run(prober.probe())
+    state = prober.snapshot()
+    assert state["dependencies"]["slow"]["error"].startswith("timed out")
+    assert state["ready"] is False
+    prober._probed_at -= 120
+    assert prober.snapshot()["stale"] is True
 
 
 def test_metrics_endpoint(client):
@@ -63,3 +73,25 @@ def test_metrics_endpoint(client):
     assert "request_total" in body
     assert "error_total" in body
 
+
+def _label_sets(metric, sample_name):
+    # Read the collector itself: other suites in the same process may clear
+    # the global registry that /metrics renders.
+    return [s.labels for family in metric.collect() for s in family.samples if s.name == sample_name]
+
+
+def test_metrics_labelled_by_route_template(client, mock_fetch_one):
+    from app import metrics
+
+    mock_fetch_one["result"] = {"id": 987654, "title": "Sample"}
+    assert client.get("/events/987654").status_code == 200
+    assert client.get("/no-such-path").status_code == 404
+
+    route = {"method": "GET", "route": "/events/{event_id}", "status_class": "2xx"}
+    latency = _label_sets(metrics.REQUEST_LATENCY, "http_request_duration_seconds_count")
+    assert route in latency
+    assert route in _label_sets(metrics.RESPONSE_SIZE, "http_response_size_bytes_count")
+    assert any(labels["route"] == "<unmatched>" for labels in latency)
+    # Raw ids must never leak into label values.
+    assert not any("987654" in value for labels in latency for value in labels.values())
+    assert _label_sets(metrics.IN_FLIGHT, "http_requests_in_flight")
@@ -0,0 +1,28 @@
+def test_hexbins_aggregates_precomputed_cells(client, monkeypatch):
+    import app.main as m
+
+    calls = []
+
+    def fake(sql, params=()):
+        calls.append((sql, list(params)))
+        return [{"h3": "85be0e2bfffffff", "count": 12, "dominant_type": "Wildfire"}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    r = client.get("/events/hexbins", params={"res": 5, "type": "Wildfire", "time_range": "2024-01-01.."})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["res"] == 5
+    assert body["cells"][0]["dominant_type"] == "Wildfire"
+
+    sql, params = calls[0]
+    assert "e.h3_r5 IS NOT NULL" in sql
+    assert "GROUP BY e.h3_r5, e.event_type" in sql
+    # Only indexed columns are referenced, so the aggregate can be index-only.
+    assert "geom" not in sql and "title" not in sql
+    assert params[0] == "Wildfire"
+    assert params[-1] == 10_000
+
+
+def test_hexbins_rejects_unindexed_resolution(client):
+    r = client.get("/events/hexbins", params={"res": 9})
+    assert r.status_code == 422
@@ -0,0 +1,47 @@
+import app.main as m
+
+
+def _capture(monkeypatch, rows=()):
+    calls = []
+
+    def fake(sql, params=()):
+        calls.append((sql, list(params)))
+        return list(rows)
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    return calls
+
+
+def test_nearby_orders_by_knn_operator(client, monkeypatch):
+    rows = [{"id": 7, "title": "Flood", "lon": 153.02, "lat": -27.47, "distance_m": 812.5}]
+    calls = _capture(monkeypatch, rows)
+    resp = client.get("/events/nearby", params={"lon": 153.0, "lat": -27.5, "k": 5})
+    assert resp.status_code == 200
+    assert resp.json() == {"center": {"lon": 153.0, "lat": -27.5}, "k": 5, "within_km": None, "events": rows}
+    sql, params = calls[0]
+    assert "ORDER BY e.geom <-> ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography" in sql
+    assert "WHERE e.geom IS NOT NULL" in sql and "ST_DWithin" not in sql
+    assert params == [153.0, -27.5, 153.0, -27.5, 5]
+
+
+def test_nearby_radius_and_filters(client, monkeypatch):
+    calls = _capture(monkeypatch)
+    resp = client.get(
+        "/events/nearby",
+        params={"lon": 151.2, "lat": -33.9, "within_km": 25, "type": "Weather", "time_range": "2024-01-01.."},
+    )
+    assert resp.status_code == 200
+    sql, params = calls[0]
+    assert (
+        "WHERE e.event_type = %s AND e.detected_at >= %s AND e.geom IS NOT NULL"
+        " AND ST_DWithin(e.geom, ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, %s)"
+    ) in sql
+    assert params[:3] == [151.2, -33.9, "Weather"]
+    assert params[4:] == [151.2, -33.9, 25000.0, 151.2, -33.9, 20]
+
+
+def test_nearby_validates_coordinates(client, monkeypatch):
+    _capture(monkeypatch)
+    assert client.get("/events/nearby", params={"lon": 200, "lat": 0}).status_code == 422
+    assert client.get("/events/nearby", params={"lon": 0}).status_code == 422
+    assert client.get("/events/nearby", params={"lon": 0, "lat": 0, "within_km": 0}).status_code == 422
@@ -0,0 +1,44 @@
+from uuid import UUID, uuid4
+
+import app.main as m
+
+NB = "6f1c1a52-0a5e-4c43-9a53-8d8cbf3b8f0e"
+
+
+def test_bulk_items_one_statement_deduplicated(client, monkeypatch):
+    calls = []
+    refs = [str(uuid4()) for _ in range(3)]
+
+    def fake_execute(sql, params=()):
+        calls.append((sql, params))
+        # refs[1] was already pinned; the statement skips it.
+        return [{"id": str(i), "ref_id": r} for i, r in zip(params[2], params[4]) if str(r) != refs[1]]
+
+    monkeypatch.setattr(m, "execute", fake_execute)
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): calls.append((sql, params)))
+    items = [{"kind": "EVENT", "ref_id": r, "note": f"n{i}"} for i, r in enumerate(refs)]
+    items.append({"kind": "event", "ref_id": refs[0], "note": "duplicate"})
+    resp = client.post(f"/notebooks/{NB}/items/bulk", json={"items": items})
+    assert resp.status_code == 201
+    body = resp.json()
+    assert body["created"] == 2 and body["skipped"] == 2
+    assert len(calls) == 1
+    sql, params = calls[0]
+    assert "unnest(" in sql and "NOT EXISTS" in sql
+    assert params[0] == UUID(NB) and params[1] == "anonymous"
+    assert params[3] == ["event"] * 3
+    assert params[4] == [UUID(r) for r in refs]
+    assert params[5] == ["n0", "n1", "n2"]
+
+
+def test_bulk_items_validation_and_ownership(client, monkeypatch):
+    url = f"/notebooks/{NB}/items/bulk"
+    assert client.post(url, json={"items": []}).status_code == 422
+    assert client.post(url, json={"items": [{"kind": "place", "ref_id": str(uuid4())}]}).status_code == 422
+
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): [])
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): None)
+    assert client.post(url, json={"items": [{"kind": "event", "ref_id": str(uuid4())}]}).status_code == 404
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): {"ok": 1})
+    body = client.post(url, json={"items": [{"kind": "event", "ref_id": str(uuid4())}]}).json()
+    assert body == {"items": [], "created": 0, "skipped": 1}
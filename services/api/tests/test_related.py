@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import app.main as m
+from app import related, vectors
+
+AT = datetime(2024, 3, 1, tzinfo=timezone.utc)
+EMBEDDER = vectors.HashingEmbedder(128)
+
+
+def _rows(specs):
+    vecs = EMBEDDER.embed([s[1] for s in specs])
+    return [
+        {"id": event_id, "detected_at": AT + timedelta(hours=hours), "vector": vecs[i].tobytes(), "lon": lon, "lat": lat}
+        for i, (event_id, _, hours, lon, lat) in enumerate(specs)
+    ]
+
+
+POOL = _rows(
+    [
+        (1, "Flood warning for the Brisbane River", 0, 153.0, -27.5),
+        (2, "Flood warning for the Brisbane River catchment", 2, 153.1, -27.4),
+        (3, "Flood warning for the Brisbane River", 24 * 40, 153.0, -27.5),  # outside the window
+        (4, "Flood warning for the Brisbane River", 1, 115.9, -31.9),  # Perth
+        (5, "Critical VPN vulnerability exploited", 1, 153.0, -27.5),  # same place, unrelated text
+        (6, "Flood warning for the Brisbane River", 3, None, None),
+    ]
+)
+
+
+def test_top_k_blends_text_place_and_time():
+    block = related.Block.from_rows(POOL, EMBEDDER.dim)
+    idx, best = related.top_k(block[:1], block, k=4, window_hours=30 * 24, block=2)
+    ids = [int(block.ids[j]) for j, s in zip(idx[0], best[0]) if np.isfinite(s)]
+    # Nearby and close in time beats far away; unlocated scores no place bonus;
+    # out-of-window and unrelated text are excluded, as is the event itself.
+    assert ids == [2, 4, 6]
+    assert all(np.diff(best[0][: len(ids)]) <= 0)
+
+
+def test_merge_keeps_best_k_unique():
+    current = [(0.9, 10, AT), (0.5, 11, AT)]
+    assert related.merge(current, [(0.7, 12, AT), (0.95, 11, AT)], 2) == [(0.95, 11, AT), (0.9, 10, AT)]
+
+
+class FakeCursor:
+    def __init__(self, pending, pool, lists):
+        self.pending, self.pool, self.lists = pending, pool, lists
+        self.writes = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        if sql == related.PENDING_SQL:
+            self._result = self.pending
+        elif sql == related.POOL_SQL:
+            self._result = self.pool
+        else:
+            self._result = [r for r in self.lists if r["event_id"] in params[0]]
+
+    def executemany(self, sql, rows):
+        self.writes.extend(rows)
+
+    def fetchall(self):
+        return self._result
+
+
+def test_process_batch_lists_new_events_and_updates_neighbours():
+    existing = [
+        {"event_id": 1, "detected_at": POOL[0]["detected_at"], "related_ids": [5], "related_at": [AT], "scores": [0.01]},
+    ]
+    cur = FakeCursor([POOL[1]], POOL, existing)
+    assert related.process_batch(cur, EMBEDDER.model, EMBEDDER.dim, k=3, window_days=30) == 1
+    writes = {w[0]: w for w in cur.writes}
+    assert writes[2][2][0] == 1 and sorted(writes[2][2][1:]) == [4, 6]
+    assert writes[2][3][0] == POOL[0]["detected_at"]
+    # Event 1 already had a list, so the new neighbour is merged into it.
+    assert writes[1][2] == [2, 5]
+    assert 4 not in writes and 6 not in writes  # no list yet; listed when processed
+
+
+def test_related_endpoint_is_one_lookup(client, monkeypatch):
+    calls = []
+
+    def fake(sql, params=()):
+        calls.append((sql, params))
+        return [{"id": 2, "title": "Flood", "score": 0.93}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    resp = client.get("/events/1/related", params={"limit": 5})
+    assert resp.status_code == 200
+    assert resp.json() == {"event_id": 1, "related": [{"id": 2, "title": "Flood", "score": 0.93}]}
+    assert calls == [(related.RELATED_SQL, (1, 5))]
@@ -0,0 +1,51 @@
+import app.main as m
+
+
+def test_create_saved_search_normalises_criteria(client, monkeypatch):
+    calls = []
+
+    def fake_execute(sql, params=()):
+        calls.append((sql, params))
+        return [{"id": 3, "name": "Port floods"}]
+
+    monkeypatch.setattr(m, "execute", fake_execute)
+    resp = client.post(
+        "/saved-searches",
+        json={"name": "Port floods", "q": "  Flood ", "type": "Weather", "bbox": "153.1,-27.45,153.25,-27.3"},
+    )
+    assert resp.status_code == 201
+    assert calls[0][1] == ("anonymous", "Port floods", "flood", "Weather", None, 153.1, -27.45, 153.25, -27.3)
+
+
+def test_create_saved_search_rejects_empty_or_bad_bbox(client, monkeypatch):
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): [{"id": 1}])
+    assert client.post("/saved-searches", json={"name": "all", "q": "  "}).status_code == 422
+    assert client.post("/saved-searches", json={"name": "box", "bbox": "1,2,3"}).status_code == 422
+
+
+def test_hits_default_to_unread_and_mark_seen(client, monkeypatch):
+    reads, writes = [], []
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): {"id": 3, "seen_hit_id": 10})
+
+    def fake_fetch_all(sql, params=()):
+        reads.append(params)
+        return [{"id": 11, "event_id": 5}, {"id": 14, "event_id": 8}]
+
+    monkeypatch.setattr(m, "fetch_all", fake_fetch_all)
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): writes.append(params) or [])
+
+    body = client.get("/saved-searches/3/hits").json()
+    assert [h["event_id"] for h in body["hits"]] == [5, 8] and body["last_id"] == 14
+    assert reads[-1] == (3, 10, 100)
+    assert writes == []
+
+    client.get("/saved-searches/3/hits", params={"after_id": 0, "mark_seen": 1, "limit": 5})
+    assert reads[-1] == (3, 0, 5)
+    assert writes == [(14, 3, 14)]
+
+
+def test_hits_for_unknown_search(client, monkeypatch):
+    monkeypatch.setattr(m, "fetch_one", lambda sql, params=(): None)
+    assert client.get("/saved-searches/9/hits").status_code == 404
+    monkeypatch.setattr(m, "execute", lambda sql, params=(): [])
+    assert client.delete("/saved-searches/9").status_code == 404
@@ -0,0 +1,51 @@
+"""Cold-start guard: importing the API must stay cheap.
+
+The budget is deliberately generous (machines differ); it exists to catch a
+heavy dependency slipping back into the import path.  Override it with
+``API_IMPORT_BUDGET_MS`` on slow CI runners.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+# Optional or per-request dependencies that must not load on import.
+LAZY_MODULES = ("jose", "psycopg", "redis", "zstandard", "brotli", "pyarrow", "reportlab", "numpy")
+
+
+def _run(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=API_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_heavy_dependencies_are_lazy():
+    out = _run(
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    ).stdout.strip()
+    assert out == ""
+
+
+def test_import_time_budget():
+    budget_ms = float(os.getenv("API_IMPORT_BUDGET_MS", "3000"))
+    stderr = _run("import app.main", "-X", "importtime").stderr
+    line = next(l for l in stderr.splitlines() if l.rstrip().endswith("| app.main"))
+    cumulative_ms = int(line.split("|")[1]) / 1000
+    assert cumulative_ms < budget_ms, f"import app.main took {cumulative_ms:.0f} ms (budget {budget_ms:.0f} ms)"
+
+
+def test_settings_read_environment_at_instantiation(monkeypatch):
+    from app.config import Settings
+
+    monkeypatch.setenv("COMPRESSION_MIN_SIZE", "4096")
+    monkeypatch.setenv("COALESCE_REDIS", "true")
+    settings = Settings()
+    assert settings.compression_min_size == 4096
+    assert settings.coalesce_redis is True
@@ -0,0 +1,124 @@
+import time
+
+import app.main as m
+from app import suggest
+
+
+def _entities():
+    return [
+        {"id": 1, "type": "Vessel", "name": "Spirit of Tasmania", "n": 40},
+        {"id": 2, "type": "Org", "name": "Spirit Airlines", "n": 90},
+        {"id": 3, "type": "Org", "name": "SES Queensland", "n": 500},
+        {"id": 4, "type": "Vessel", "name": "Spiritus", "n": 1},
+    ]
+
+
+def _cache(rows, max_entries=100):
+    cache = suggest.SuggestCache(lambda n: rows[:n], max_entries=max_entries)
+    cache.refresh()
+    return cache
+
+
+def test_lookup_ranks_prefix_matches_by_links():
+    cache = _cache(_entities())
+    assert [r["id"] for r in cache.lookup("spir", 10)] == [2, 1, 4]
+    assert [r["id"] for r in cache.lookup("SPIRIT ", 10)] == [2, 1]
+    assert [r["id"] for r in cache.lookup("spir", 10, kind="Vessel")] == [1, 4]
+    assert cache.lookup("spir", 1) == [{"id": 2, "type": "Org", "name": "Spirit Airlines"}]
+    assert cache.lookup("zz", 5) == []
+    assert cache.complete
+
+
+def test_partial_cache_is_flagged():
+    assert not _cache(_entities(), max_entries=2).complete
+
+
+def test_update_rereads_only_changed_entities():
+    fresh = {1: {"id": 1, "type": "Vessel", "name": "Spirit of Tasmania", "n": 41},
+             5: {"id": 5, "type": "Org", "name": "Spirit Energy", "n": 3}}
+    requested = []
+
+    def changed(ids):
+        requested.append(ids)
+        return [fresh[i] for i in ids if i in fresh]
+
+    cache = suggest.SuggestCache(lambda n: _entities()[:n], max_entries=100, changed=changed)
+    cache.refresh()
+    # 1 gained a link, 5 is new and 4 was deleted.
+    cache.update([1, 4, 5])
+    assert requested == [[1, 4, 5]]
+    assert [(r["id"], r["n"]) for r in cache._rows if r["name"].startswith("Spirit")] == [
+        (2, 90), (5, 3), (1, 41)
+    ]
+    assert [r["id"] for r in cache.lookup("spir", 10)] == [2, 1, 5]
+    assert cache.complete
+
+
+def test_update_of_partial_cache_keeps_most_linked():
+    newcomer = {"id": 9, "type": "Org", "name": "Sparrow", "n": 60}
+    cache = suggest.SuggestCache(lambda n: _entities()[:n], max_entries=2, changed=lambda ids: [newcomer])
+    cache.refresh()
+    assert {r["id"] for r in cache._rows} == {1, 2}
+    cache.update([9])
+    assert {r["id"] for r in cache._rows} == {2, 9}
+    assert not cache.complete
+
+
+def test_notification_payloads():
+    assert suggest.parse_ids("3,17,42") == [3, 17, 42]
+    # Empty or legacy (table name) payloads ask for a full reload.
+    assert suggest.parse_ids("") is None
+    assert suggest.parse_ids("event_entities") is None
+    cache = _cache(_entities())
+    cache.mark_dirty("3,17")
+    cache.mark_dirty("17,42")
+    assert cache._pending == {3, 17, 42} and not cache._full
+    cache.mark_dirty("")
+    assert cache._full
+
+
+def test_like_prefix_escapes_wildcards():
+    assert suggest.like_prefix("50%_Off\\") == "50\\%\\_off\\\\%"
+
+
+def test_lookup_latency_on_large_cache():
+    rows = [{"id": i, "type": "Org", "name": f"Org {i:06d}", "n": i % 97} for i in range(50_000)]
+    cache = _cache(rows, max_entries=60_000)
+    start = time.perf_counter()
+    for i in range(200):
+        cache.lookup(f"org {i % 50:02d}", 10)
+    per_call_ms = (time.perf_counter() - start) * 1000 / 200
+    assert per_call_ms < 10
+
+
+def test_entities_suggest_served_from_complete_cache(client, monkeypatch):
+    monkeypatch.setattr(m, "suggest_cache", _cache(_entities()))
+    monkeypatch.setattr(m, "fetch_all", lambda *a: (_ for _ in ()).throw(AssertionError("queried db")))
+    r = client.get("/entities/suggest", params={"prefix": "spi", "limit": 2})
+    assert r.status_code == 200
+    assert [s["id"] for s in r.json()["suggestions"]] == [2, 1]
+
+
+def test_entities_suggest_tops_up_from_index(client, monkeypatch):
+    monkeypatch.setattr(m, "suggest_cache", _cache(_entities(), max_entries=4))
+    calls = []
+
+    def fake(sql, params=()):
+        calls.append((sql, list(params)))
+        return [{"id": 2, "type": "Org", "name": "Spirit Airlines"}, {"id": 9, "type": "Org", "name": "Spirit Co"}]
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    r = client.get("/entities/suggest", params={"prefix": "spirit", "type": "Org"})
+    assert [s["id"] for s in r.json()["suggestions"]] == [2, 9]
+    sql, params = calls[0]
+    assert "lower(e.name) LIKE %s" in sql and "e.type::text = %s" in sql
+    assert params == ["spirit%", "Org", 10]
+
+
+def test_events_suggest_uses_title_index(client, mock_fetch_all):
+    r = client.get("/events/suggest", params={"prefix": "Bush"})
+    assert r.status_code == 200
+    call = mock_fetch_all["calls"][0]
+    assert "lower(e.title) LIKE %s" in call["sql"]
+    assert call["params"] == ["bush%", 10]
+    assert client.get("/events/suggest", params={"prefix": "b"}).status_code == 422
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+import app.main as m
+from app import filters, vectors
+
+AT = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+EVENTS = [
+    {"id": 1, "event_type": "Wildfire", "source_id": 1, "detected_at": AT, "lon": 151.0, "lat": -27.0,
+     "text": "Bushfire emergency warning near Tara, leave immediately"},
+    {"id": 2, "event_type": "Weather", "source_id": 2, "detected_at": AT, "lon": 153.0, "lat": -27.5,
+     "text": "Flooding expected along the Brisbane River after heavy rainfall"},
+    {"id": 3, "event_type": "Cyber", "source_id": 3, "detected_at": AT, "lon": None, "lat": None,
+     "text": "Critical vulnerability in VPN appliances exploited"},
+    {"id": 4, "event_type": "Weather", "source_id": 2, "detected_at": datetime(2023, 1, 1, tzinfo=timezone.utc),
+     "lon": 145.8, "lat": -16.9, "text": "Flood watch for Cairns, rainfall totals rising"},
+]
+
+
+def _index(embedder):
+    index = vectors.MemoryIndex(embedder.dim)
+    index.upsert([e["id"] for e in EVENTS], embedder.embed([e["text"] for e in EVENTS]), [vectors.payload(e) for e in EVENTS])
+    return index
+
+
+def test_embeddings_are_stable_unit_vectors():
+    embedder = vectors.HashingEmbedder(128)
+    a = embedder.embed(["Flood warning", "", "flood WARNING!"])
+    assert a.shape == (3, 128) and a.dtype == np.float32
+    assert np.isclose(np.linalg.norm(a[0]), 1.0)
+    assert not a[1].any()
+    assert np.allclose(a[0], a[2])
+    # Word stems share character n-grams.
+    flooding, fire = embedder.embed(["flooding", "bushfire"])
+    assert a[0] @ flooding > a[0] @ fire
+
+
+def test_memory_index_ranks_and_filters():
+    embedder = vectors.HashingEmbedder()
+    index = _index(embedder)
+    query = embedder.embed(["river flood"])[0]
+    assert sorted(i for i, _ in index.search(query, 2)) == [2, 4]
+
+    flt = filters.parse(since=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    assert 4 not in [i for i, _ in index.search(query, 10, flt)]
+    flt = filters.parse(bbox="150,-28,152,-26")
+    assert [i for i, _ in index.search(query, 10, flt)] == [1]
+
+    index.upsert([2], embedder.embed(["vessel sighted"]), [vectors.payload(EVENTS[1])])
+    assert len(index) == 4
+    assert index.search(query, 1)[0][0] == 4
+
+
+def test_qdrant_filter_translation():
+    flt = filters.parse(event_type="Weather", source_id=2, bbox="1,2,3,4", time_range="2024-01-01T00:00:00Z..")
+    must = vectors.qdrant_filter(flt)["must"]
+    assert must[0] == {"key": "event_type", "match": {"value": "Weather"}}
+    assert must[1] == {"key": "source_id", "match": {"value": 2}}
+    assert must[2] == {"key": "detected_at", "range": {"gte": datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()}}
+    assert must[3]["geo_bounding_box"] == {"top_left": {"lon": 1.0, "lat": 4.0}, "bottom_right": {"lon": 3.0, "lat": 2.0}}
+    assert vectors.qdrant_filter(filters.EventFilter()) is None
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.stored = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        if "max(event_id)" in sql:
+            self._result = [{"id": max((r[0] for r in self.stored), default=0)}]
+        else:
+            watermark, hours, model, limit = params
+            recent = datetime.now(timezone.utc) - timedelta(hours=hours)
+            done = {r[0] for r in self.stored if r[2] == model}
+            self._result = [
+                r for r in self.rows if (r["id"] > watermark or r["detected_at"] >= recent) and r["id"] not in done
+            ][:limit]
+
+    def executemany(self, sql, rows):
+        self.stored.extend(rows)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_embed_batch_indexes_and_records_in_batches():
+    embedder = vectors.HashingEmbedder(64)
+    index = vectors.MemoryIndex(64)
+    cur = FakeCursor(EVENTS)
+    assert vectors.embed_batch(cur, embedder, index, 3) == 3
+    assert vectors.embed_batch(cur, embedder, index, 3) == 1
+    assert vectors.embed_batch(cur, embedder, index, 3) == 0
+    assert len(index) == 4
+    assert [r[0] for r in cur.stored] == [1, 2, 3, 4]
+    assert all(r[2] == "hash-v1-64" and len(r[3]) == 64 * 4 for r in cur.stored)
+
+
+def test_embed_batch_picks_up_late_committed_events():
+    embedder = vectors.HashingEmbedder(64)
+    index = vectors.MemoryIndex(64)
+    cur = FakeCursor(EVENTS[1:])
+    assert vectors.embed_batch(cur, embedder, index, 10) == 3
+    # Event 1 commits after 2-4 were embedded: below the watermark but recent.
+    cur.rows = [dict(EVENTS[0], detected_at=datetime.now(timezone.utc))] + EVENTS[1:]
+    assert vectors.embed_batch(cur, embedder, index, 10) == 1
+    assert vectors.embed_batch(cur, embedder, index, 10) == 0
+    assert [r[0] for r in cur.stored] == [2, 3, 4, 1]
+
+
+def test_semantic_search_combines_hits_with_filters(client, monkeypatch):
+    monkeypatch.setattr(m, "vector_index", _index(m.embedder))
+    seen = []
+
+    def fake(sql, params=()):
+        seen.append((sql, list(params)))
+        ids = params[-1]
+        return [{"id": i, "title": f"event {i}"} for i in ids if i != 4]  # 4 is archived
+
+    monkeypatch.setattr(m, "fetch_all", fake)
+    resp = client.get("/search/semantic", params={"q": "flood rainfall", "type": "Weather"})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [r["id"] for r in body["results"]] == [2]
+    assert body["results"][0]["score"] > 0
+    sql, params = seen[0]
+    assert "e.event_type = %s AND e.id = ANY(%s)" in sql
+    assert params[0] == "Weather" and sorted(params[1]) == [2, 4]
+
+
+def test_semantic_search_unavailable_index(client, monkeypatch):
+    class Down:
+        def search(self, *args):
+            raise ConnectionError("qdrant down")
+
+    monkeypatch.setattr(m, "vector_index", Down())
+    assert client.get("/search/semantic", params={"q": "flood"}).status_code == 503
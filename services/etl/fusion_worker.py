@@ -4,17 +4,23 @@ import re
 import sqlite3
 import time
 import uuid
+from functools import lru_cache
 from typing import Iterable, Tuple
 
-import spacy
-from spacy.cli import download
-
 MMSI_RE = re.compile(r"mmsi:(\d+)", re.IGNORECASE)
 IMO_RE = re.compile(r"imo:(\d+)", re.IGNORECASE)
 
 
+@lru_cache(maxsize=1)
 def _load_model():
-    """Load spaCy model, downloading if missing."""
+    """Load spaCy model, downloading if missing.
+
+    Loaded on first use rather than at import so the worker (and anything
+    importing it) starts without paying for spaCy.
+    """
+    import spacy
+    from spacy.cli import download
+
     try:
         return spacy.load("en_core_web_sm")
     except Exception:
@@ -22,9 +28,6 @@ def _load_model():
         return spacy.load("en_core_web_sm")
 
 
-NLP = _load_model()
-
-
 def get_conn(url: str | None = None) -> sqlite3.Connection:
     """Return a SQLite connection using ``url`` or ``FUSION_DB`` env."""
     db_path = url or os.getenv("FUSION_DB", ":memory:")
@@ -75,7 +78,7 @@ def _extract_entities(text: str) -> Iterable[Tuple[str, str, str]]:
        ``mmsi:<digits>`` and ``imo:<digits>``.
     """
 
-    doc = NLP(text)
+    doc = _load_model()(text)
     for ent in doc.ents:
         if ent.label_ in {"ORG", "PERSON", "GPE"}:
             # provenance ``ner`` indicates the entity came from spaCy
@@ -0,0 +1,299 @@
+"""Near-duplicate event detection with MinHash signatures and LSH banding.
+
+The same incident arrives from several feeds with slightly different titles
+and bodies.  Each event's normalised text is shingled into overlapping
+character 5-grams, hashed, and summarised by a MinHash signature of
+``NUM_PERM`` 32-bit minima; the fraction of equal positions in two
+signatures estimates the Jaccard similarity of their shingle sets.
+
+Signatures are cut into ``BANDS`` bands of ``ROWS`` values.  Events that
+agree on every value of at least one band are *candidates* (with 16 bands of
+4 rows, pairs at Jaccard 0.5 become candidates with probability ~0.65 and at
+0.8 with ~1.0), so no event is compared against all others.  Candidates
+are confirmed when the estimated similarity reaches ``threshold`` and
+confirmed pairs are merged into clusters with union-find.
+
+Everything is vectorised with numpy over a batch: shingle hashes come from
+a rolling polynomial over the concatenated UTF-8 bytes, each permutation is
+one xor-multiply over all shingles, and buckets are found by sorting band
+keys.  ``scripts/bench_neardup.py`` measures throughput at 1M events.
+
+The :func:`run` job clusters new events together with the recent window
+(signatures persist in ``event_minhash``) and writes ``events.cluster_id``:
+the id of the cluster's earliest event, set on every member, ``NULL`` for
+events without near-duplicates.  List endpoints collapse on it with
+``collapse=1``.
+
+    python -m services.etl.neardup [--once] [--window-hours 72]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 5
+MAX_CHARS = 600
+THRESHOLD = 0.5
+
+_NON_WORD = re.compile(r"[\W_]+", re.UNICODE)
+
+# Fixed seed: signatures are stored and compared across runs.
+_rng = np.random.default_rng(0x5EED)
+_A = _rng.integers(0, 2**32, size=NUM_PERM, dtype=np.uint32) | np.uint32(1)
+_B = _rng.integers(0, 2**32, size=NUM_PERM, dtype=np.uint32)
+_BAND_MIX = _rng.integers(1, 2**63, size=ROWS, dtype=np.uint64) | np.uint64(1)
+
+
+def normalize(text: str) -> str:
+    """Lower-case, collapse punctuation/whitespace and truncate to ``MAX_CHARS``."""
+
+    return _NON_WORD.sub(" ", text.lower()).strip()[:MAX_CHARS]
+
+
+def _shingle_hashes(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(hashes, starts)``: all shingle hashes and each text's first index."""
+
+    encoded = [normalize(t).encode("utf-8").ljust(SHINGLE) for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    buf = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    span = len(buf) - SHINGLE + 1
+    rolling = np.zeros(span, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(SHINGLE):
+            rolling = rolling * np.uint64(257) + buf[j : j + span]
+        # Avalanche (splitmix64 finaliser) so nearby shingles hash far apart.
+        rolling ^= rolling >> np.uint64(31)
+        rolling *= np.uint64(0x7FB5D329728EA185)
+        rolling ^= rolling >> np.uint64(27)
+    rolling = (rolling >> np.uint64(32)).astype(np.uint32)
+    counts = lengths - SHINGLE + 1
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    # Positions of shingles that lie within a single text.
+    idx = np.arange(counts.sum()) - np.repeat(starts, counts) + np.repeat(offsets, counts)
+    return rolling[idx], starts
+
+
+def signatures(texts: Sequence[str]) -> np.ndarray:
+    """MinHash signatures, shape ``(len(texts), NUM_PERM)``, dtype ``uint32``."""
+
+    if not texts:
+        return np.zeros((0, NUM_PERM), dtype=np.uint32)
+    hashes, starts = _shingle_hashes(texts)
+    out = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    permuted = np.empty_like(hashes)
+    # Each permutation is h -> (h ^ b) * a mod 2**32 (a odd), a bijection
+    # whose high bits, which decide the minimum, depend on every input bit.
+    # 32-bit lanes halve memory traffic compared with 64-bit hashing.
+    with np.errstate(over="ignore"):
+        for p in range(NUM_PERM):
+            np.bitwise_xor(hashes, _B[p], out=permuted)
+            np.multiply(permuted, _A[p], out=permuted)
+            out[:, p] = np.minimum.reduceat(permuted, starts)
+    return out
+
+
+def band_keys(sigs: np.ndarray) -> np.ndarray:
+    """One 64-bit bucket key per (event, band), shape ``(n, BANDS)``."""
+
+    rows = sigs.reshape(len(sigs), BANDS, ROWS).astype(np.uint64)
+    with np.errstate(over="ignore"):
+        return (rows * _BAND_MIX).sum(axis=2, dtype=np.uint64)
+
+
+def candidate_pairs(sigs: np.ndarray) -> np.ndarray:
+    """Index pairs sharing a bucket in some band, shape ``(m, 2)``.
+
+    Within each bucket, members are chained in sorted order (each paired with
+    the next), which keeps the pair count linear even for large buckets.
+    """
+
+    n = len(sigs)
+    keys = band_keys(sigs)
+    codes = []
+    for band in range(BANDS):
+        order = np.argsort(keys[:, band], kind="stable")
+        sorted_keys = keys[order, band]
+        same = sorted_keys[1:] == sorted_keys[:-1]
+        if same.any():
+            a, b = order[:-1][same], order[1:][same]
+            # One int64 per pair (low * n + high) dedupes far cheaper than rows.
+            codes.append(np.minimum(a, b) * n + np.maximum(a, b))
+    if not codes:
+        return np.zeros((0, 2), dtype=np.int64)
+    unique = np.unique(np.concatenate(codes))
+    return np.stack([unique // n, unique % n], axis=1)
+
+
+def similarity(sigs: np.ndarray, pairs: np.ndarray, chunk: int = 1 << 20) -> np.ndarray:
+    """Estimated Jaccard similarity of each pair.
+
+    Pairs are compared ``chunk`` at a time to bound the gathered rows' memory.
+    """
+
+    out = np.empty(len(pairs), dtype=np.float64)
+    for i in range(0, len(pairs), chunk):
+        part = pairs[i : i + chunk]
+        out[i : i + chunk] = (sigs[part[:, 0]] == sigs[part[:, 1]]).mean(axis=1)
+    return out
+
+
+def components(n: int, pairs: np.ndarray) -> np.ndarray:
+    """Label each of ``n`` nodes with the smallest index in its component."""
+
+    labels = np.arange(n)
+    if len(pairs) == 0:
+        return labels
+    a, b = pairs[:, 0], pairs[:, 1]
+    while True:
+        low = np.minimum(labels[a], labels[b])
+        before = labels.copy()
+        np.minimum.at(labels, a, low)
+        np.minimum.at(labels, b, low)
+        labels = labels[labels]  # pointer jumping
+        if np.array_equal(labels, before):
+            return labels
+
+
+def cluster(sigs: np.ndarray, threshold: float = THRESHOLD) -> np.ndarray:
+    """Cluster label (smallest member index) of each signature row."""
+
+    pairs = candidate_pairs(sigs)
+    if len(pairs):
+        pairs = pairs[similarity(sigs, pairs) >= threshold]
+    return components(len(sigs), pairs)
+
+
+def cluster_ids(ids: np.ndarray, labels: np.ndarray) -> List[Optional[int]]:
+    """``events.cluster_id`` values: the smallest member id, ``None`` for singletons.
+
+    ``ids`` must be sorted ascending so a component's smallest index is its
+    earliest event.
+    """
+
+    sizes = np.bincount(labels, minlength=len(labels))
+    return [int(ids[label]) if sizes[label] > 1 else None for label in labels]
+
+
+# --- Postgres job -----------------------------------------------------------
+
+WINDOW_SQL = """
+    SELECT m.event_id, m.detected_at, m.sig, e.cluster_id
+    FROM event_minhash m
+    JOIN events e ON e.id = m.event_id AND e.detected_at = m.detected_at
+    WHERE m.detected_at >= now() - %s * interval '1 hour'
+    ORDER BY m.event_id
+"""
+
+# Unsigned events rather than ids above the highest signed one: ids are drawn
+# before their transactions commit, so a lower id can become visible late.
+NEW_SQL = """
+    SELECT e.id, e.detected_at, e.title || ' ' || coalesce(e.body, ''), e.cluster_id
+    FROM events e
+    WHERE e.detected_at >= now() - %s * interval '1 hour'
+      AND NOT EXISTS (SELECT 1 FROM event_minhash m WHERE m.event_id = e.id)
+    ORDER BY e.id
+    LIMIT %s
+"""
+
+UPDATE_SQL = """
+    UPDATE events e SET cluster_id = v.cluster_id
+    FROM unnest(%s::bigint[], %s::timestamptz[], %s::bigint[]) AS v(id, detected_at, cluster_id)
+    WHERE e.id = v.id AND e.detected_at = v.detected_at
+"""
+
+
+def process_batch(cur, window_hours: float, batch_size: int, threshold: float = THRESHOLD) -> int:
+    """Cluster the next batch of new events with the recent window; return its size."""
+
+    cur.execute(NEW_SQL, (window_hours, batch_size))
+    new = cur.fetchall()
+    if not new:
+        return 0
+    cur.execute(WINDOW_SQL, (window_hours,))
+    window = cur.fetchall()
+
+    new_sigs = signatures([row[2] for row in new])
+    old_sigs = (
+        np.frombuffer(b"".join(bytes(row[2]) for row in window), dtype="<u4").reshape(len(window), NUM_PERM)
+        if window
+        else np.zeros((0, NUM_PERM), dtype=np.uint32)
+    )
+    # Late-committed events may sort below the window; cluster_ids needs ids ascending.
+    ids = np.array([row[0] for row in window] + [row[0] for row in new], dtype=np.int64)
+    order = np.argsort(ids, kind="stable")
+    ids = ids[order]
+    rows = window + new
+    detected = [rows[i][1] for i in order]
+    current = [rows[i][3] for i in order]
+    sigs = np.concatenate([old_sigs, new_sigs])[order]
+    assigned = cluster_ids(ids, cluster(sigs, threshold))
+
+    changed = [i for i, (cur_id, new_id) in enumerate(zip(current, assigned)) if cur_id != new_id]
+    if changed:
+        cur.execute(
+            UPDATE_SQL,
+            (
+                [int(ids[i]) for i in changed],
+                [detected[i] for i in changed],
+                [assigned[i] for i in changed],
+            ),
+        )
+    cur.executemany(
+        "INSERT INTO event_minhash(event_id, detected_at, sig) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
+        [(row[0], row[1], new_sigs[i].astype("<u4").tobytes()) for i, row in enumerate(new)],
+    )
+    return len(new)
+
+
+def run(conn, window_hours: float = 72, batch_size: int = 20_000, threshold: float = THRESHOLD) -> int:
+    """Process all pending events; return how many were signed."""
+
+    total = 0
+    with conn.cursor() as cur:
+        while True:
+            done = process_batch(cur, window_hours, batch_size, threshold)
+            conn.commit()
+            total += done
+            if done < batch_size:
+                break
+        # Signatures outside the window are never compared again.
+        cur.execute(
+            "DELETE FROM event_minhash WHERE detected_at < now() - %s * interval '1 hour'",
+            (window_hours,),
+        )
+    conn.commit()
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate events")
+    parser.add_argument("--window-hours", type=float, default=float(os.getenv("NEARDUP_WINDOW_HOURS", "72")))
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("NEARDUP_THRESHOLD", str(THRESHOLD))))
+    parser.add_argument("--batch-size", type=int, default=20_000)
+    parser.add_argument("--interval", type=float, default=60.0, help="seconds between passes")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    args = parser.parse_args()
+
+    import psycopg
+
+    dsn = os.getenv("DATABASE_URL", "postgresql://aoidb:aoidb@db:5432/aoidb")
+    while True:
+        with psycopg.connect(dsn) as conn:
+            run(conn, args.window_hours, args.batch_size, args.threshold)
+        if args.once:
+            return
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from services.etl import neardup
+
+BASE = "Emergency Warning: bushfire at Tara, residents in Kogan Road should leave now as conditions are dangerous"
+
+
+def test_signatures_estimate_jaccard():
+    sigs = neardup.signatures([BASE, BASE.upper() + "!!", "Severe thunderstorm warning for Brisbane and Ipswich"])
+    assert sigs.shape == (3, neardup.NUM_PERM) and sigs.dtype == np.uint32
+    # Normalisation ignores case and punctuation; unrelated text shares little.
+    assert (sigs[0] == sigs[1]).all()
+    assert (sigs[0] == sigs[2]).mean() < 0.2
+    assert neardup.signatures([]).shape == (0, neardup.NUM_PERM)
+
+
+def test_near_duplicates_cluster_and_distinct_events_do_not():
+    texts = [
+        BASE,
+        "Tropical cyclone watch issued for coastal communities between Cairns and Cardwell",
+        "EMERGENCY WARNING - Bushfire at Tara; residents in Kogan Rd should leave now, conditions are dangerous",
+        "Cyber advisory: critical vulnerability in VPN appliances actively exploited",
+        "Tropical cyclone watch for coastal communities between Cairns and Cardwell issued",
+    ]
+    labels = neardup.cluster(neardup.signatures(texts))
+    assert labels.tolist() == [0, 1, 0, 3, 1]
+    ids = np.array([10, 11, 12, 13, 14])
+    assert neardup.cluster_ids(ids, labels) == [10, 11, 10, None, 11]
+
+
+def test_components_merge_transitively():
+    pairs = np.array([[3, 4], [1, 3], [5, 6]])
+    assert neardup.components(7, pairs).tolist() == [0, 1, 2, 1, 1, 5, 5]
+
+
+class FakeCursor:
+    def __init__(self, window, new):
+        self.window = window
+        self.new = new
+        self.executed = []
+        self.inserted = []
+        self._result = None
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+        if sql == neardup.NEW_SQL:
+            self._result = self.new
+        elif sql == neardup.WINDOW_SQL:
+            self._result = self.window
+
+    def executemany(self, sql, rows):
+        self.inserted.extend(rows)
+
+    def fetchone(self):
+        return self._result[0]
+
+    def fetchall(self):
+        return self._result
+
+
+def test_process_batch_links_new_events_to_window():
+    at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    old_sig = neardup.signatures([BASE])[0].astype("<u4").tobytes()
+    window = [(7, at, old_sig, None)]
+    new = [
+        (8, at, "Bushfire at Tara: residents in Kogan Road should leave now, conditions are dangerous", None),
+        (9, at, "Road closed on the Bruce Highway near Gympie after a crash", None),
+    ]
+    cur = FakeCursor(window, new)
+    assert neardup.process_batch(cur, window_hours=72, batch_size=100) == 2
+
+    update = [params for sql, params in cur.executed if sql == neardup.UPDATE_SQL]
+    assert update == [([7, 8], [at, at], [7, 7])]
+    assert [row[0] for row in cur.inserted] == [8, 9]
+    assert all(len(row[2]) == 4 * neardup.NUM_PERM for row in cur.inserted)
+
+
+def test_process_batch_signs_events_committed_after_higher_ids():
+    # Event 5 commits after 7 was signed; it still gets signed and, being
+    # the earliest, becomes the cluster id for both.
+    at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    old_sig = neardup.signatures([BASE])[0].astype("<u4").tobytes()
+    cur = FakeCursor([(7, at, old_sig, None)], [(5, at, BASE.upper(), None)])
+    assert neardup.process_batch(cur, window_hours=72, batch_size=100) == 1
+
+    update = [params for sql, params in cur.executed if sql == neardup.UPDATE_SQL]
+    assert update == [([5, 7], [at, at], [5, 5])]
+    assert [row[0] for row in cur.inserted] == [5]